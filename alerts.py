@@ -0,0 +1,134 @@
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from ring_buffer import SensorHistory, rolling_stats
+
+# One alarm raising or clearing. sensor_id is 1-based like the web API; rule
+# is "threshold" or "rate"; rate is ppm/s (None when the rule is off);
+# latency is seconds from the serial read to the decision
+AlertEvent = namedtuple("AlertEvent", ["sensor_id", "rule", "active", "ppm", "rate", "timestamp", "latency"])
+
+
+class AlertEngine:
+    """Alarm rules evaluated on every reading as it is parsed
+
+    Options come from the "alerts" section of sensors.json:
+
+    - threshold (per sensor or global) raises the alarm above that ppm;
+      it clears only once the reading drops below threshold - hysteresis,
+      so a value hovering at the limit doesn't flap
+    - debounce: consecutive samples needed before raising or clearing
+    - rate_of_rise: ppm/s, the least-squares slope of the last
+      rate_window seconds of readings, that raises an alarm before the
+      threshold is reached; it clears below half that rate. Off unless set.
+
+    Rates are read from history, a ring_buffer.SensorHistory that the
+    caller appends every data reading to before evaluate(). Without one
+    the engine keeps its own and appends to it itself.
+
+    A sensor is in alarm while any rule is raised. severity is "alarm"
+    while any threshold is exceeded, "warning" while only rates are, else
+    None. Only the ingestion thread calls evaluate(); others read alarm,
+    alert_sensors and severity.
+    """
+
+    def __init__(self, config, history=None):
+        options = config.alerts
+        self.thresholds = [spec.threshold for spec in config.sensors]
+        self.hysteresis = float(options.get("hysteresis", 0.0))
+        self.debounce = max(1, int(options.get("debounce", 1)))
+        rate_of_rise = options.get("rate_of_rise")
+        self.rate_of_rise = float(rate_of_rise) if rate_of_rise else None
+        self.rate_window = float(options.get("rate_window", 2.0))
+
+        count = config.count
+        self.raised = [set() for _ in range(count)]
+        self.pending = [{} for _ in range(count)]
+        self.own_history = history is None
+        self.history = SensorHistory(count, config.history_size) if history is None else history
+        self.alarm = np.zeros(count, dtype=bool)
+        self.alert_sensors = ()
+        self.severity = None
+        self.latencies = deque(maxlen=10000)
+        self.transitions = 0
+
+    def evaluate(self, sensor_index, ppm, timestamp, received=None):
+        """Apply one data reading; returns the AlertEvents it caused, usually none"""
+        events = []
+        threshold = self.thresholds[sensor_index]
+        if self._debounce(sensor_index, "threshold", ppm > threshold, ppm < threshold - self.hysteresis):
+            events.append(self._transition(sensor_index, "threshold", ppm, None, timestamp, received))
+
+        if self.own_history:
+            self.history.append(sensor_index, timestamp, np.nan, np.nan, ppm)
+        if self.rate_of_rise is not None:
+            rate = self._rate(sensor_index, timestamp)
+            if rate is not None and self._debounce(sensor_index, "rate", rate > self.rate_of_rise,
+                                                   rate < self.rate_of_rise / 2):
+                events.append(self._transition(sensor_index, "rate", ppm, rate, timestamp, received))
+        return events
+
+    def _debounce(self, sensor_index, rule, over, under):
+        """Count samples that disagree with the rule's state; True when it flips"""
+        raised = rule in self.raised[sensor_index]
+        pending = self.pending[sensor_index]
+        if (over and not raised) or (under and raised):
+            count = pending.get(rule, 0) + 1
+            if count >= self.debounce:
+                pending[rule] = 0
+                return True
+            pending[rule] = count
+        else:
+            pending[rule] = 0
+        return False
+
+    def _rate(self, sensor_index, timestamp):
+        """ppm/s over the rate window, or None until half a window of samples exists"""
+        window = self.history.since(sensor_index, self.rate_window, timestamp)
+        if len(window.timestamp) < 2 or window.timestamp[-1] - window.timestamp[0] < self.rate_window / 2:
+            return None
+        return rolling_stats(window).slope
+
+    def _transition(self, sensor_index, rule, ppm, rate, timestamp, received):
+        raised = self.raised[sensor_index]
+        active = rule not in raised
+        if active:
+            raised.add(rule)
+        else:
+            raised.discard(rule)
+        self.alarm[sensor_index] = bool(raised)
+        self.alert_sensors = tuple(index + 1 for index in self.alarm.nonzero()[0].tolist())
+        if any("threshold" in rules for rules in self.raised):
+            self.severity = "alarm"
+        else:
+            self.severity = "warning" if self.alert_sensors else None
+        self.transitions += 1
+
+        latency = None
+        if received is not None:
+            latency = time.time() - received
+            if active:
+                self.latencies.append(latency)
+        return AlertEvent(sensor_index + 1, rule, active, ppm, rate, timestamp, latency)
+
+    def take_stats(self):
+        """Transition count and serial-read-to-alarm latency since the last call"""
+        latencies = sorted(self.latencies)
+        self.latencies.clear()
+        stats = {"transitions": self.transitions, "raised": len(latencies)}
+        if latencies:
+            stats["p50_ms"] = latencies[len(latencies) // 2] * 1e3
+            stats["p99_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3
+            stats["max_ms"] = latencies[-1] * 1e3
+        self.transitions = 0
+        return stats
+
+
+def format_alert_stats(stats):
+    text = f"Alerts: {stats['transitions']} transitions, {stats['raised']} raised"
+    if stats["raised"]:
+        text += (f", serial-to-alarm p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, "
+                 f"max {stats['max_ms']:.3f} ms")
+    return text
@@ -0,0 +1 @@
+"""Performance benchmarks, run from the repository root: python -m benchmarks.<name>"""
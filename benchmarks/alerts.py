@@ -0,0 +1,154 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from alerts import AlertEngine
+from monitor_engine import MonitorEngine
+from sensor_config import SensorConfig, load_config
+from benchmarks.simulator import open_pty_pair
+
+
+def leak_profile(threshold):
+    """ppm per sample of one leak: a fast rise, a peak, then hovering at the threshold"""
+    rise = [2.0 + 15.0 * step for step in range(1, 14)]
+    hover = [threshold + offset for offset in (2, -3, 1.5, -2, 2.5, -1, 1, -2.5, 3, -1.5)]
+    return rise + [rise[-1]] * 4 + hover + [60.0, 10.0]
+
+
+def build_replay(sensors, samples, leaks, threshold, seed):
+    """ppm for every (sample, sensor): noise around 2 ppm plus leak episodes at random"""
+    rng = np.random.default_rng(seed)
+    ppm = np.maximum(0.0, rng.normal(2.0, 0.3, (samples, sensors))).round(2)
+    profile = leak_profile(threshold)
+    for _ in range(leaks):
+        sensor = rng.integers(sensors)
+        start = rng.integers(samples - len(profile))
+        ppm[start:start + len(profile), sensor] = profile
+    return ppm
+
+
+def replay(master, ppm, hz, written):
+    """Write one line per sensor per sample at hz samples/s, spread across each period
+
+    Appends (time written, sensor id, ppm) to written for every line, in order.
+    """
+    samples, sensors = ppm.shape
+    interval = 1 / hz / sensors
+    start = time.perf_counter()
+    for sample in range(samples):
+        for sensor in range(sensors):
+            value = f"{ppm[sample, sensor]:.2f}"
+            line = f"{int(sample / hz)}\t{sensor + 1}\t1523342.25\t0.4712\t{value} ppm\r\n"
+            delay = start + (sample * sensors + sensor) * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            written.append((time.time(), sensor + 1, float(value)))
+            os.write(master, line.encode())
+
+
+def first_over(config, written):
+    """Write times of the lines on which each rule first held, ignoring debounce
+
+    Replays the written lines through the same rules with debounce 1: a raise
+    there marks the first line over the threshold (or rate) of an episode.
+    Returns {(sensor id, rule): [times]}.
+    """
+    instant = AlertEngine(SensorConfig([{"channel": spec.channel} for spec in config.sensors],
+                                       threshold=config.threshold, alerts=dict(config.alerts, debounce=1)))
+    raised = {}
+    for at, sensor_id, ppm in written:
+        for event in instant.evaluate(sensor_id - 1, ppm, at):
+            if event.active:
+                raised.setdefault((sensor_id, event.rule), []).append(at)
+    return raised
+
+
+def alarm_latencies(events, firsts):
+    """Seconds from the first line over a rule to the engine raising it, per raise
+
+    A raise is timed from the latest episode start of the same rule on the
+    same sensor since that rule's previous event, so the samples debounce
+    waits for count as latency and a missed episode is not paired with a
+    later raise.
+    """
+    latencies = []
+    previous = {}
+    for at, event in events:
+        key = (event.sensor_id, event.rule)
+        since = previous.get(key, 0.0)
+        previous[key] = at
+        if not event.active:
+            continue
+        starts = [t for t in firsts.get(key, ()) if since < t <= at]
+        if starts:
+            latencies.append(at - starts[-1])
+    return latencies
+
+
+def count_transitions(config, ppm, hz):
+    """Transitions of the configured rules and of a bare threshold on the same samples"""
+    bare = SensorConfig([{"channel": spec.channel} for spec in config.sensors], threshold=config.threshold)
+    counts = []
+    for rules in (config, bare):
+        engine = AlertEngine(rules)
+        transitions = 0
+        for sample in range(ppm.shape[0]):
+            for sensor in range(ppm.shape[1]):
+                transitions += len(engine.evaluate(sensor, ppm[sample, sensor], sample / hz))
+        counts.append(transitions)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial line to alarm latency under a replayed load")
+    parser.add_argument("--sensors", type=int, default=16)
+    parser.add_argument("--hz", type=float, default=1.0,
+                        help="samples per second per sensor (hydrogen.ino: 1, readInterval = 1000)")
+    parser.add_argument("--duration", type=float, default=90.0)
+    parser.add_argument("--leaks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    master, path = open_pty_pair()
+    rules = load_config().alerts
+    config = SensorConfig([{"port": path, "channel": channel} for channel in range(1, args.sensors + 1)],
+                          alerts=rules)
+    samples = int(args.duration * args.hz)
+    ppm = build_replay(args.sensors, samples, args.leaks, config.threshold, args.seed)
+
+    monitor = MonitorEngine(config, path, store=None, settle_time=0, report_interval=0)
+    written = []
+    events = []
+    internal = []
+
+    def on_event(event):
+        events.append((time.time(), event))
+        if event.active:
+            internal.append(event.latency)
+
+    monitor.bus.listen("alert_events", on_event, maxsize=10000)
+    monitor.start()
+    while not monitor.connected:
+        time.sleep(0.01)
+
+    replay(master, ppm, args.hz, written)
+    time.sleep(0.5)
+    monitor.close()
+
+    configured, bare = count_transitions(config, ppm, args.hz)
+    latencies = np.array(alarm_latencies(events, first_over(config, written))) * 1e3
+    internal = np.array(internal) * 1e3
+    print(f"{args.sensors} sensors at {args.hz:g} Hz ({args.sensors * args.hz:.0f} lines/s) for "
+          f"{args.duration:g}s, {args.leaks} leak episodes, rules {rules}")
+    print(f"{len(latencies)} alarms raised")
+    print(f"first line over to alarm:     p50 {np.percentile(latencies, 50):6.3f} ms   "
+          f"p99 {np.percentile(latencies, 99):6.3f} ms   max {latencies.max():6.3f} ms")
+    print(f"serial read to alarm raised:  p50 {np.percentile(internal, 50):6.3f} ms   "
+          f"p99 {np.percentile(internal, 99):6.3f} ms   max {internal.max():6.3f} ms")
+    print(f"transitions: {configured} with these rules, {bare} with a bare threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from sensor_state import empty_snapshot
+from shared_snapshot import SharedSensorTable
+
+
+class ManagerTable:
+    """The previous DataBridge storage: a Manager list of Manager dict proxies"""
+
+    def __init__(self, sensor_count):
+        self.manager = multiprocessing.Manager()
+        self.sensors = self.manager.list([self.manager.dict(empty_snapshot()) for _ in range(sensor_count)])
+
+    def update(self, index, data):
+        sensor = self.sensors[index]
+        for key, value in data.items():
+            sensor[key] = value
+
+    def snapshots(self):
+        return [dict(sensor) for sensor in self.sensors]
+
+    def close(self):
+        self.manager.shutdown()
+
+
+def count_reads(table, duration, results):
+    """Reader process: full snapshots per second"""
+    reads = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        table.snapshots()
+        reads += 1
+    results.put(reads / duration)
+
+
+def watch_updates(table, updates, results):
+    """Reader process: seconds from each write to the moment a reader sees it"""
+    latencies = []
+    last = None
+    while len(latencies) < updates:
+        timestamp = table.snapshots()[0]["timestamp"]
+        if timestamp is not None and timestamp != last:
+            latencies.append(time.time() - timestamp)
+            last = timestamp
+    results.put(latencies)
+
+
+def snapshot(sensor_index):
+    return {"value": 10.0 + sensor_index, "resistance": 1.5e6, "ratio": 0.47,
+            "timestamp": time.time(), "status": "connected"}
+
+
+def run(name, table, args):
+    results = multiprocessing.Queue()
+
+    # Update cost in the writer (the bridge process)
+    start = time.perf_counter()
+    for i in range(args.updates):
+        table.update(i % args.sensors, snapshot(i % args.sensors))
+    update_us = (time.perf_counter() - start) / args.updates * 1e6
+
+    reader = multiprocessing.Process(target=count_reads, args=(table, args.duration, results))
+    reader.start()
+    reads = results.get()
+    reader.join()
+
+    # Write-to-visible latency with a reader polling as fast as it can
+    watcher = multiprocessing.Process(target=watch_updates, args=(table, 200, results))
+    watcher.start()
+    time.sleep(0.5)
+    while watcher.is_alive() and results.empty():
+        table.update(0, snapshot(0))
+        time.sleep(0.005)
+    latencies = np.array(results.get()) * 1e6
+    watcher.join()
+
+    print(f"{name:<14} update {update_us:8.1f} us   reads {reads:10.0f}/s   "
+          f"visible after p50 {np.percentile(latencies, 50):8.1f} us  p99 {np.percentile(latencies, 99):8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manager proxy bridge vs shared-memory seqlock table")
+    parser.add_argument("--sensors", type=int, default=2)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for name, factory in (("manager", ManagerTable), ("shared memory", SharedSensorTable)):
+        table = factory(args.sensors)
+        try:
+            run(name, table, args)
+        finally:
+            table.close()
+
+
+if __name__ == "__main__":
+    main()
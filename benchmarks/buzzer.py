@@ -0,0 +1,129 @@
+import argparse
+import contextlib
+import io
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from buzzer import Buzzer
+from gpio_backend import RecordingGPIO
+from monitor_engine import MonitorEngine
+from sensor_config import SensorConfig
+from sensor_parser import parse_lines
+
+
+def poll_buzzer(gpio, monitor, stop):
+    """The GUI's former buzzer_control thread: poll every 100 ms, sleep through each beep"""
+    gpio.setmode(gpio.BCM)
+    gpio.setup(26, gpio.OUT)
+    while not stop.is_set():
+        if monitor.alert_sensors:
+            gpio.output(26, gpio.HIGH)
+            time.sleep(0.5)
+            gpio.output(26, gpio.LOW)
+            time.sleep(0.5)
+        else:
+            time.sleep(0.1)
+
+
+def feed(monitor, ppm):
+    started = time.perf_counter()
+    monitor.process_readings(parse_lines([f"1\t1\t1523342.25\t0.4712\t{ppm:.2f} ppm"]), received=time.time())
+    return started
+
+
+def first_edge(edges, after, on):
+    return next((t for t, state in edges if t >= after and state == on), None)
+
+
+def run(mode, args):
+    config = SensorConfig([{"channel": 1}], alerts={"debounce": 1})
+    monitor = MonitorEngine(config, "/dev/null", store=None, report_interval=0)
+    gpio = RecordingGPIO()
+    stop = threading.Event()
+    if mode == "event":
+        buzzer = Buzzer(gpio, frequency=args.frequency)
+        buzzer.follow(monitor)
+    else:
+        threading.Thread(target=poll_buzzer, args=(gpio, monitor, stop), daemon=True).start()
+
+    rng = random.Random(args.seed)
+    episodes = []
+    for _ in range(args.episodes):
+        time.sleep(rng.uniform(0.2, 1.0))
+        raised = feed(monitor, config.threshold + 50)
+        time.sleep(rng.uniform(0.2, 1.2))
+        cleared = feed(monitor, 2.0)
+        episodes.append((raised, cleared))
+    time.sleep(1.2)
+    stop.set()
+    if mode == "event":
+        buzzer.close()
+    monitor.close()
+
+    edges = [(t, bool(level)) for t, level in gpio.edges_for(26)]
+    raise_ms = []
+    clear_ms = []
+    late = 0
+    for number, (raised, cleared) in enumerate(episodes):
+        on = first_edge(edges, raised, True)
+        raise_ms.append((on - raised) * 1e3 if on is not None and on < cleared else np.nan)
+        # Time until the buzzer is off for good; nothing if it was already off
+        was_on = [state for t, state in edges if t < cleared][-1]
+        off = first_edge(edges, cleared, False)
+        clear_ms.append((off - cleared) * 1e3 if was_on else 0.0)
+        next_raise = episodes[number + 1][0] if number + 1 < len(episodes) else float("inf")
+        sounded = first_edge(edges, off if was_on else cleared, True)
+        if sounded is not None and sounded < next_raise:
+            late += 1
+    return np.array(raise_ms), np.array(clear_ms), late, edges, episodes
+
+
+def pattern_error(edges, episodes, on_seconds):
+    """How far the on phases of the event-driven pattern drift from on_seconds"""
+    # The last on phase of an episode is cut short by the clear
+    durations = [t2 - t1 for (t1, s1), (t2, s2) in zip(edges, edges[1:])
+                 if s1 and not s2 and not any(t1 < cleared <= t2 for _, cleared in episodes)]
+    return np.abs(np.array(durations) - on_seconds) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert transition to buzzer output latency, with a recording GPIO")
+    parser.add_argument("--episodes", type=int, default=15)
+    parser.add_argument("--frequency", type=float, default=0,
+                        help="drive a piezo through PWM at this pitch; 0 switches the pin")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-latency-ms", type=float, default=20.0,
+                        help="exit with status 1 if the event-driven buzzer is slower than this")
+    args = parser.parse_args()
+
+    failures = []
+
+    for mode in ("poll", "event"):
+        # The buzzer prints every alarm; keep the results readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            raise_ms, clear_ms, late, edges, episodes = run(mode, args)
+        print(f"{mode:>5}: alert raised to buzzer on:   p50 {np.nanpercentile(raise_ms, 50):8.3f} ms   "
+              f"max {np.nanmax(raise_ms):8.3f} ms   missed {int(np.isnan(raise_ms).sum())}/{len(raise_ms)}")
+        print(f"{mode:>5}: alert cleared to buzzer off: p50 {np.percentile(clear_ms, 50):8.3f} ms   "
+              f"max {clear_ms.max():8.3f} ms   sounded again after clearing {late}")
+        if mode == "event":
+            worst = max(np.nanmax(raise_ms), clear_ms.max())
+            if np.isnan(raise_ms).any() or late or worst > args.max_latency_ms:
+                failures.append(f"event-driven buzzer: worst {worst:.3f} ms, "
+                                f"{int(np.isnan(raise_ms).sum())} missed, {late} sounded after clearing")
+            error = pattern_error(edges, episodes, 0.5)
+            if len(error):
+                print(f"{mode:>5}: 0.5 s beep length error:     p50 {np.percentile(error, 50):8.3f} ms   "
+                      f"max {error.max():8.3f} ms")
+
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
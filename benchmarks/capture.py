@@ -0,0 +1,48 @@
+import random
+
+
+def sensor_fields(ppm):
+    """Rs and Rs/R0 that give ppm under hydrogen.ino's calibration curve"""
+    ratio = (2.2217 / ppm) ** (1 / 0.4130) if ppm > 0 else 1.0
+    return ratio * 3184541.46, ratio
+
+
+def sensor_line(seconds, sensor_id, rng, base_ppm=2.0):
+    """Build one data line exactly as hydrogen.ino prints it"""
+    ppm = max(0.0, base_ppm + rng.gauss(0, 0.3))
+    resistance, ratio = sensor_fields(ppm)
+    return f"{seconds}\t{sensor_id}\t{resistance:.2f}\t{ratio:.4f}\t{ppm:.2f} ppm\r\n"
+
+
+def synthesize_capture(size_bytes, seed=1):
+    """Return roughly size_bytes of hydrogen.ino output as bytes"""
+    rng = random.Random(seed)
+    out = [
+        "MICS-5524 Dual Hydrogen Sensor Readings\r\n",
+        "Warming up sensors...\r\n",
+    ]
+    out.extend(f"Warming up... {i} seconds remaining\r\n" for i in range(60, 0, -1))
+    out.append("Sensors ready!\r\n")
+    out.append("Time(s)\tSensor\tRs(ohms)\tRs/R0\tH2(ppm)\r\n")
+
+    total = sum(len(line) for line in out)
+    seconds = 61
+    while total < size_bytes:
+        for sensor_id in (1, 2):
+            roll = rng.random()
+            if roll < 0.01:
+                line = f"{seconds}\t1\tDebug: Raw=0.00 V=0.0000 (voltage too low)\r\n"
+            elif roll < 0.02:
+                line = f"{seconds}\t2\tWarning: sensor 2 voltage too low!\r\n"
+            else:
+                line = sensor_line(seconds, sensor_id, rng)
+            out.append(line)
+            total += len(line)
+        seconds += 1
+    return "".join(out).encode("ascii")
+
+
+def load_capture(path):
+    """Read a capture recorded from the serial port"""
+    with open(path, "rb") as f:
+        return f.read()
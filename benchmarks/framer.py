@@ -0,0 +1,62 @@
+import argparse
+import time
+
+from line_framer import LineFramer
+from benchmarks.capture import synthesize_capture, load_capture
+
+
+def legacy_frame(data, chunk_size):
+    """The original str buffer / split('\\n', 1) loop from run_serial_connection"""
+    count = 0
+    buffer = ""
+    for offset in range(0, len(data), chunk_size):
+        buffer += data[offset:offset + chunk_size].decode('utf-8', errors='ignore')
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            line = line.strip()
+            if line:
+                count += 1
+    return count
+
+
+def framer_frame(data, chunk_size):
+    count = 0
+    framer = LineFramer()
+    for offset in range(0, len(data), chunk_size):
+        count += len(framer.feed(data[offset:offset + chunk_size]))
+    return count
+
+
+def measure(func, data, chunk_size):
+    start = time.perf_counter()
+    lines = func(data, chunk_size)
+    elapsed = time.perf_counter() - start
+    return lines, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Line framer throughput")
+    parser.add_argument("--capture", help="recorded hydrogen.ino output (default: synthesized)")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="size of the synthesized capture")
+    parser.add_argument("--chunks", default="64,4096,65536,1048576",
+                        help="comma separated read sizes in bytes")
+    parser.add_argument("--legacy-max-chunk", type=int, default=262144,
+                        help="skip the quadratic legacy loop for larger chunks")
+    args = parser.parse_args()
+
+    data = load_capture(args.capture) if args.capture else synthesize_capture(int(args.size_mb * 1024 * 1024))
+    print(f"Capture: {len(data) / 1024 / 1024:.2f} MB")
+    print(f"{'chunk':>9} {'impl':>8} {'lines':>9} {'seconds':>9} {'lines/s':>12} {'MB/s':>8}")
+
+    for chunk_size in (int(c) for c in args.chunks.split(",")):
+        impls = [("framer", framer_frame)]
+        if chunk_size <= args.legacy_max_chunk:
+            impls.insert(0, ("legacy", legacy_frame))
+        for name, func in impls:
+            lines, elapsed = measure(func, data, chunk_size)
+            print(f"{chunk_size:>9} {name:>8} {lines:>9} {elapsed:>9.3f} "
+                  f"{lines / elapsed:>12.0f} {len(data) / elapsed / 1024 / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from history_db import HistoryDatabase
+from sensor_parser import ReadingKind
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite history sustained insert rate and rollup queries")
+    parser.add_argument("--path", help="database file to write (default: in a temporary directory)")
+    parser.add_argument("--records", type=int, default=500000)
+    parser.add_argument("--sensors", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=100.0, help="simulated readings per second of device time")
+    args = parser.parse_args()
+
+    directory = None
+    path = args.path
+    if not path:
+        directory = tempfile.mkdtemp(prefix="h2db-")
+        path = os.path.join(directory, "history.db")
+
+    db = HistoryDatabase(path, batch_size=args.batch_size, flush_interval=0.05,
+                         retention_seconds=0, queue_size=0)
+    try:
+        base = time.time() - args.records / args.rate
+        start = time.perf_counter()
+        for i in range(args.records):
+            db.append(base + i / args.rate, i % args.sensors + 1, ReadingKind.DATA, 1.5e6, 0.47, 2.0 + i % 7)
+        queued = time.perf_counter() - start
+        db.flush(timeout=3600)
+        elapsed = time.perf_counter() - start
+        stats = db.stats()
+        print(f"append (caller side): {args.records / queued:.0f} records/s")
+        print(f"sustained insert: {stats['written'] / elapsed:.0f} records/s "
+              f"in {stats['batches']} batches, {stats['dropped']} dropped")
+
+        end_time = base + args.records / args.rate
+        for resolution, seconds in (("minute", 3600), ("hour", args.records / args.rate)):
+            start = time.perf_counter()
+            rows = db.rollup(1, end_time - seconds, end_time, resolution)
+            elapsed = time.perf_counter() - start
+            print(f"rollup {resolution:<6} last {seconds:>7.0f} s: {len(rows):>5} rows in {elapsed * 1e3:.2f} ms")
+
+        start = time.perf_counter()
+        records = db.scan(end_time - 3600, end_time, sensor_id=1)
+        print(f"raw scan last 3600 s, one sensor: {len(records)} records "
+              f"in {(time.perf_counter() - start) * 1e3:.2f} ms")
+    finally:
+        db.close()
+        if directory:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
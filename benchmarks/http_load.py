@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import threading
+import time
+from multiprocessing import Process
+
+import numpy as np
+
+
+def run_server(server, port, sensors, rate):
+    """Web server on a LocalBridge whose sensors change `rate` times a second"""
+    import logging
+    import run_system
+
+    # Queue-depth warnings are expected under this load
+    logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+    bridge = run_system.LocalBridge(sensors)
+
+    def publish():
+        sent = 0
+        while True:
+            bridge.send(sent % sensors, {"value": round(sent * 0.37 % 200, 2), "resistance": 1523342.25,
+                                         "ratio": 0.4712, "timestamp": time.time(), "status": "connected"})
+            sent += 1
+            time.sleep(1 / rate)
+
+    threading.Thread(target=publish, daemon=True).start()
+    run_system.start_web_server(bridge, port, server, threads=32)
+
+
+async def read_response(reader):
+    """Read one response; returns (status, keep_alive, body length)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = 0
+    keep_alive = status_line.startswith(b"HTTP/1.1")
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            keep_alive = value.strip().lower() == "keep-alive"
+    await reader.readexactly(length)
+    return status, keep_alive, length
+
+
+async def client(port, path, deadline, latencies, sizes, errors):
+    request = (f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n"
+               "Connection: keep-alive\r\n\r\n").encode()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            start = time.perf_counter()
+            writer.write(request)
+            status, keep_alive, length = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            sizes.append(length)
+            if status != 200:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors.append("connection")
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, path, clients, duration):
+    latencies, sizes, errors = [], [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(port, path, deadline, latencies, sizes, errors) for _ in range(clients)))
+    return latencies, sizes, errors
+
+
+def wait_for_port(port, timeout=20):
+    import socket
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-client load test of /api/sensors per server mode")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--sensors", type=int, default=64)
+    parser.add_argument("--rate", type=float, default=64.0, help="sensor updates per second on the server")
+    parser.add_argument("--path", default="/api/sensors")
+    parser.add_argument("--servers", default="dev,waitress")
+    parser.add_argument("--port", type=int, default=5100)
+    args = parser.parse_args()
+
+    for offset, server in enumerate(args.servers.split(",")):
+        port = args.port + offset
+        process = Process(target=run_server, args=(server, port, args.sensors, args.rate), daemon=True)
+        process.start()
+        try:
+            wait_for_port(port)
+            time.sleep(0.5)
+            latencies, sizes, errors = asyncio.run(load(port, args.path, args.clients, args.duration))
+        finally:
+            process.kill()
+            process.join()
+        latencies = np.array(latencies) * 1e3
+        print(f"{server:<9} {len(latencies) / args.duration:8.0f} req/s   p50 {np.percentile(latencies, 50):7.2f} ms   "
+              f"p99 {np.percentile(latencies, 99):7.2f} ms   {np.mean(sizes):6.0f} B/response   {len(errors)} errors")
+
+
+if __name__ == "__main__":
+    main()
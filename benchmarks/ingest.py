@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import time
+
+from ingest import IngestionEngine
+from sensor_config import SensorConfig
+from benchmarks.capture import synthesize_capture
+from benchmarks.simulator import open_pty_pair
+
+
+async def feed(master, data, chunk_size, delay):
+    """Write data to one pty master in chunks, yielding to the loop between writes"""
+    loop = asyncio.get_running_loop()
+    for offset in range(0, len(data), chunk_size):
+        chunk = data[offset:offset + chunk_size]
+        while chunk:
+            try:
+                written = os.write(master, chunk)
+                chunk = chunk[written:]
+            except BlockingIOError:
+                await asyncio.sleep(0.001)
+        await asyncio.sleep(delay)
+
+
+async def run(args):
+    masters = []
+    paths = []
+    for _ in range(args.ports):
+        master, path = open_pty_pair()
+        os.set_blocking(master, False)
+        masters.append(master)
+        paths.append(path)
+
+    config = SensorConfig([{"port": path, "channel": channel}
+                           for path in paths for channel in (1, 2)])
+    engine = IngestionEngine(config, settle_time=0, reconnect_delay=0.2)
+    stream = engine.consume()
+    engine_task = asyncio.create_task(engine.run())
+
+    # Wait until every port is connected
+    while not all(state.connected for state in engine.states.values()):
+        await asyncio.sleep(0.01)
+
+    data = synthesize_capture(int(args.size_kb * 1024))
+    start = time.perf_counter()
+    feeders = [asyncio.create_task(feed(master, data, args.chunk, args.delay)) for master in masters]
+
+    if args.unplug:
+        # Unplug the first board halfway through; the others must keep flowing
+        await asyncio.sleep(args.unplug)
+        os.close(masters[0])
+        feeders[0].cancel()
+        print(f"Closed {paths[0]}")
+
+    await asyncio.gather(*feeders, return_exceptions=True)
+
+    per_sensor = [0] * config.count
+    latest = time.perf_counter()
+    while True:
+        try:
+            sensor_index, reading, received = await asyncio.wait_for(stream.get(), 0.5)
+        except asyncio.TimeoutError:
+            break
+        per_sensor[sensor_index] += 1
+        latest = time.perf_counter()
+
+    elapsed = latest - start
+    total = sum(per_sensor)
+    print(f"{args.ports} ports, {total} readings in {elapsed:.2f} s: {total / elapsed:.0f} readings/s")
+    for port, stats in engine.stats().items():
+        print(f"  {port}: {stats}")
+
+    engine.stop()
+    await engine_task
+    for master in masters[1 if args.unplug else 0:]:
+        os.close(master)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-port asyncio ingestion over pty pairs")
+    parser.add_argument("--ports", type=int, default=4)
+    parser.add_argument("--size-kb", type=float, default=256, help="capture size written to each port")
+    parser.add_argument("--chunk", type=int, default=512, help="bytes per write")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between writes")
+    parser.add_argument("--unplug", type=float, default=0.0,
+                        help="close the first port's pty after this many seconds")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+
+from line_framer import LineFramer
+from sensor_parser import parse_lines
+from benchmarks.capture import synthesize_capture, load_capture
+
+
+def legacy_parse(lines):
+    """The original process_sensor_data checks, minus the UI queue"""
+    results = []
+    for data_line in lines:
+        if any(skip_word in data_line for skip_word in ["MICS-5524", "Warming", "Sensors ready", "Time(s)"]):
+            continue
+        parts = data_line.split('\t')
+        if len(parts) >= 2:
+            try:
+                sensor_id = int(parts[1])
+                if sensor_id not in [1, 2]:
+                    continue
+                if "Debug:" in data_line or "Warning:" in data_line:
+                    continue
+                if len(parts) >= 5:
+                    resistance = parts[2]
+                    ratio = parts[3]
+                    ppm_part = parts[4].split()[0]
+                    float(ppm_part)
+                    float(resistance)
+                    float(ratio)
+                    results.append((sensor_id - 1, ppm_part, resistance, ratio))
+            except (ValueError, IndexError):
+                continue
+    # The UI then converted the strings again on every tick
+    for _, ppm, resistance, ratio in results:
+        float(ppm)
+        float(resistance)
+        float(ratio)
+    return len(results)
+
+
+def typed_parse(lines):
+    return len(parse_lines(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensor line parser throughput")
+    parser.add_argument("--capture", help="recorded hydrogen.ino output (default: synthesized)")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="size of the synthesized capture")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    data = load_capture(args.capture) if args.capture else synthesize_capture(int(args.size_mb * 1024 * 1024))
+    lines = LineFramer().feed(data)
+    print(f"Lines: {len(lines)}")
+
+    for name, func in (("legacy", legacy_parse), ("typed", typed_parse)):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func(lines)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:>8}: {len(lines) / best:>12.0f} lines/s ({best:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
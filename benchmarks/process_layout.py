@@ -0,0 +1,148 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import Process
+
+import numpy as np
+
+
+def children(pid):
+    """Direct child pids, from /proc"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def pss_kb(pid):
+    """Proportional set size: shared pages are split between the processes using them"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def tree_pss_kb(pid):
+    return pss_kb(pid) + sum(tree_pss_kb(child) for child in children(pid))
+
+
+def publish(bridge, sensors, rate, duration):
+    """Stand-in for the GUI: send a fresh snapshot of one sensor at a time"""
+    sent = 0
+    start = time.time()
+    while time.time() - start < duration:
+        sensor_index = sent % sensors
+        bridge.send(sensor_index, {"value": float(sent), "resistance": 1.5e6, "ratio": 0.47,
+                                   "timestamp": time.time(), "status": "connected"})
+        sent += 1
+        time.sleep(max(0.0, start + sent / rate - time.time()))
+
+
+def measure_stream(port, duration, latencies):
+    """Read /api/stream and record send-to-browser latency of each sensor event"""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("GET", "/api/stream")
+    response = connection.getresponse()
+    end = time.time() + duration
+    while time.time() < end:
+        line = response.readline()
+        if line.startswith(b"data: {"):
+            data = json.loads(line[6:])["data"]
+            if data.get("timestamp"):
+                latencies.append(time.time() - data["timestamp"])
+    connection.close()
+
+
+def wait_for_server(port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/sensors")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("web server did not start")
+
+
+def run_layout(layout, args):
+    import run_system
+
+    sensors = run_system.sensor_config.count
+    if layout == "processes":
+        bridge = run_system.create_data_bridge()
+        bridge.start_bridge_process()
+        Process(target=run_system.start_web_server, args=(None, args.port), daemon=True).start()
+        wait_for_server(args.port)
+        gui = Process(target=publish, args=(bridge, sensors, args.rate, args.duration), daemon=True)
+    else:
+        bridge = run_system.LocalBridge(sensors)
+        threading.Thread(target=run_system.start_web_server, args=(bridge, args.port), daemon=True).start()
+        wait_for_server(args.port)
+        gui = threading.Thread(target=publish, args=(bridge, sensors, args.rate, args.duration), daemon=True)
+
+    latencies = []
+    reader = threading.Thread(target=measure_stream, args=(args.port, args.duration + 0.5, latencies))
+    reader.start()
+    time.sleep(0.2)
+    gui.start()
+    time.sleep(args.duration / 2)
+    pss = tree_pss_kb(os.getpid())
+    reader.join()
+
+    latencies = np.array(latencies) * 1e3
+    print(json.dumps({
+        "layout": layout,
+        "events": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "pss_mb": pss / 1024,
+    }))
+    sys.stdout.flush()
+    # The web server never returns: stop every child, then exit without joining threads
+    for child in multiprocessing.active_children():
+        child.kill()
+    if run_system.data_bridge is not None:
+        run_system.data_bridge.close()
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Three-process layout vs single process: latency and memory")
+    parser.add_argument("--layout", choices=["processes", "single"], help="run one layout (used internally)")
+    parser.add_argument("--rate", type=float, default=20.0, help="snapshots sent per second")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=5090)
+    args = parser.parse_args()
+
+    if args.layout:
+        run_layout(args.layout, args)
+        return
+
+    # Each layout in a fresh interpreter so neither inherits the other's memory
+    for layout in ("processes", "single"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.process_layout", "--layout", layout, "--rate", str(args.rate),
+             "--duration", str(args.duration), "--port", str(args.port)],
+            capture_output=True, text=True, timeout=args.duration + 60,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{layout:<10} {result['events']:5} events  GUI-to-browser p50 {result['p50_ms']:6.2f} ms  "
+              f"p99 {result['p99_ms']:6.2f} ms  memory (PSS) {result['pss_mb']:6.1f} MB")
+    print("GUI itself excluded: Tk costs the same in both layouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import random
+import time
+
+from binary_protocol import create_decoder, encode_frame
+from benchmarks.capture import sensor_line
+
+
+def build_streams(count, seed=1):
+    """The same readings encoded as text lines and as binary frames"""
+    rng = random.Random(seed)
+    text = []
+    binary = []
+    for seq in range(count):
+        sensor_id = seq % 2 + 1
+        line = sensor_line(seq // 2, sensor_id, rng)
+        _, _, resistance, ratio, ppm = line.split('\t')
+        text.append(line)
+        binary.append(encode_frame(0, sensor_id, seq, seq * 500, float(resistance), float(ratio),
+                                   float(ppm.split()[0])))
+    return "".join(text).encode("ascii"), b"".join(binary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASCII vs binary serial protocol decoding")
+    parser.add_argument("--readings", type=int, default=100000)
+    parser.add_argument("--chunk", type=int, default=4096, help="read size in bytes")
+    args = parser.parse_args()
+
+    streams = dict(zip(("ascii", "binary"), build_streams(args.readings)))
+    for protocol, data in streams.items():
+        decoder = create_decoder(protocol)
+        start = time.perf_counter()
+        decoded = 0
+        for offset in range(0, len(data), args.chunk):
+            decoded += len(decoder.feed(data[offset:offset + args.chunk]))
+        elapsed = time.perf_counter() - start
+        print(f"{protocol:>7}: {len(data) / decoded:5.1f} bytes/reading, "
+              f"{decoded / elapsed:>10.0f} readings/s, {decoder.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+from reading_log import ReadingLog, RECORD
+from sensor_parser import ReadingKind
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segment log write rate, flush latency and range scans")
+    parser.add_argument("--path", help="directory to write to (default: a temporary directory)")
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--sensors", type=int, default=64)
+    parser.add_argument("--segment-mb", type=float, default=8)
+    parser.add_argument("--rate", type=float, default=100.0, help="simulated readings per second of device time")
+    args = parser.parse_args()
+
+    path = args.path or tempfile.mkdtemp(prefix="h2log-")
+    log = ReadingLog(path, segment_bytes=int(args.segment_mb * 1024 * 1024), flush_interval=0)
+    try:
+        base = time.time() - args.records / args.rate
+        start = time.perf_counter()
+        for i in range(args.records):
+            log.append(base + i / args.rate, i % args.sensors + 1, ReadingKind.DATA, 1.5e6, 0.47, 2.0)
+        elapsed = time.perf_counter() - start
+        print(f"append: {args.records / elapsed:.0f} records/s "
+              f"({args.records * RECORD.size / elapsed / 1024 / 1024:.1f} MB/s), "
+              f"{len(log.segments())} segments")
+
+        start = time.perf_counter()
+        log.flush()
+        print(f"flush (msync of active segment): {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        end_time = base + args.records / args.rate
+        for seconds in (60, 3600, args.records / args.rate):
+            start = time.perf_counter()
+            records = log.scan(end_time - seconds, end_time, sensor_id=1)
+            elapsed = time.perf_counter() - start
+            print(f"scan last {seconds:>9.0f} s, one sensor: {len(records):>7} records in {elapsed * 1e3:.2f} ms")
+    finally:
+        log.close()
+        if not args.path:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import time
+
+from ring_buffer import SensorHistory, rolling_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ring buffer append and window query cost")
+    parser.add_argument("--sensors", type=int, default=64)
+    parser.add_argument("--capacity", type=int, default=3600)
+    parser.add_argument("--appends", type=int, default=200000)
+    parser.add_argument("--window", type=float, default=60.0, help="seconds for since()/stats queries")
+    args = parser.parse_args()
+
+    history = SensorHistory(args.sensors, args.capacity)
+    start = time.perf_counter()
+    for i in range(args.appends):
+        history.append(i % args.sensors, 1000.0 + i / args.sensors, 1.5e6, 0.47, 2.0 + (i % 100) / 100)
+    elapsed = time.perf_counter() - start
+    print(f"append: {args.appends / elapsed:.0f}/s ({elapsed / args.appends * 1e6:.2f} us each)")
+
+    now = 1000.0 + args.appends / args.sensors
+    queries = 2000
+    start = time.perf_counter()
+    for i in range(queries):
+        rolling_stats(history.since(i % args.sensors, args.window, now))
+    elapsed = time.perf_counter() - start
+    print(f"since({args.window:g}s) + stats: {elapsed / queries * 1e6:.1f} us per sensor")
+
+    start = time.perf_counter()
+    history.stats(args.window, now)
+    print(f"stats for all {args.sensors} sensors: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    memory = sum(ring.buffer.nbytes for ring in history.rings)
+    print(f"memory: {memory / 1024 / 1024:.1f} MB total, fixed at allocation")
+
+
+if __name__ == "__main__":
+    main()
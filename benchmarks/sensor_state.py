@@ -0,0 +1,65 @@
+import argparse
+import time
+
+from sensor_config import SensorConfig
+from sensor_state import SensorState
+
+
+def make_config(count):
+    return SensorConfig([{"channel": channel} for channel in range(1, count + 1)])
+
+
+def legacy_tick(sensor_data, threshold, now):
+    """The per-sensor checks update_ui did with a Python loop over dicts of strings"""
+    alerts = set()
+    stale = 0
+    for sensor_index, data in enumerate(sensor_data):
+        if data["value"] != "--":
+            value = float(data["value"])
+            if value > threshold:
+                alerts.add(sensor_index + 1)
+        if data["timestamp"] and now - data["timestamp"] > 5:
+            stale += 1
+        connected = data["timestamp"] and now - data["timestamp"] < 10
+    return alerts, stale
+
+
+def state_tick(state, now):
+    status = state.evaluate(now)
+    alerts = {index + 1 for index in status.alert.nonzero()[0].tolist()}
+    return alerts, int(status.stale.sum())
+
+
+def time_per_tick(func, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        func()
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-tick threshold/staleness cost vs channel count")
+    parser.add_argument("--counts", default="2,16,64,256,1024")
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'channels':>9} {'legacy us':>10} {'vector us':>10}")
+    for count in (int(c) for c in args.counts.split(",")):
+        now = time.time()
+        state = SensorState(make_config(count))
+        sensor_data = []
+        for index in range(count):
+            ppm = 200.0 if index % 7 == 0 else 2.0
+            age = 6.0 if index % 5 == 0 else 0.5
+            state.update(index, ppm, 1.5e6, 0.47, now - age)
+            sensor_data.append({"value": f"{ppm:.2f}", "resistance": "1500000.00",
+                                "ratio": "0.4700", "timestamp": now - age})
+
+        legacy = time_per_tick(lambda: legacy_tick(sensor_data, 150, now), args.ticks)
+        vector = time_per_tick(lambda: state_tick(state, now), args.ticks)
+        assert legacy_tick(sensor_data, 150, now) == state_tick(state, now)
+        print(f"{count:>9} {legacy * 1e6:>10.1f} {vector * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+import argparse
+import heapq
+import json
+import math
+import os
+import pty
+import random
+import re
+import select
+import threading
+import time
+import tty
+
+from binary_protocol import SELECT_ASCII, SELECT_BINARY, encode_frame
+from sensor_config import DEFAULT_CONFIG_PATH
+from sensor_parser import ReadingKind
+from benchmarks.capture import load_capture, sensor_fields
+
+# Stop rendering ahead once this much output waits for a slow reader
+HIGH_WATER = 64 * 1024
+
+TIMESTAMP = re.compile(rb"(\d+)\t")
+
+
+def open_pty_pair():
+    """Return (master_fd, slave_path) for a raw pty that looks like a serial port"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    os.close(slave)
+    return master, path
+
+
+def leak_ppm(elapsed, peak, rise_rate, hold):
+    """Extra ppm elapsed seconds into a leak: linear rise, hold, exponential decay"""
+    rise = peak / rise_rate
+    if elapsed < rise:
+        return elapsed * rise_rate
+    if elapsed < rise + hold:
+        return peak
+    return peak * math.exp(-(elapsed - rise - hold) / 10.0)
+
+
+def synthesize(rng, sensors=2, warmup=60, interval=1.0, duration=None, base_ppm=2.0, noise=0.3,
+               leak_every=None, debug_rate=0.01, warning_rate=0.01, garbage_rate=0.0):
+    """hydrogen.ino's output as (board seconds, kind, sensor id, value) events
+
+    kind is "text" (banner and header, skipped in binary mode), "data"
+    (value is ppm), "debug", "warning" or "garbage" (value is bytes).
+    Leaks start every leak_every seconds on average, on a random sensor.
+    Runs for duration seconds after the warm-up, or forever.
+    """
+    yield 0.0, "text", 0, "MICS-5524 Dual Hydrogen Sensor Readings"
+    yield 0.0, "text", 0, "Warming up sensors..."
+    for remaining in range(warmup, 0, -1):
+        yield float(warmup - remaining), "text", 0, f"Warming up... {remaining} seconds remaining"
+    yield float(warmup), "text", 0, "Sensors ready!"
+    yield float(warmup), "text", 0, "Time(s)\tSensor\tRs(ohms)\tRs/R0\tH2(ppm)"
+
+    seconds = float(warmup)
+    leaks = {}
+    next_leak = seconds + rng.expovariate(1 / leak_every) if leak_every else math.inf
+    while duration is None or seconds < warmup + duration:
+        if seconds >= next_leak:
+            leaks[rng.randint(1, sensors)] = (seconds, rng.uniform(100, 600), rng.uniform(5, 50),
+                                              rng.uniform(5, 20))
+            next_leak = seconds + rng.expovariate(1 / leak_every)
+        for sensor_id in range(1, sensors + 1):
+            # hydrogen.ino reads its sensors 100 ms apart
+            at = seconds + (sensor_id - 1) * 0.1
+            if garbage_rate and rng.random() < garbage_rate:
+                yield at, "garbage", sensor_id, bytes(rng.randrange(256) for _ in range(rng.randint(1, 16)))
+            roll = rng.random()
+            if roll < debug_rate:
+                yield at, "debug", sensor_id, "Debug: Raw=0.00 V=0.0000 (voltage too low)"
+            elif roll < debug_rate + warning_rate:
+                yield at, "warning", sensor_id, f"Warning: sensor {sensor_id} voltage too low!"
+            else:
+                ppm = max(0.0, base_ppm + rng.gauss(0, noise))
+                if sensor_id in leaks:
+                    started, peak, rise_rate, hold = leaks[sensor_id]
+                    extra = leak_ppm(at - started, peak, rise_rate, hold)
+                    if at - started > peak / rise_rate + hold and extra < 0.5:
+                        del leaks[sensor_id]
+                    ppm += extra
+                yield at, "data", sensor_id, ppm
+        seconds += interval
+
+
+def replay(data, loop=False):
+    """Events replaying a recorded capture, paced by each line's timestamp
+
+    Lines without one (banner, header, partial lines) go out right after
+    the previous line. With loop, the capture repeats with times shifted
+    to follow on.
+    """
+    lines = data.splitlines(keepends=True)
+    offset = 0.0
+    while True:
+        last = 0.0
+        first = None
+        for line in lines:
+            match = TIMESTAMP.match(line)
+            if match:
+                seconds = float(match.group(1))
+                if first is None:
+                    first = seconds
+                last = max(last, seconds - first)
+            yield offset + last, "raw", 0, line
+        if not loop or first is None:
+            return
+        offset += last + 1.0
+
+
+class VirtualBoard:
+    """One simulated hydrogen.ino on its own pty
+
+    Answers the host's protocol select like the sketch: 'B' switches to
+    COBS/CRC16 frames, 'A' back to text lines.
+    """
+
+    def __init__(self, events):
+        self.master, self.path = open_pty_pair()
+        os.set_blocking(self.master, False)
+        self.events = iter(events)
+        self.next_event = next(self.events, None)
+        self.binary = False
+        self.seq = 0
+        self.pending = bytearray()
+        self.lines = 0
+        self.written = 0
+        self.max_lag = 0.0
+        self.hung_up_until = 0.0
+
+    def render(self, event):
+        at, kind, sensor_id, value = event
+        if kind == "raw" or kind == "garbage":
+            return value
+        if self.binary:
+            if kind == "text":
+                return b""
+            self.seq += 1
+            millis = int(at * 1000)
+            if kind == "data":
+                resistance, ratio = sensor_fields(value)
+                return encode_frame(ReadingKind.DATA, sensor_id, self.seq, millis, resistance, ratio, value)
+            frame_kind = ReadingKind.DEBUG if kind == "debug" else ReadingKind.WARNING
+            return encode_frame(frame_kind, sensor_id, self.seq, millis)
+        if kind == "text":
+            return f"{value}\r\n".encode()
+        if kind == "data":
+            resistance, ratio = sensor_fields(value)
+            value = f"{resistance:.2f}\t{ratio:.4f}\t{value:.2f} ppm"
+        return f"{int(at)}\t{sensor_id}\t{value}\r\n".encode()
+
+    def handle_commands(self):
+        try:
+            commands = os.read(self.master, 1024)
+        except OSError:
+            # EIO while no one has the port open; it stays readable, so
+            # look again in a while rather than spin
+            self.hung_up_until = time.monotonic() + 0.05
+            return
+        for command in commands:
+            command = bytes((command,))
+            if command == SELECT_BINARY and not self.binary:
+                self.binary = True
+                # Delimiter so the host resyncs after any text
+                self.pending += b"\0"
+            elif command == SELECT_ASCII:
+                self.binary = False
+
+    def flush(self):
+        try:
+            written = os.write(self.master, self.pending)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            # Nothing is reading the port; a real UART would drop it too
+            written = len(self.pending)
+        del self.pending[:written]
+        self.written += written
+
+    def close(self):
+        os.close(self.master)
+
+
+class Simulator:
+    """Virtual boards on pty pairs, paced by one thread
+
+    speed scales board time: 1 is real time, 10 ten times faster, 0 as
+    fast as the readers take it. Point a serial port, a sensors.json
+    entry or run_system.py --serial-port at board.path.
+    """
+
+    def __init__(self, boards, speed=1.0):
+        self.boards = boards
+        self.speed = speed
+        self.stopped = threading.Event()
+        self.done = threading.Event()
+        self.thread = None
+        self.started = None
+
+    @property
+    def paths(self):
+        return [board.path for board in self.boards]
+
+    def start(self):
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def due(self, at):
+        """Monotonic time an event at board time at is due"""
+        return self.started + (at / self.speed if self.speed else 0.0)
+
+    def run(self):
+        masters = {board.master: board for board in self.boards}
+        queue = [(self.due(board.next_event[0]), index) for index, board in enumerate(self.boards)
+                 if board.next_event is not None]
+        heapq.heapify(queue)
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            full = []
+            while queue and queue[0][0] <= now:
+                due, index = heapq.heappop(queue)
+                board = self.boards[index]
+                if len(board.pending) >= HIGH_WATER:
+                    # Behind a slow reader: hold this board, not the others
+                    full.append((due, index))
+                    continue
+                board.pending += board.render(board.next_event)
+                board.lines += 1
+                if self.speed:
+                    board.max_lag = max(board.max_lag, now - due)
+                board.next_event = next(board.events, None)
+                if board.next_event is not None:
+                    heapq.heappush(queue, (self.due(board.next_event[0]), index))
+            for entry in full:
+                heapq.heappush(queue, entry)
+
+            for board in self.boards:
+                if board.pending:
+                    board.flush()
+            waiting = [board.master for board in self.boards if board.pending]
+            if not queue and not waiting:
+                self.done.set()
+                break
+
+            # Sleep until the next event is due, a full pty drains or the host sends a command
+            timeout = 0.1
+            if queue and not full:
+                timeout = min(timeout, max(0.0, queue[0][0] - time.monotonic()))
+            listening = [board.master for board in self.boards if board.hung_up_until <= now]
+            if len(listening) < len(masters):
+                timeout = min(timeout, 0.05)
+            readable, _, _ = select.select(listening, waiting, [], timeout)
+            for master in readable:
+                masters[master].handle_commands()
+
+    def wait(self, timeout=None):
+        """True once every board has sent everything"""
+        return self.done.wait(timeout)
+
+    def stats(self):
+        return [{"path": board.path, "lines": board.lines, "bytes": board.written,
+                 "max_lag_ms": board.max_lag * 1e3} for board in self.boards]
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        for board in self.boards:
+            board.close()
+
+
+def write_config(path, boards, sensors):
+    """sensors.json for the simulated boards, keeping the other settings of the default config"""
+    data = {}
+    if os.path.exists(DEFAULT_CONFIG_PATH):
+        with open(DEFAULT_CONFIG_PATH) as f:
+            data = json.load(f)
+    data["sensors"] = [{"name": f"Board {number} sensor {channel}", "port": board.path, "channel": channel}
+                       for number, board in enumerate(boards, 1) for channel in range(1, sensors + 1)]
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated hydrogen.ino boards on pty pairs")
+    parser.add_argument("--boards", type=int, default=1)
+    parser.add_argument("--sensors", type=int, default=2, help="sensors per board")
+    parser.add_argument("--speed", type=float, default=1.0, help="times real time; 0 for as fast as possible")
+    parser.add_argument("--duration", type=float, help="board seconds of readings after the warm-up")
+    parser.add_argument("--warmup", type=int, default=60, help="warm-up countdown seconds (hydrogen.ino: 60)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between readings of a sensor")
+    parser.add_argument("--leak-every", type=float, help="mean board seconds between leaks")
+    parser.add_argument("--debug-rate", type=float, default=0.01)
+    parser.add_argument("--warning-rate", type=float, default=0.01)
+    parser.add_argument("--garbage-rate", type=float, default=0.0, help="chance of noise bytes before a line")
+    parser.add_argument("--replay", help="replay a recorded capture instead of synthesizing")
+    parser.add_argument("--loop", action="store_true", help="repeat the replayed capture")
+    parser.add_argument("--config", help="write a sensors.json for the boards here")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    capture = load_capture(args.replay) if args.replay else None
+    boards = []
+    for number in range(args.boards):
+        if capture is not None:
+            events = replay(capture, args.loop)
+        else:
+            events = synthesize(random.Random(args.seed + number), args.sensors, args.warmup, args.interval,
+                                args.duration, leak_every=args.leak_every, debug_rate=args.debug_rate,
+                                warning_rate=args.warning_rate, garbage_rate=args.garbage_rate)
+        boards.append(VirtualBoard(events))
+    simulator = Simulator(boards, args.speed)
+
+    for number, board in enumerate(boards, 1):
+        print(f"Board {number}: {board.path}")
+    if args.config:
+        write_config(args.config, boards, args.sensors)
+        print(f"Config: HYDROGEN_SENSOR_CONFIG={args.config} python run_system.py")
+    else:
+        print(f"Try: python run_system.py --serial-port {boards[0].path}")
+
+    simulator.start()
+    try:
+        while not simulator.wait(1.0):
+            pass
+        print("All boards finished")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+        for stats in simulator.stats():
+            print(f"  {stats['path']}: {stats['lines']} lines, {stats['bytes']} bytes, "
+                  f"max lag {stats['max_lag_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.simulator import open_pty_pair
+from benchmarks.suite import e2e_config
+
+MARK = re.compile(r"Startup \+([0-9.]+)s: (.+)")
+
+
+def run_board(master, delay, stop):
+    """Stand-in Arduino: silent for delay seconds (booting), then a reading every 250 ms"""
+    time.sleep(delay)
+    seconds = 0
+    while not stop.is_set():
+        try:
+            os.write(master, f"{seconds}\t1\t1523342.25\t0.4712\t12.50 ppm\n"
+                             f"{seconds}\t2\t1498211.75\t0.4633\t13.10 ppm\n".encode())
+        except OSError:
+            return
+        seconds += 1
+        time.sleep(0.25)
+
+
+def boot_once(args):
+    """Start run_system.py and return its startup marks: {phase: seconds}"""
+    master, path = open_pty_pair()
+    stop = threading.Event()
+    board = threading.Thread(target=run_board, args=(master, args.board_delay, stop), daemon=True)
+    command = [sys.executable, "-u", "run_system.py", f"--{args.mode}", "--serial-port", path]
+    # Never the Pi's real pins or data/ directory, whatever the machine
+    config_path = e2e_config(path)
+    env = dict(os.environ, PYTHONUNBUFFERED="1", HYDROGEN_SENSOR_CONFIG=config_path, HYDROGEN_GPIO="mock")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+    board.start()
+    marks = {}
+    deadline = time.monotonic() + args.timeout
+    try:
+        for line in process.stdout:
+            match = MARK.match(line)
+            if match:
+                marks.setdefault(match.group(2), float(match.group(1)))
+            if args.done in marks or time.monotonic() > deadline:
+                break
+    finally:
+        stop.set()
+        process.kill()
+        process.wait()
+        board.join()
+        os.close(master)
+        os.remove(config_path)
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process start to first reading, per boot phase")
+    parser.add_argument("--mode", choices=["headless", "single-process"], default="headless",
+                        help="single-process needs a display")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--board-delay", type=float, default=0.0,
+                        help="seconds before the simulated board talks (USB boards reset on open)")
+    parser.add_argument("--timeout", type=float, default=20.0)
+    args = parser.parse_args()
+    args.done = "first reading published" if args.mode == "headless" else "first reading on screen"
+
+    runs = []
+    for _ in range(args.runs):
+        marks = boot_once(args)
+        if args.done not in marks:
+            print(f"No first reading within {args.timeout:g}s; marks: {marks}")
+            return
+        runs.append(marks)
+
+    # Phases in the order they happened, median over runs
+    phases = sorted(runs[0], key=runs[0].get)
+    print(f"{args.mode}, board talking after {args.board_delay:g}s, median of {args.runs} boots:")
+    for phase in phases:
+        times = [marks[phase] for marks in runs if phase in marks]
+        print(f"  {np.median(times):7.3f}s  {phase}")
+    total = [marks[args.done] for marks in runs]
+    print(f"Process start to first reading: median {np.median(total):.3f}s, max {max(total):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
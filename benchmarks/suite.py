@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from multiprocessing import Process
+
+import numpy as np
+
+from binary_protocol import create_decoder, encode_frame
+from gpio_backend import RecordingGPIO
+from monitor_engine import MonitorEngine
+from sensor_config import DEFAULT_CONFIG_PATH, SensorConfig
+from sensor_parser import ReadingKind, parse_line
+from benchmarks.capture import sensor_fields, synthesize_capture
+from benchmarks.http_load import load, run_server, wait_for_port
+from benchmarks.simulator import Simulator, VirtualBoard, open_pty_pair
+
+SECTIONS = ["parse", "ui", "bridge", "http", "e2e"]
+
+# run_system.py serves on this port; the e2e section needs it free
+WEB_PORT = 5000
+
+
+def summarize(seconds, prefix):
+    """p50/p99/max in ms of a list of durations in seconds"""
+    values = np.array(seconds) * 1e3
+    return {f"{prefix}_p50_ms": float(np.percentile(values, 50)),
+            f"{prefix}_p99_ms": float(np.percentile(values, 99)),
+            f"{prefix}_max_ms": float(values.max())}
+
+
+def data_line(seconds, sensor_id, ppm):
+    resistance, ratio = sensor_fields(ppm)
+    return f"{seconds}\t{sensor_id}\t{resistance:.2f}\t{ratio:.4f}\t{ppm:.2f} ppm"
+
+
+def bench_parse(args):
+    """Lines/s through process_sensor_data and through the stream decoders"""
+    capture = synthesize_capture(int(args.parse_kb * 1024))
+    lines = capture.decode("ascii").splitlines()
+    config = SensorConfig([{"channel": 1}, {"channel": 2}])
+    monitor = MonitorEngine(config, "/dev/null", store=None, report_interval=0)
+    start = time.perf_counter()
+    for line in lines:
+        monitor.process_sensor_data(line)
+    per_line = time.perf_counter() - start
+
+    decoder = create_decoder("ascii")
+    start = time.perf_counter()
+    decoded = 0
+    for offset in range(0, len(capture), 512):
+        decoded += len(decoder.feed(capture[offset:offset + 512]))
+    text = time.perf_counter() - start
+
+    frames = b"".join(encode_frame(ReadingKind.DATA, 1 + n % 2, n, n * 500, 1.5e6, 0.47, 2.0 + n % 7)
+                      for n in range(len(lines)))
+    decoder = create_decoder("binary")
+    start = time.perf_counter()
+    for offset in range(0, len(frames), 512):
+        decoder.feed(frames[offset:offset + 512])
+    binary = time.perf_counter() - start
+
+    return {"process_sensor_data_lines_per_s": len(lines) / per_line,
+            "text_decoder_lines_per_s": decoded / text,
+            "text_decoder_mb_per_s": len(capture) / text / 1e6,
+            "binary_decoder_frames_per_s": len(lines) / binary}
+
+
+def bench_ui(args):
+    """update_ui cost per tick on a hidden Tk root, with every sensor changing and with none"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        return {"skipped": f"no Tk display ({e}); run under xvfb-run"}
+    root.withdraw()
+    import main
+
+    master, path = open_pty_pair()
+    config = SensorConfig([{"port": path, "channel": channel} for channel in range(1, args.sensors + 1)])
+    monitor = MonitorEngine(config, path, store=None, settle_time=0, report_interval=0)
+    try:
+        app = main.HydrogenMonitorApp(root, serial_port=path, monitor=monitor, gpio=RecordingGPIO())
+    except tk.TclError as e:
+        root.destroy()
+        os.close(master)
+        return {"skipped": f"GUI could not start on a hidden root: {e}"}
+
+    def tick():
+        start = time.perf_counter()
+        app.update_ui()
+        root.update_idletasks()
+        return time.perf_counter() - start
+
+    changed = []
+    idle = []
+    for n in range(args.ticks):
+        readings = [parse_line(data_line(n, channel, 2.0 + (n + channel) % 50))
+                    for channel in range(1, args.sensors + 1)]
+        monitor.process_readings(readings, received=time.time())
+        changed.append(tick())
+        idle.append(tick())
+    calls = app.renderer.stats()["widget_calls_per_tick"]
+    app.on_closing()
+    os.close(master)
+
+    results = {"sensors": args.sensors, "widget_calls_per_tick": calls}
+    results.update(summarize(changed, "changed_tick"))
+    results.update(summarize(idle, "idle_tick"))
+    return results
+
+
+def run_quiet(target, *args):
+    """Child process entry with stdout discarded; the bridge prints every update"""
+    sys.stdout = open(os.devnull, "w")
+    target(*args)
+
+
+def bench_bridge(args):
+    """DataBridge: send cost, shared-table read cost, send-to-visible latency in the reader"""
+    import run_system
+
+    bridge = run_system.DataBridge(args.sensors)
+    process = Process(target=run_quiet, args=(bridge.run_data_bridge,), daemon=True)
+    process.start()
+    try:
+        sends = []
+        table = []
+        pushed = []
+        for n in range(args.updates):
+            data = {"value": float(n), "resistance": 1.5e6, "ratio": 0.47, "timestamp": time.time(),
+                    "status": "connected"}
+            version = bridge.get_version()
+            start = time.perf_counter()
+            bridge.send(n % args.sensors, data)
+            sends.append(time.perf_counter() - start)
+            while bridge.get_version() == version:
+                # Let the queue's feeder thread have the GIL
+                time.sleep(0)
+            table.append(time.perf_counter() - start)
+            bridge.next_update()
+            pushed.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(args.updates):
+            bridge.get_sensor_data()
+        read_us = (time.perf_counter() - start) / args.updates * 1e6
+    finally:
+        process.kill()
+        process.join()
+        bridge.close()
+
+    results = {"send_us": float(np.mean(sends)) * 1e6, "read_us": read_us}
+    results.update(summarize(table, "send_to_table"))
+    results.update(summarize(pushed, "send_to_push"))
+    return results
+
+
+def bench_http(args):
+    """/api/sensors under concurrent keep-alive clients while the sensors keep changing"""
+    process = Process(target=run_quiet, args=(run_server, args.server, args.http_port, args.sensors, 4.0),
+                      daemon=True)
+    process.start()
+    try:
+        wait_for_port(args.http_port)
+        time.sleep(0.5)
+        latencies, sizes, errors = asyncio.run(load(args.http_port, "/api/sensors", args.clients,
+                                                    args.http_duration))
+    finally:
+        process.kill()
+        process.join()
+    results = {"server": args.server, "clients": args.clients,
+               "requests_per_s": len(latencies) / args.http_duration, "errors": len(errors)}
+    results.update(summarize(latencies, "request"))
+    return results
+
+
+def e2e_config(port):
+    """Path of a temporary sensors.json: one sensor on port, nothing written to disk
+
+    Based on the real config so thresholds and alert rules match what the
+    pipeline normally runs with.
+    """
+    config = {}
+    if os.path.exists(DEFAULT_CONFIG_PATH):
+        with open(DEFAULT_CONFIG_PATH) as f:
+            config = json.load(f)
+    config["storage"] = {"backend": "none"}
+    config["sensors"] = [{"name": "Hydrogen 1", "port": port, "channel": 1}]
+    fd, path = tempfile.mkstemp(prefix="sensors-e2e-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(config, f)
+    return path
+
+
+def bench_e2e(args):
+    """Serial line written on a simulated board to the value showing up on /api/sensors"""
+    try:
+        urllib.request.urlopen(f"http://127.0.0.1:{WEB_PORT}/api/sensors", timeout=0.5)
+        return {"skipped": f"port {WEB_PORT} is already serving"}
+    except OSError:
+        pass
+
+    # One reading per interval with a value that identifies it
+    count = int(args.e2e_duration * args.e2e_hz)
+    interval = 1 / args.e2e_hz
+    events = [(1.0 + n * interval, "data", 1, 10.0 + n * 0.01) for n in range(count)]
+    board = VirtualBoard(events)
+    config_path = e2e_config(board.path)
+    # Never the Pi's real pins or data/ directory, whatever the machine
+    env = dict(os.environ, HYDROGEN_SENSOR_CONFIG=config_path, HYDROGEN_GPIO="mock")
+    command = [sys.executable, "run_system.py", f"--{args.e2e_mode}", "--serial-port", board.path]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(WEB_PORT)
+        simulator = Simulator([board])
+        simulator.start()
+        # Poll as fast as the server answers until the last reading shows up
+        seen = {}
+        deadline = simulator.due(events[-1][0]) + 2.0
+        while len(seen) < count and time.monotonic() < deadline:
+            with urllib.request.urlopen(f"http://127.0.0.1:{WEB_PORT}/api/sensors") as response:
+                value = json.loads(response.read())[0]["value"]
+            if isinstance(value, float):
+                seen.setdefault(round(value, 2), time.monotonic())
+        simulator.close()
+    finally:
+        process.terminate()
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        os.remove(config_path)
+
+    latencies = [seen[round(value, 2)] - simulator.due(at) for at, _, _, value in events
+                 if round(value, 2) in seen]
+    results = {"mode": args.e2e_mode, "readings": count, "seen": len(latencies)}
+    if latencies:
+        results.update(summarize(latencies, "reading_to_http"))
+    return results
+
+
+BENCHMARKS = {"parse": bench_parse, "ui": bench_ui, "bridge": bench_bridge, "http": bench_http, "e2e": bench_e2e}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results):
+    return {f"{section}.{name}": value for section, metrics in results.items()
+            for name, value in metrics.items() if isinstance(value, (int, float))}
+
+
+def compare(results, baseline, tolerance):
+    """Print metrics that got worse than baseline by more than tolerance; returns how many"""
+    current = flatten(results)
+    previous = flatten(baseline["results"])
+    regressions = 0
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    for name in sorted(current.keys() & previous.keys()):
+        old, new = previous[name], current[name]
+        if name.endswith("_max_ms"):
+            # One scheduler hiccup decides these; too noisy to gate on
+            continue
+        if name.endswith("_per_s"):
+            worse = new < old * (1 - tolerance)
+        elif name.endswith(("_ms", "_us")):
+            worse = new > old * (1 + tolerance)
+        else:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"  {'REGRESSION' if worse else 'ok':<10} {name:<48} {old:12.3f} -> {new:12.3f} ({change:+.0f}%)")
+        regressions += worse
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks of the serial -> GUI -> web pipeline")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"comma separated subset of {SECTIONS}")
+    parser.add_argument("--output", help="results JSON (default benchmark_results/<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging, 0.2 = 20%%")
+    parser.add_argument("--sensors", type=int, default=16)
+    parser.add_argument("--parse-kb", type=float, default=512)
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--server", choices=["dev", "waitress"], default="waitress")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--http-duration", type=float, default=5.0)
+    parser.add_argument("--http-port", type=int, default=5100)
+    parser.add_argument("--e2e-mode", choices=["headless", "single-process"], default="headless",
+                        help="single-process needs a display")
+    parser.add_argument("--e2e-hz", type=float, default=4.0, help="readings per second on the simulated board")
+    parser.add_argument("--e2e-duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = {}
+    for section in args.only.split(","):
+        print(f"{section}...", flush=True)
+        # The pipeline prints status as it runs; keep the summary readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[section] = BENCHMARKS[section](args)
+        for name, value in results[section].items():
+            print(f"  {name:<36} {value:.3f}" if isinstance(value, float) else f"  {name:<36} {value}")
+
+    commit = git_commit()
+    report = {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "python": platform.python_version(), "machine": platform.machine(),
+              "processors": os.cpu_count(), "args": vars(args), "results": results}
+    output = args.output or os.path.join("benchmark_results", f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import queue
+import random
+import threading
+import time
+
+import serial
+
+from binary_protocol import create_decoder
+from serial_reader import SerialReader
+from ui_refresh import UiRefresher, format_refresh_stats
+from benchmarks.simulator import open_pty_pair
+
+
+def write_lines(master, count, rate, stop):
+    """Write ASCII readings to the pty at random intervals averaging 1/rate"""
+    for n in range(count):
+        if stop.is_set():
+            return
+        os.write(master, f"1\t1\t1523342.25\t0.4712\t{n % 500}.00 ppm\n".encode())
+        time.sleep(random.expovariate(rate))
+
+
+def read_port(path, readings, refresher, stop):
+    """The GUI's serial thread: read, parse, queue, notify"""
+    port = serial.Serial(path, 9600, timeout=0.2)
+    reader = SerialReader(port, mode="event", timeout=0.2)
+    decoder = create_decoder("ascii")
+    while not stop.is_set():
+        data = reader.read()
+        if data:
+            received = time.time()
+            for reading in decoder.feed(data):
+                readings.put(reading)
+            reader.mark_parsed()
+            refresher.notify(received)
+    port.close()
+
+
+def run_mode(tk, mode, args):
+    root = tk.Tk()
+    label = tk.Label(root, text="--", font=("Arial", 120, "bold"))
+    label.pack()
+    readings = queue.Queue()
+
+    def redraw():
+        while True:
+            try:
+                reading = readings.get_nowait()
+            except queue.Empty:
+                return None
+            label.config(text=f"{reading.ppm:.2f}")
+
+    refresher = UiRefresher(root, redraw, event_driven=mode == "event")
+    master, path = open_pty_pair()
+    stop = threading.Event()
+    reader = threading.Thread(target=read_port, args=(path, readings, refresher, stop), daemon=True)
+    reader.start()
+    writer = threading.Thread(target=write_lines, args=(master, args.lines, args.rate, stop), daemon=True)
+
+    # Idle first: how much CPU does the UI loop burn with no data?
+    results = {}
+
+    def idle_done():
+        results["idle_cpu_ms_per_s"] = (time.process_time() - results["cpu"]) * 1e3 / args.idle
+        results["idle_redraws"] = refresher.take_stats()["redraws"]
+        writer.start()
+        root.after(100, wait_for_writer)
+
+    def wait_for_writer():
+        if writer.is_alive():
+            root.after(100, wait_for_writer)
+        else:
+            root.after(500, root.quit)
+
+    def start():
+        refresher.take_stats()
+        results["cpu"] = time.process_time()
+        root.after(int(args.idle * 1000), idle_done)
+
+    refresher.run()
+    root.after(500, start)
+    root.mainloop()
+    stop.set()
+    reader.join()
+    stats = refresher.take_stats()
+    root.destroy()
+    os.close(master)
+    print(f"{mode:<6} {format_refresh_stats(stats)}")
+    print(f"{'':<6} idle: {results['idle_redraws']} redraws, "
+          f"{results['idle_cpu_ms_per_s']:.2f} ms CPU per second")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial line to Tk screen latency: event-driven vs fixed polling")
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=20.0, help="mean lines per second")
+    parser.add_argument("--idle", type=float, default=5.0, help="seconds without data to measure idle cost")
+    args = parser.parse_args()
+
+    import tkinter as tk
+
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        print(f"Needs a display: {e}")
+        return
+    for mode in ("poll", "event"):
+        run_mode(tk, mode, args)
+
+
+if __name__ == "__main__":
+    main()
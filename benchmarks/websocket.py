@@ -0,0 +1,108 @@
+import argparse
+import json
+import random
+import threading
+import time
+
+import numpy as np
+from flask import Flask
+from werkzeug.serving import make_server
+
+from delta_push import DeltaChannel, register_websocket
+from sensor_state import empty_snapshot
+
+
+def run_client(url, duration, results):
+    """Apply snapshot + delta messages like script.js and record latency per delta"""
+    import simple_websocket
+
+    ws = simple_websocket.Client.connect(url)
+    latencies = []
+    received = resyncs = 0
+    seq = None
+    deadline = time.time() + duration
+    try:
+        while time.time() < deadline:
+            message = ws.receive(timeout=0.5)
+            if message is None:
+                continue
+            received += 1
+            message = json.loads(message)
+            if message["type"] == "snapshot":
+                seq = message["seq"]
+                continue
+            if seq is None:
+                continue
+            if message["seq"] != seq + 1:
+                seq = None
+                resyncs += 1
+                ws.send(json.dumps({"type": "resync"}))
+                continue
+            seq = message["seq"]
+            timestamp = message["changes"].get("timestamp")
+            if timestamp is not None:
+                latencies.append(time.time() - timestamp)
+    finally:
+        ws.close()
+    results.append((received, resyncs, latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket delta push: messages/s and reading-to-client latency")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--sensors", type=int, default=64)
+    parser.add_argument("--rate", type=float, default=100.0, help="sensor updates published per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=5081)
+    args = parser.parse_args()
+
+    channel = DeltaChannel([empty_snapshot() for _ in range(args.sensors)])
+    app = Flask(__name__)
+    register_websocket(app, channel)
+    server = make_server("127.0.0.1", args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = []
+    url = f"ws://127.0.0.1:{args.port}/api/ws"
+    clients = [threading.Thread(target=run_client, args=(url, args.duration + 1, results))
+               for _ in range(args.clients)]
+    for client in clients:
+        client.start()
+    time.sleep(0.5)
+
+    rng = random.Random(1)
+    published = 0
+    start = time.time()
+    while time.time() - start < args.duration:
+        sensor_index = published % args.sensors
+        channel.publish(sensor_index, {
+            "value": round(rng.uniform(0, 200), 2),
+            "resistance": round(rng.uniform(1e5, 2e6), 2),
+            "ratio": round(rng.uniform(0.1, 1.0), 4),
+            "timestamp": time.time(),
+            "status": "connected",
+        })
+        published += 1
+        time.sleep(max(0.0, start + published / args.rate - time.time()))
+    elapsed = time.time() - start
+
+    for client in clients:
+        client.join()
+    server.shutdown()
+
+    received = sum(result[0] for result in results)
+    resyncs = sum(result[1] for result in results)
+    latencies = np.array([value for result in results for value in result[2]]) * 1e3
+    full_array = len(json.dumps(channel.state))
+    print(f"{args.clients} clients, {args.sensors} sensors, {published / elapsed:.0f} updates/s published")
+    print(f"delivered: {received / elapsed:.0f} messages/s, {resyncs} resyncs")
+    if len(latencies):
+        print(f"reading-to-client latency: p50 {np.percentile(latencies, 50):.2f} ms, "
+              f"p99 {np.percentile(latencies, 99):.2f} ms, max {latencies.max():.2f} ms")
+    if channel.messages:
+        print(f"average delta message: {channel.bytes / channel.messages:.0f} bytes "
+              f"(full sensor array: {full_array} bytes)")
+
+
+if __name__ == "__main__":
+    main()
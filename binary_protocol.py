@@ -0,0 +1,275 @@
+import binascii
+import math
+import struct
+from itertools import repeat
+
+import numpy as np
+
+from sensor_parser import Reading, ReadingKind, TextLineDecoder
+
+# Host -> board commands selecting the output protocol (see hydrogen.ino)
+SELECT_ASCII = b'A'
+SELECT_BINARY = b'B'
+
+FRAME_VERSION = 1
+
+# version, kind, sensor id, sequence, millis, resistance, ratio, ppm - little-endian
+FRAME_STRUCT = struct.Struct('<BBBHIfff')
+CRC_STRUCT = struct.Struct('<H')
+FRAME_SIZE = FRAME_STRUCT.size + CRC_STRUCT.size
+# FRAME_STRUCT and the CRC as a numpy record, for decoding whole batches
+FRAME_DTYPE = np.dtype([('version', 'u1'), ('kind', 'u1'), ('sensor_id', 'u1'), ('seq', '<u2'),
+                        ('millis', '<u4'), ('resistance', '<f4'), ('ratio', '<f4'), ('ppm', '<f4'),
+                        ('crc', '<u2')])
+# A frame is shorter than 254 bytes, so COBS always adds exactly one byte
+PACKET_SIZE = FRAME_SIZE + 1
+# Below this many packets per feed numpy's call overhead outweighs batching
+BATCH_MIN = 32
+
+# Frame kinds match ReadingKind; headers are never sent in binary mode
+FRAME_KINDS = {
+    ReadingKind.DATA: ReadingKind.DATA,
+    ReadingKind.DEBUG: ReadingKind.DEBUG,
+    ReadingKind.WARNING: ReadingKind.WARNING,
+}
+# Lookup of frame kind byte -> known, for checking a whole batch
+KNOWN_KIND = np.isin(np.arange(256), [int(kind) for kind in FRAME_KINDS])
+
+_new_reading = Reading.__new__
+
+
+def crc16(data, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), same as crc16() in hydrogen.ino"""
+    # binascii.crc_hqx is the same polynomial, computed in C
+    return binascii.crc_hqx(data, crc)
+
+
+def cobs_encode(data):
+    """COBS-encode data so it contains no zero bytes (delimiter not included)"""
+    out = bytearray()
+    block = bytearray()
+    for byte in data:
+        if byte == 0:
+            out.append(len(block) + 1)
+            out += block
+            block.clear()
+        else:
+            block.append(byte)
+            if len(block) == 254:
+                out.append(255)
+                out += block
+                block.clear()
+    out.append(len(block) + 1)
+    out += block
+    return bytes(out)
+
+
+def cobs_decode(data):
+    """Decode one COBS packet (without its zero delimiter), raising ValueError if malformed"""
+    out = bytearray()
+    index = 0
+    length = len(data)
+    while index < length:
+        code = data[index]
+        if code == 0:
+            raise ValueError("zero byte inside COBS packet")
+        index += 1
+        end = index + code - 1
+        if end > length:
+            raise ValueError("COBS block runs past end of packet")
+        out += data[index:end]
+        index = end
+        if code < 255 and index < length:
+            out.append(0)
+    return bytes(out)
+
+
+def encode_frame(kind, sensor_id, seq, millis, resistance=math.nan, ratio=math.nan, ppm=math.nan):
+    """Build one delimited frame exactly as hydrogen.ino sends it in binary mode"""
+    payload = FRAME_STRUCT.pack(FRAME_VERSION, int(kind), sensor_id, seq & 0xFFFF,
+                                millis & 0xFFFFFFFF, resistance, ratio, ppm)
+    return cobs_encode(payload + CRC_STRUCT.pack(crc16(payload))) + b'\0'
+
+
+class BinaryFrameDecoder:
+    """Decode COBS framed, CRC16 checked readings from hydrogen.ino
+
+    Counts CRC failures, malformed frames and frames lost according to gaps
+    in the 16-bit sequence number, so link quality is visible instead of
+    showing up as silently dropped lines.
+    """
+
+    def __init__(self, max_frame_length=64):
+        self.max_frame_length = max_frame_length
+        self.buffer = bytearray()
+        self.expected_seq = None
+        self.frames = 0
+        self.crc_errors = 0
+        self.framing_errors = 0
+        self.lost_frames = 0
+        self.restarts = 0
+
+    def reset(self):
+        """Drop any partial frame, e.g. after a reconnect"""
+        self.buffer.clear()
+        self.expected_seq = None
+
+    def feed(self, data):
+        """Add raw bytes and return the list of decoded Readings"""
+        buffer = self.buffer
+        buffer += data
+        readings = []
+
+        end = buffer.rfind(b'\0')
+        if end >= 0:
+            packets = [packet for packet in bytes(buffer[:end]).split(b'\0') if packet]
+            del buffer[:end + 1]
+            if len(packets) >= BATCH_MIN:
+                readings = self._decode_batch(packets)
+            else:
+                for packet in packets:
+                    reading = self._decode_packet(packet)
+                    if reading is not None:
+                        readings.append(reading)
+
+        # No delimiter in sight: text or line noise, resync on the next zero byte
+        if len(buffer) > self.max_frame_length:
+            self.framing_errors += 1
+            buffer.clear()
+
+        return readings
+
+    def _decode_packet(self, packet):
+        try:
+            frame = cobs_decode(packet)
+        except ValueError:
+            self.framing_errors += 1
+            return None
+        if len(frame) != FRAME_SIZE:
+            self.framing_errors += 1
+            return None
+
+        payload = frame[:FRAME_STRUCT.size]
+        (crc,) = CRC_STRUCT.unpack_from(frame, FRAME_STRUCT.size)
+        if crc16(payload) != crc:
+            self.crc_errors += 1
+            return None
+
+        version, kind, sensor_id, seq, millis, resistance, ratio, ppm = FRAME_STRUCT.unpack(payload)
+        if version != FRAME_VERSION or kind not in FRAME_KINDS:
+            self.framing_errors += 1
+            return None
+
+        self._track_sequence(seq)
+        self.frames += 1
+
+        kind = FRAME_KINDS[kind]
+        if kind != ReadingKind.DATA:
+            return Reading(kind, sensor_id, millis / 1000, None, None, None)
+        return Reading(kind, sensor_id, millis / 1000, resistance, ratio, ppm)
+
+    def _decode_batch(self, packets):
+        """Decode many packets at once; same results and counters as _decode_packet
+
+        COBS, the header checks and the sequence gaps are worked out for all
+        packets together with numpy, and the CRCs in C, so Python only builds
+        the Readings. In COBS each code byte gives the offset of the next one,
+        and every code byte but the first stands for a zero in the frame.
+        """
+        sized = [packet for packet in packets if len(packet) == PACKET_SIZE]
+        # No other length can decode to a whole frame
+        self.framing_errors += len(packets) - len(sized)
+        if not sized:
+            return []
+
+        # Walk the code byte chains of all packets in step, on the flat buffer
+        flat = np.frombuffer(b''.join(sized), dtype=np.uint8)
+        codes = flat.astype(np.intp)
+        is_code = np.zeros(len(flat), dtype=bool)
+        at = np.arange(0, len(flat), PACKET_SIZE)
+        end = at + PACKET_SIZE
+        overshot = []
+        while len(at):
+            is_code[at] = True
+            at = at + codes[at]
+            live = at < end
+            if not live.all():
+                # A chain must land exactly on the end; past it a block ran over
+                overshot.append(end[~live][at[~live] > end[~live]])
+                at = at[live]
+                end = end[live]
+        valid = np.ones(len(sized), dtype=bool)
+        if overshot:
+            valid[np.concatenate(overshot) // PACKET_SIZE - 1] = False
+            self.framing_errors += len(sized) - int(np.count_nonzero(valid))
+        rows = np.where(is_code, 0, flat).reshape(len(sized), PACKET_SIZE)
+        frames = rows[valid, 1:].tobytes()
+
+        fields = np.frombuffer(frames, dtype=FRAME_DTYPE)
+        payloads = map(memoryview(frames).__getitem__,
+                       map(slice, range(0, len(frames), FRAME_SIZE), range(FRAME_STRUCT.size, len(frames), FRAME_SIZE)))
+        crcs = np.fromiter(map(binascii.crc_hqx, payloads, repeat(0xFFFF)), dtype=np.uint16, count=len(fields))
+        good = crcs == fields['crc']
+        good_count = int(np.count_nonzero(good))
+        self.crc_errors += len(fields) - good_count
+        known = good & (fields['version'] == FRAME_VERSION) & KNOWN_KIND[fields['kind']]
+        fields = fields[known]
+        self.framing_errors += good_count - len(fields)
+        if not len(fields):
+            return []
+
+        # Same accounting as _track_sequence, one frame after the other
+        seq = fields['seq'].astype(np.int64)
+        expected = np.empty_like(seq)
+        expected[1:] = seq[:-1] + 1
+        expected[0] = seq[0] if self.expected_seq is None else self.expected_seq
+        gap = (seq - expected) & 0xFFFF
+        self.lost_frames += int(gap[gap < 0x8000].sum())
+        self.restarts += int(np.count_nonzero(gap >= 0x8000))
+        self.expected_seq = (int(seq[-1]) + 1) & 0xFFFF
+        self.frames += len(fields)
+
+        kinds = list(map(FRAME_KINDS.__getitem__, fields['kind'].tolist()))
+        readings = list(map(_new_reading, repeat(Reading), kinds, fields['sensor_id'].tolist(),
+                            (fields['millis'] / 1000).tolist(), fields['resistance'].tolist(),
+                            fields['ratio'].tolist(), fields['ppm'].tolist()))
+        if not (fields['kind'] == ReadingKind.DATA).all():
+            for index, kind in enumerate(kinds):
+                if kind != ReadingKind.DATA:
+                    readings[index] = Reading(kind, readings[index].sensor_id, readings[index].seconds,
+                                              None, None, None)
+        return readings
+
+    def _track_sequence(self, seq):
+        if self.expected_seq is not None and seq != self.expected_seq:
+            gap = (seq - self.expected_seq) & 0xFFFF
+            if gap < 0x8000:
+                self.lost_frames += gap
+            else:
+                # Sequence went backwards - the board was reset
+                self.restarts += 1
+        self.expected_seq = (seq + 1) & 0xFFFF
+
+    def stats(self):
+        """Return link quality counters"""
+        return {
+            "frames": self.frames,
+            "lost_frames": self.lost_frames,
+            "crc_errors": self.crc_errors,
+            "framing_errors": self.framing_errors,
+            "restarts": self.restarts,
+        }
+
+
+def create_decoder(protocol):
+    """Return the stream decoder for "ascii" or "binary" mode"""
+    if protocol == "binary":
+        return BinaryFrameDecoder()
+    if protocol == "ascii":
+        return TextLineDecoder()
+    raise ValueError(f"Unknown serial protocol: {protocol}")
+
+
+def select_command(protocol):
+    """Byte the host sends after connecting to put hydrogen.ino in this mode"""
+    return SELECT_BINARY if protocol == "binary" else SELECT_ASCII
@@ -0,0 +1,111 @@
+import threading
+import time
+
+# (on seconds, off seconds) repeated while the severity lasts
+PATTERNS = {
+    "alarm": (0.5, 0.5),  # A sensor is over its threshold
+    "warning": (0.1, 0.9),  # Rising fast, still below the threshold
+}
+
+
+class Buzzer:
+    """Sound the alarm buzzer on alert transitions, without polling
+
+    set_severity() switches the output from the calling thread, so an
+    alarm sounds (or stops) as soon as the transition is published. A
+    worker thread then times the pattern's on/off edges by waiting on a
+    condition, which any new severity interrupts at once.
+
+    gpio is an RPi.GPIO-compatible module. With frequency set, the pin
+    drives a passive piezo through gpio.PWM at that pitch; otherwise it
+    switches an active buzzer on and off.
+    """
+
+    def __init__(self, gpio, pin=26, frequency=None, patterns=PATTERNS):
+        self.gpio = gpio
+        self.pin = pin
+        self.patterns = patterns
+        self.condition = threading.Condition()
+        self.severity = None
+        self.on = False
+        self.next_edge = None
+        self.closed = False
+
+        gpio.setmode(gpio.BCM)
+        gpio.setup(pin, gpio.OUT)
+        gpio.output(pin, gpio.LOW)
+        self.pwm = None
+        if frequency:
+            self.pwm = gpio.PWM(pin, frequency)
+            self.pwm.start(0)
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _output(self, on):
+        if self.pwm is not None:
+            self.pwm.ChangeDutyCycle(50 if on else 0)
+        else:
+            self.gpio.output(self.pin, self.gpio.HIGH if on else self.gpio.LOW)
+        self.on = on
+
+    def set_severity(self, severity):
+        """Start the pattern for severity ("alarm", "warning") now, or stop for None"""
+        with self.condition:
+            if severity == self.severity or self.closed:
+                return
+            self.severity = severity
+            if severity is None:
+                self._output(False)
+                self.next_edge = None
+            else:
+                # Every new pattern starts with the buzzer on
+                self._output(True)
+                self.next_edge = time.monotonic() + self.patterns[severity][0]
+            self.condition.notify()
+
+    def follow(self, monitor):
+        """Track a MonitorEngine's alarm severity from its alert_events topic"""
+        def on_event(event):
+            severity = monitor.alerts.severity
+            if severity != self.severity:
+                if severity:
+                    print(f"ALERT: Sensors {list(monitor.alerts.alert_sensors)} - {severity}")
+                else:
+                    print("Alert cleared - buzzer off")
+            self.set_severity(severity)
+
+        return monitor.bus.listen("alert_events", on_event)
+
+    def _run(self):
+        with self.condition:
+            while not self.closed:
+                if self.next_edge is None:
+                    self.condition.wait()
+                    continue
+                delay = self.next_edge - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                on_seconds, off_seconds = self.patterns[self.severity]
+                self._output(not self.on)
+                self.next_edge = time.monotonic() + (on_seconds if self.on else off_seconds)
+
+    def close(self):
+        """Silence the buzzer and stop the worker; GPIO cleanup is left to the caller"""
+        with self.condition:
+            self.closed = True
+            self.severity = None
+            self.next_edge = None
+            self._output(False)
+            self.condition.notify()
+        if self.pwm is not None:
+            self.pwm.stop()
+
+
+def create_buzzer(gpio, config):
+    """Buzzer from the "buzzer" section of sensors.json (pin, frequency, patterns)"""
+    options = config.buzzer
+    patterns = dict(PATTERNS)
+    patterns.update({name: tuple(timing) for name, timing in options.get("patterns", {}).items()})
+    return Buzzer(gpio, pin=int(options.get("pin", 26)), frequency=options.get("frequency"), patterns=patterns)
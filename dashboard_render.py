@@ -0,0 +1,159 @@
+import time
+from datetime import datetime
+
+# Status bar color for each MonitorEngine connection level
+STATUS_COLORS = {"connecting": "yellow", "connected": "green", "error": "red"}
+
+
+class WidgetCache:
+    """Set Tk widget options only when they differ from what is on screen
+
+    Remembers the last options applied to every widget and canvas item,
+    so re-rendering an unchanged value makes no Tk call.
+    """
+
+    def __init__(self):
+        self.applied = {}
+        self.packed = {}
+        self.calls = 0
+
+    def _changed(self, key, options):
+        applied = self.applied.setdefault(key, {})
+        changed = {name: value for name, value in options.items() if applied.get(name) != value}
+        applied.update(changed)
+        return changed
+
+    def config(self, widget, **options):
+        changed = self._changed(widget, options)
+        if changed:
+            widget.config(**changed)
+            self.calls += 1
+
+    def itemconfig(self, canvas, item, **options):
+        changed = self._changed((canvas, item), options)
+        if changed:
+            canvas.itemconfig(item, **changed)
+            self.calls += 1
+
+    def show(self, widget, visible, **pack_options):
+        if self.packed.get(widget) != visible:
+            if visible:
+                widget.pack(**pack_options)
+            else:
+                widget.pack_forget()
+            self.packed[widget] = visible
+            self.calls += 1
+
+
+class DashboardRenderer:
+    """Render sensor state onto the kiosk widgets, touching only what changed
+
+    Each sensor's render model is the tuple of raw values it is drawn from;
+    when it matches the previous tick nothing is formatted or configured.
+    Tick cost (time and widget calls) is accumulated for maybe_report().
+    """
+
+    def __init__(self, app, report_interval=60, blink_interval=0.25):
+        self.app = app
+        self.widgets = WidgetCache()
+        self.models = [None] * app.sensor_count
+        self.blink_interval = blink_interval
+        self.timestamps = [None] * app.sensor_count
+        self.report_interval = report_interval
+        self.last_report = time.monotonic()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.ticks = 0
+        self.idle_ticks = 0
+        self.tick_seconds = 0.0
+        self.max_tick_seconds = 0.0
+        self.tick_calls = 0
+
+    def render(self, state, status, connected):
+        """Bring every sensor's widgets up to date; returns the number of Tk calls made"""
+        app = self.app
+        widgets = self.widgets
+        calls = widgets.calls
+        # The names of sensors in alert flash on a fixed clock, however often we render
+        blink_on = int(time.monotonic() / self.blink_interval) % 2 == 0
+        for index in range(app.sensor_count):
+            # Only show "--" if we've never received data for this sensor
+            if not status.has_value[index]:
+                model = ("no data", connected)
+                if model != self.models[index] and not connected:
+                    widgets.config(app.value_labels[index], text="--", fg="red")
+                    widgets.itemconfig(app.led_indicators[index], app.leds[index], fill="gray")
+                    widgets.show(app.alert_labels[index], False)
+                self.models[index] = model
+                continue
+
+            alert = bool(status.alert[index])
+            model = (float(state.ppm[index]), float(state.resistance[index]), float(state.ratio[index]),
+                     float(state.timestamp[index]), alert, bool(status.stale[index]), alert and blink_on)
+            if model == self.models[index]:
+                continue
+            self.models[index] = model
+            ppm, resistance, ratio, timestamp, alert, stale, blink = model
+
+            widgets.config(app.value_labels[index], text=f"{ppm:.2f}",
+                           fg="orange" if stale else "red" if alert else "white")
+            widgets.itemconfig(app.led_indicators[index], app.leds[index], fill="red" if alert else "green")
+            widgets.show(app.alert_labels[index], alert, pady=(0, 5))
+            widgets.config(app.name_labels[index], fg="red" if blink else "white")
+
+            if self.timestamps[index] != timestamp:
+                self.timestamps[index] = timestamp
+                time_str = datetime.fromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3]
+                widgets.config(app.timestamp_labels[index], text=f"Last updated: {time_str}")
+            # Keep showing the last known values
+            widgets.config(app.resistance_labels[index], text=f"Resistance: {resistance:.2f} Ω")
+            widgets.config(app.ratio_labels[index], text=f"Rs/R0: {ratio:.4f}")
+        return widgets.calls - calls
+
+    def render_status(self, level, message):
+        """Show the engine's connection status; returns the number of Tk calls made"""
+        calls = self.widgets.calls
+        self.widgets.config(self.app.status_label, text=message, fg=STATUS_COLORS.get(level, "white"))
+        return self.widgets.calls - calls
+
+    def next_frame(self, status):
+        """Seconds until the alert blink must be redrawn, or None with no alert showing"""
+        if not status.alert.any():
+            return None
+        phase = time.monotonic() / self.blink_interval
+        return (int(phase) + 1 - phase) * self.blink_interval
+
+    def record_tick(self, seconds, calls):
+        self.ticks += 1
+        self.tick_seconds += seconds
+        self.max_tick_seconds = max(self.max_tick_seconds, seconds)
+        self.tick_calls += calls
+        if not calls:
+            self.idle_ticks += 1
+
+    def stats(self):
+        ticks = self.ticks or 1
+        return {
+            "ticks": self.ticks,
+            "idle_ticks": self.idle_ticks,
+            "mean_tick_ms": self.tick_seconds / ticks * 1e3,
+            "max_tick_ms": self.max_tick_seconds * 1e3,
+            "widget_calls_per_tick": self.tick_calls / ticks,
+        }
+
+    def maybe_report(self):
+        """Return and reset the tick statistics once per report_interval, else None"""
+        now = time.monotonic()
+        if now - self.last_report < self.report_interval:
+            return None
+        stats = self.stats()
+        self._reset_counters()
+        self.last_report = now
+        return stats
+
+
+def format_tick_stats(stats):
+    return (f"UI: {stats['ticks']} ticks ({stats['idle_ticks']} idle), "
+            f"mean {stats['mean_tick_ms']:.3f} ms, max {stats['max_tick_ms']:.3f} ms, "
+            f"{stats['widget_calls_per_tick']:.2f} widget calls/tick")
@@ -0,0 +1,152 @@
+import json
+import threading
+from collections import deque
+
+
+class DeltaClient:
+    """Outgoing messages for one WebSocket client
+
+    Bounded: a client that falls more than maxsize messages behind has its
+    backlog dropped and is sent a fresh snapshot instead (see DeltaChannel).
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.messages = deque()
+        self.condition = threading.Condition()
+        self.overflowed = False
+
+    def put(self, message):
+        with self.condition:
+            if len(self.messages) >= self.maxsize:
+                self.messages.clear()
+                self.overflowed = True
+            else:
+                self.messages.append(message)
+            self.condition.notify()
+
+    def get(self, timeout):
+        """Next message, or None after timeout seconds or when a resync is due"""
+        with self.condition:
+            if not self.messages and not self.overflowed:
+                self.condition.wait(timeout)
+            if self.overflowed or not self.messages:
+                return None
+            return self.messages.popleft()
+
+    def replace(self, message):
+        """Drop everything queued and send this message next"""
+        with self.condition:
+            self.messages.clear()
+            self.messages.append(message)
+            self.overflowed = False
+            self.condition.notify()
+
+
+class DeltaChannel:
+    """Snapshot-plus-delta feed of sensor state for WebSocket clients
+
+    Every change is encoded once, as only the fields that differ from the
+    last published value, and the same JSON string is queued for every
+    client. Messages carry a sequence number that increases by one per
+    delta, so a client that sees a gap asks for a resync and gets a
+    snapshot tagged with the sequence number the next delta follows.
+
+        {"type": "snapshot", "seq": 41, "sensors": [{...}, ...]}
+        {"type": "delta", "seq": 42, "sensor_id": 2, "changes": {"value": 12.5}}
+    """
+
+    def __init__(self, sensors, queue_size=256):
+        self.state = [dict(sensor) for sensor in sensors]
+        self.queue_size = queue_size
+        self.seq = 0
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.bytes = 0
+
+    def publish(self, sensor_index, data):
+        """Encode the fields of data that changed and queue them for every client"""
+        with self.lock:
+            if not 0 <= sensor_index < len(self.state):
+                return None
+            current = self.state[sensor_index]
+            changes = {key: value for key, value in data.items() if current.get(key) != value}
+            if not changes:
+                return None
+            current.update(changes)
+            self.seq += 1
+            message = json.dumps({"type": "delta", "seq": self.seq, "sensor_id": sensor_index + 1,
+                                  "changes": changes})
+            for client in self.clients:
+                client.put(message)
+            self.messages += len(self.clients)
+            self.bytes += len(message) * len(self.clients)
+        return message
+
+    def _snapshot(self):
+        return json.dumps({"type": "snapshot", "seq": self.seq, "sensors": self.state})
+
+    def subscribe(self):
+        """New client whose first message is a snapshot consistent with the deltas after it"""
+        client = DeltaClient(self.queue_size)
+        with self.lock:
+            client.replace(self._snapshot())
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def resync(self, client):
+        """Replace a client's backlog with a current snapshot"""
+        with self.lock:
+            client.replace(self._snapshot())
+
+    def serve(self, ws, wait=1.0):
+        """Run one WebSocket connection until it closes
+
+        ws is a flask_sock / simple_websocket connection. Clients send
+        {"type": "resync"} after detecting a sequence gap.
+        """
+        client = self.subscribe()
+        try:
+            while ws.connected:
+                message = client.get(wait)
+                if message is not None:
+                    ws.send(message)
+                elif client.overflowed:
+                    self.resync(client)
+                request = ws.receive(timeout=0)
+                if request and _is_resync(request):
+                    self.resync(client)
+        finally:
+            self.unsubscribe(client)
+
+
+def _is_resync(request):
+    try:
+        return json.loads(request).get("type") == "resync"
+    except (ValueError, AttributeError):
+        return False
+
+
+def register_websocket(app, channel, path='/api/ws'):
+    """Add the delta WebSocket route to a Flask app; needs flask-sock
+
+    Returns False (and leaves the app unchanged) if flask-sock is missing.
+    """
+    try:
+        from flask_sock import Sock
+    except ImportError:
+        print("WebSocket push disabled: pip install flask-sock to enable it")
+        return False
+
+    sock = Sock(app)
+
+    @sock.route(path)
+    def sensor_socket(ws):
+        channel.serve(ws)
+
+    return True
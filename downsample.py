@@ -0,0 +1,118 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Aggregated samples in time order. Raw readings are buckets of count 1
+# whose mean, min and max are the reading itself
+Buckets = namedtuple("Buckets", ["timestamp", "count", "mean", "min", "max"])
+
+EMPTY_BUCKETS = Buckets(*(np.empty(0) for _ in Buckets._fields))
+
+
+def raw_buckets(timestamps, values):
+    """Wrap raw samples as Buckets"""
+    values = np.asarray(values, dtype=float)
+    return Buckets(np.asarray(timestamps, dtype=float), np.ones(len(values)), values, values, values)
+
+
+def min_max(series, start, end, points):
+    """Merge a time-ordered Buckets series into at most `points` equal-width buckets
+
+    Each output bucket is timestamped at its start and keeps the min, max,
+    count-weighted mean and total count of the samples in it, so spikes
+    survive however far the window is zoomed out. Empty buckets are omitted.
+    """
+    if not len(series.timestamp) or end <= start or points < 1:
+        return EMPTY_BUCKETS
+    width = (end - start) / points
+    index = np.clip(((series.timestamp - start) // width).astype(np.int64), 0, points - 1)
+    # Samples are in time order, so each bucket is one contiguous run
+    present, starts = np.unique(index, return_index=True)
+    counts = np.add.reduceat(series.count, starts)
+    sums = np.add.reduceat(series.mean * series.count, starts)
+    return Buckets(
+        start + present * width,
+        counts,
+        sums / counts,
+        np.minimum.reduceat(series.min, starts),
+        np.maximum.reduceat(series.max, starts),
+    )
+
+
+def lttb(timestamps, values, points):
+    """Largest-Triangle-Three-Buckets: pick `points` samples that preserve the visual shape
+
+    Always keeps the first and last sample, so at least 3 points are
+    returned for longer series. Returns (timestamps, values).
+    """
+    count = len(timestamps)
+    if count <= points:
+        return timestamps, values
+    points = max(points, 3)
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    # Interior samples are split into points - 2 buckets
+    edges = np.linspace(1, count - 1, points - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        # Third vertex: average of the next bucket (or the last sample)
+        if bucket + 2 < len(edges):
+            next_lo, next_hi = edges[bucket + 1], edges[bucket + 2]
+            average_t = timestamps[next_lo:next_hi].mean()
+            average_v = values[next_lo:next_hi].mean()
+        else:
+            average_t, average_v = timestamps[-1], values[-1]
+        t_a, v_a = timestamps[previous], values[previous]
+        area = np.abs((t_a - average_t) * (values[lo:hi] - v_a)
+                      - (t_a - timestamps[lo:hi]) * (average_v - v_a))
+        previous = lo + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return timestamps[selected], values[selected]
+
+
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+DEFAULT_WINDOW = 3600
+METHODS = ("minmax", "lttb")
+
+
+def history_payload(store, sensor_id, args, now):
+    """JSON-ready downsampled history for /api/history/<sensor_id>
+
+    args is the request's query string: from and to (Unix seconds, default
+    the last hour), points (default 500, at most 5000) and method ("minmax"
+    or "lttb"). The payload never exceeds `points` samples, whatever the
+    window. Raises ValueError for bad arguments.
+    """
+    end = float(args.get("to", now))
+    start = float(args.get("from", end - DEFAULT_WINDOW))
+    points = int(args.get("points", DEFAULT_POINTS))
+    method = args.get("method", "minmax")
+    if not (math.isfinite(start) and math.isfinite(end)) or end <= start:
+        raise ValueError("'from' must be before 'to'")
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    points = min(max(points, 3), MAX_POINTS)
+
+    width = (end - start) / points
+    # LTTB picks from its input, so read a few samples per output point
+    series = store.history(sensor_id, start, end, width if method == "minmax" else width / 4)
+    payload = {"sensor_id": sensor_id, "from": start, "to": end, "method": method}
+    if method == "minmax":
+        buckets = min_max(series, start, end, points)
+        payload.update(
+            timestamp=buckets.timestamp.tolist(),
+            count=buckets.count.astype(int).tolist(),
+            mean=buckets.mean.tolist(),
+            min=buckets.min.tolist(),
+            max=buckets.max.tolist(),
+        )
+    else:
+        timestamps, values = lttb(series.timestamp, series.mean, points)
+        payload.update(timestamp=timestamps.tolist(), ppm=values.tolist())
+    payload["points"] = len(payload["timestamp"])
+    return payload
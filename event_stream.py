@@ -0,0 +1,81 @@
+import json
+import threading
+
+
+def format_event(event, data):
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscriber:
+    """Pending sensor updates for one stream client
+
+    Updates are coalesced per sensor, so a slow client gets the latest
+    value of each sensor instead of an ever-growing backlog.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = {}
+
+    def put(self, sensor_index, data):
+        with self.condition:
+            self.pending[sensor_index] = data
+            self.condition.notify()
+
+    def take(self, timeout):
+        """Wait up to timeout seconds and return {sensor_index: data} (possibly empty)"""
+        with self.condition:
+            if not self.pending:
+                self.condition.wait(timeout)
+            pending, self.pending = self.pending, {}
+        return pending
+
+
+class Broadcaster:
+    """Fan sensor updates out to any number of stream clients
+
+    publish() is called once per update by a single reader of the bridge, so
+    the shared data is read once however many browsers are watching. Each
+    client thread only sleeps on its own Subscriber until there is news.
+    """
+
+    def __init__(self, keepalive=15.0):
+        self.keepalive = keepalive
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def publish(self, sensor_index, data):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.put(sensor_index, data)
+
+    def subscribe(self):
+        subscriber = Subscriber()
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def stream(self, snapshot):
+        """SSE generator: a full snapshot first, then one event per sensor update
+
+        Subscribes before the snapshot is taken so no update is missed.
+        A comment line is sent when idle so dead connections are noticed.
+        """
+        subscriber = self.subscribe()
+        try:
+            yield format_event("snapshot", snapshot())
+            while True:
+                pending = subscriber.take(self.keepalive)
+                if not pending:
+                    yield ": keepalive\n\n"
+                    continue
+                for sensor_index, data in sorted(pending.items()):
+                    yield format_event("sensor", {"sensor_id": sensor_index + 1, "data": data})
+        finally:
+            self.unsubscribe(subscriber)
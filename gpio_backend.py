@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+# "rpi" drives real pins through RPi.GPIO; "mock" records them in memory.
+# HYDROGEN_GPIO sets it when run_system.py --gpio isn't given
+DEFAULT_BACKEND = "rpi"
+
+
+def load_gpio(backend=None):
+    """The GPIO backend to hand to Buzzer and friends
+
+    Both backends have the slice of the RPi.GPIO interface this project
+    uses: setmode, setup, output, input, PWM and cleanup. RPi.GPIO is
+    imported here rather than at module import, so the GUIs and the
+    pipeline behind them load on any Linux box.
+    """
+    backend = backend or os.environ.get("HYDROGEN_GPIO", DEFAULT_BACKEND)
+    if backend == "mock":
+        print("GPIO: recording backend, no pins are driven")
+        return RecordingGPIO()
+    if backend != "rpi":
+        raise ValueError(f"Unknown GPIO backend {backend!r}; use 'rpi' or 'mock'")
+    try:
+        import RPi.GPIO as GPIO
+    except ImportError:
+        # Never fall back silently: on the Pi that would mean no alarm sound
+        print("RPi.GPIO is not installed; use --gpio mock (or HYDROGEN_GPIO=mock) off the Pi")
+        raise
+    return GPIO
+
+
+class RecordingGPIO:
+    """In-memory stand-in for RPi.GPIO that timestamps every output edge
+
+    edges holds (time, pin, level) for each change of an output, level 1
+    or 0; a PWM pin counts as 1 while its duty cycle is above zero. Like
+    RPi.GPIO it refuses output on a pin that wasn't set up first, so
+    wiring mistakes show up off the Pi too. clock defaults to
+    time.perf_counter.
+    """
+
+    BCM = "BCM"
+    BOARD = "BOARD"
+    OUT = "OUT"
+    IN = "IN"
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.mode = None
+        self.outputs = {}  # pin -> current level
+        self.pwms = {}  # pin -> RecordingPWM
+        self.edges = []
+        self.lock = threading.Lock()
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, direction, initial=None):
+        if self.mode is None:
+            raise RuntimeError("Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)")
+        if direction == self.OUT:
+            self._record(pin, self.LOW if initial is None else initial)
+        else:
+            with self.lock:
+                self.outputs.pop(pin, None)
+
+    def output(self, pin, value):
+        if pin not in self.outputs:
+            raise RuntimeError(f"The GPIO channel {pin} has not been set up as an OUTPUT")
+        self._record(pin, value)
+
+    def input(self, pin):
+        return self.outputs.get(pin, self.LOW)
+
+    def PWM(self, pin, frequency):
+        if pin not in self.outputs:
+            raise RuntimeError(f"The GPIO channel {pin} has not been set up as an OUTPUT")
+        pwm = RecordingPWM(self, pin, frequency)
+        self.pwms[pin] = pwm
+        return pwm
+
+    def cleanup(self, pin=None):
+        """Return pins to inputs; an output left high records its fall"""
+        pins = [pin] if pin is not None else list(self.outputs)
+        for cleaned in pins:
+            if cleaned in self.outputs:
+                self._record(cleaned, self.LOW)
+            with self.lock:
+                self.outputs.pop(cleaned, None)
+                self.pwms.pop(cleaned, None)
+        if pin is None:
+            self.mode = None
+
+    def _record(self, pin, value):
+        level = self.HIGH if value else self.LOW
+        with self.lock:
+            if self.outputs.get(pin) != level:
+                self.edges.append((self.clock(), pin, level))
+            self.outputs[pin] = level
+
+    def edges_for(self, pin):
+        """(time, level) for each edge on one pin, oldest first"""
+        with self.lock:
+            return [(t, level) for t, edge_pin, level in self.edges if edge_pin == pin]
+
+
+class RecordingPWM:
+    """RPi.GPIO.PWM stand-in; the pin reads high while duty_cycle > 0"""
+
+    def __init__(self, gpio, pin, frequency):
+        self.gpio = gpio
+        self.pin = pin
+        self.frequency = frequency
+        self.duty_cycle = 0
+        self.running = False
+
+    def start(self, duty_cycle):
+        self.running = True
+        self.ChangeDutyCycle(duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.duty_cycle = duty_cycle
+        self.gpio._record(self.pin, self.running and duty_cycle > 0)
+
+    def ChangeFrequency(self, frequency):
+        self.frequency = frequency
+
+    def stop(self):
+        self.running = False
+        self.gpio._record(self.pin, False)
@@ -0,0 +1,263 @@
+import math
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from downsample import Buckets, EMPTY_BUCKETS, raw_buckets
+from reading_log import RECORD_DTYPE
+from sensor_parser import ReadingKind
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    timestamp REAL NOT NULL,
+    sensor INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    resistance REAL,
+    ratio REAL,
+    ppm REAL
+);
+CREATE INDEX IF NOT EXISTS readings_sensor_time ON readings (sensor, timestamp);
+CREATE INDEX IF NOT EXISTS readings_time ON readings (timestamp);
+CREATE TABLE IF NOT EXISTS rollup_minute (
+    sensor INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (sensor, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_hour (
+    sensor INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (sensor, bucket)
+) WITHOUT ROWID;
+"""
+
+# Merge a batch's partial aggregates into the stored rollup row
+UPSERT_ROLLUP = """
+INSERT INTO {table} (sensor, bucket, count, sum, min, max) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (sensor, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    sum = sum + excluded.sum,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max)
+"""
+
+ROLLUPS = {"minute": ("rollup_minute", 60), "hour": ("rollup_hour", 3600)}
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is crash-safe in WAL mode and only syncs at checkpoints
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class HistoryDatabase:
+    """SQLite reading store in WAL mode with batched writes and rollup tables
+
+    append() only puts the record on a queue, so the serial thread never
+    waits on the SD card. A background writer inserts whole batches in one
+    transaction and folds each batch into per-minute and per-hour
+    min/max/sum/count rollups, so dashboards query the small tables instead
+    of raw rows. Old rows are deleted per table by the retention policy.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0, retention_seconds=30 * 86400,
+                 minute_retention_seconds=180 * 86400, hour_retention_seconds=5 * 365 * 86400,
+                 retention_check_interval=3600, queue_size=100000, writer=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = {
+            "readings": retention_seconds,
+            "rollup_minute": minute_retention_seconds,
+            "rollup_hour": hour_retention_seconds,
+        }
+        self.retention_check_interval = retention_check_interval
+        self.queue = queue.Queue(queue_size)
+        self.records_written = 0
+        self.records_dropped = 0
+        self.batches = 0
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._writer = None
+
+        connection = connect(path)
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        if writer:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+    def append(self, timestamp, sensor_id, kind, resistance, ratio, ppm):
+        """Queue one record for the writer thread; never blocks"""
+        try:
+            self.queue.put_nowait((timestamp, sensor_id, int(kind), resistance, ratio, ppm))
+        except queue.Full:
+            self.records_dropped += 1
+
+    def append_reading(self, timestamp, sensor_id, reading):
+        """Queue a parsed sensor_parser.Reading"""
+        self.append(timestamp, sensor_id, reading.kind, reading.resistance, reading.ratio, reading.ppm)
+
+    def _write_loop(self):
+        connection = connect(self.path)
+        next_retention = time.time()
+        try:
+            while not (self._stop.is_set() and self.queue.empty()):
+                batch = self._collect_batch()
+                try:
+                    if batch:
+                        self._write_batch(connection, batch)
+                    if time.time() >= next_retention:
+                        next_retention = time.time() + self.retention_check_interval
+                        self.apply_retention(connection)
+                except sqlite3.Error as e:
+                    print(f"History database write error: {e}")
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+        finally:
+            connection.close()
+
+    def _collect_batch(self):
+        """Wait up to flush_interval for the first record, then drain up to batch_size"""
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        get = self.queue.get_nowait
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(get())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, connection, batch):
+        # Aggregate the batch per (sensor, bucket) in Python, then upsert once per bucket
+        rollups = {name: {} for name in ROLLUPS}
+        for timestamp, sensor, kind, resistance, ratio, ppm in batch:
+            if kind != ReadingKind.DATA or ppm is None or math.isnan(ppm):
+                continue
+            for name, (_, width) in ROLLUPS.items():
+                key = (sensor, int(timestamp // width) * width)
+                entry = rollups[name].get(key)
+                if entry is None:
+                    rollups[name][key] = [1, ppm, ppm, ppm]
+                else:
+                    entry[0] += 1
+                    entry[1] += ppm
+                    if ppm < entry[2]:
+                        entry[2] = ppm
+                    if ppm > entry[3]:
+                        entry[3] = ppm
+
+        with connection:
+            connection.executemany("INSERT INTO readings VALUES (?, ?, ?, ?, ?, ?)", batch)
+            for name, (table, _) in ROLLUPS.items():
+                connection.executemany(
+                    UPSERT_ROLLUP.format(table=table),
+                    [(sensor, bucket, *entry) for (sensor, bucket), entry in rollups[name].items()],
+                )
+        self.records_written += len(batch)
+        self.batches += 1
+
+    def apply_retention(self, connection=None, now=None):
+        """Delete raw rows and rollups older than their retention period"""
+        now = time.time() if now is None else now
+        connection = connection or self._reader()
+        with connection:
+            for table, seconds in self.retention.items():
+                if not seconds:
+                    continue
+                column = "timestamp" if table == "readings" else "bucket"
+                connection.execute(f"DELETE FROM {table} WHERE {column} < ?", (now - seconds,))
+
+    def _reader(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect(self.path)
+            self._local.connection = connection
+        return connection
+
+    def scan(self, start, end, sensor_id=None):
+        """Raw records with start <= timestamp < end as a reading_log.RECORD_DTYPE array"""
+        query = "SELECT timestamp, sensor, kind, resistance, ratio, ppm FROM readings WHERE timestamp >= ? AND timestamp < ?"
+        params = [start, end]
+        if sensor_id is not None:
+            query += " AND sensor = ?"
+            params.append(sensor_id)
+        rows = self._reader().execute(query + " ORDER BY timestamp", params).fetchall()
+        records = np.empty(len(rows), dtype=RECORD_DTYPE)
+        if rows:
+            columns = list(zip(*rows))
+            records['timestamp'] = columns[0]
+            records['sensor'] = columns[1]
+            records['kind'] = columns[2]
+            records['pad'] = 0
+            for index, field in ((3, 'resistance'), (4, 'ratio'), (5, 'ppm')):
+                records[field] = np.array(columns[index], dtype=float)  # NULL -> NaN
+        return records
+
+    def rollup(self, sensor_id, start, end, resolution="minute"):
+        """Rollup rows (bucket, count, mean, min, max) for one sensor"""
+        table, _ = ROLLUPS[resolution]
+        rows = self._reader().execute(
+            f"SELECT bucket, count, sum / count, min, max FROM {table} "
+            "WHERE sensor = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (sensor_id, start, end),
+        ).fetchall()
+        return rows
+
+    def history(self, sensor_id, start, end, bucket_seconds=0):
+        """Data readings of one sensor as downsample.Buckets
+
+        Reads the coarsest rollup that is still finer than bucket_seconds,
+        so long windows cost a few thousand rollup rows instead of every
+        raw reading.
+        """
+        for resolution in ("hour", "minute"):
+            _, width = ROLLUPS[resolution]
+            if bucket_seconds >= width:
+                rows = self.rollup(sensor_id, start // width * width, end, resolution)
+                if not rows:
+                    return EMPTY_BUCKETS
+                return Buckets(*(np.array(column, dtype=float) for column in zip(*rows)))
+        records = self.scan(start, end, sensor_id)
+        records = records[(records['kind'] == ReadingKind.DATA) & np.isfinite(records['ppm'])]
+        return raw_buckets(records['timestamp'], records['ppm'])
+
+    def stats(self):
+        return {
+            "written": self.records_written,
+            "dropped": self.records_dropped,
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+        }
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far has been written"""
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
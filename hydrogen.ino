@@ -31,8 +31,23 @@ float ppm1, ppm2;
 unsigned long lastReadTime = 0;
 const unsigned long readInterval = 1000; // 1 second between readings
 
+// Serial speed - must match the baud rate the host opens the port with
+const unsigned long serialBaud = 9600;
+
+// Output protocol. The host selects it after connecting by sending 'A'
+// (tab separated text, the default) or 'B' (binary frames). Each binary
+// frame is a little-endian record followed by a CRC16, COBS encoded and
+// terminated by a zero byte - see binary_protocol.py for the decoder.
+const uint8_t FRAME_VERSION = 1;
+const uint8_t KIND_DATA = 0;
+const uint8_t KIND_DEBUG = 1;
+const uint8_t KIND_WARNING = 2;
+const size_t FRAME_PAYLOAD_SIZE = 21;  // version, kind, sensor, seq, millis, 3 floats
+bool binaryMode = false;
+uint16_t frameSeq = 0;
+
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(serialBaud);
   pinMode(heaterPin, OUTPUT);
   digitalWrite(heaterPin, HIGH);
 
@@ -41,18 +56,26 @@ void setup() {
   
   // Longer warm-up for stable readings
   for (int i = 60; i > 0; i--) {
-    Serial.print("Warming up... ");
-    Serial.print(i);
-    Serial.println(" seconds remaining");
+    checkHostCommand();
+    if (!binaryMode) {
+      Serial.print("Warming up... ");
+      Serial.print(i);
+      Serial.println(" seconds remaining");
+    }
     delay(1000);
   }
   
-  Serial.println("Sensors ready!");
-  Serial.println("Time(s)\tSensor\tRs(ohms)\tRs/R0\tH2(ppm)");
+  checkHostCommand();
+  if (!binaryMode) {
+    Serial.println("Sensors ready!");
+    Serial.println("Time(s)\tSensor\tRs(ohms)\tRs/R0\tH2(ppm)");
+  }
   Serial.flush(); // Ensure all setup messages are sent
 }
 
 void loop() {
+  checkHostCommand();
+
   unsigned long currentTime = millis();
   
   // Only read sensors at specified intervals
@@ -69,12 +92,99 @@ void loop() {
   delay(50);
 }
 
+// Switch output protocol when the host asks for it
+void checkHostCommand() {
+  while (Serial.available() > 0) {
+    int command = Serial.read();
+    if (command == 'B' && !binaryMode) {
+      binaryMode = true;
+      Serial.write((uint8_t)0);  // Delimiter so the host resyncs after any text
+    } else if (command == 'A') {
+      binaryMode = false;
+    }
+  }
+}
+
+// CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF)
+uint16_t crc16(const uint8_t* data, size_t length) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < length; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+// Consistent overhead byte stuffing - the output contains no zero bytes
+size_t cobsEncode(const uint8_t* input, size_t length, uint8_t* output) {
+  size_t readIndex = 0;
+  size_t writeIndex = 1;
+  size_t codeIndex = 0;
+  uint8_t code = 1;
+
+  while (readIndex < length) {
+    if (input[readIndex] == 0) {
+      output[codeIndex] = code;
+      code = 1;
+      codeIndex = writeIndex++;
+      readIndex++;
+    } else {
+      output[writeIndex++] = input[readIndex++];
+      code++;
+      if (code == 0xFF) {
+        output[codeIndex] = code;
+        code = 1;
+        codeIndex = writeIndex++;
+      }
+    }
+  }
+  output[codeIndex] = code;
+  return writeIndex;
+}
+
+void putUint16(uint8_t* buffer, uint16_t value) {
+  buffer[0] = value & 0xFF;
+  buffer[1] = value >> 8;
+}
+
+void putUint32(uint8_t* buffer, uint32_t value) {
+  for (uint8_t i = 0; i < 4; i++) {
+    buffer[i] = (value >> (8 * i)) & 0xFF;
+  }
+}
+
+// Send one reading as a binary frame; AVR floats are already IEEE 754 little-endian
+void sendFrame(uint8_t kind, uint8_t sensor, float resistance, float ratio, float ppm) {
+  uint8_t frame[FRAME_PAYLOAD_SIZE + 2];
+  uint8_t encoded[FRAME_PAYLOAD_SIZE + 4];
+
+  frame[0] = FRAME_VERSION;
+  frame[1] = kind;
+  frame[2] = sensor;
+  putUint16(frame + 3, frameSeq++);
+  putUint32(frame + 5, millis());
+  memcpy(frame + 9, &resistance, 4);
+  memcpy(frame + 13, &ratio, 4);
+  memcpy(frame + 17, &ppm, 4);
+  putUint16(frame + FRAME_PAYLOAD_SIZE, crc16(frame, FRAME_PAYLOAD_SIZE));
+
+  size_t length = cobsEncode(frame, sizeof(frame), encoded);
+  Serial.write(encoded, length);
+  Serial.write((uint8_t)0);
+}
+
 void readSensor1() {
   sensor1Value = analogRead(sensor1Pin);
   sensor1Voltage = sensor1Value * (5.0 / 1023.0);
 
   // Debug output for sensor 1
   if (sensor1Voltage <= MIN_VOLTAGE_1) {
+    if (binaryMode) {
+      sendFrame(KIND_DEBUG, 1, NAN, NAN, NAN);
+      return;
+    }
     Serial.print(millis() / 1000);
     Serial.print("\t1\tDebug: Raw=");
     Serial.print(sensor1Value);
@@ -94,6 +204,11 @@ void readSensor1() {
     // Ensure PPM is not negative
     if (ppm1 < 0) ppm1 = 0;
 
+    if (binaryMode) {
+      sendFrame(KIND_DATA, 1, sensor1Resistance, ratio1, ppm1);
+      return;
+    }
+
     // Output sensor 1 data with consistent formatting
     Serial.print(millis() / 1000);
     Serial.print("\t1\t");
@@ -103,6 +218,8 @@ void readSensor1() {
     Serial.print("\t");
     Serial.print(ppm1, 2);
     Serial.println(" ppm");
+  } else if (binaryMode) {
+    sendFrame(KIND_DEBUG, 1, NAN, NAN, NAN);
   } else {
     Serial.print(millis() / 1000);
     Serial.print("\t1\tDebug: V=");
@@ -128,6 +245,11 @@ void readSensor2() {
       // Ensure PPM is not negative
       if (ppm2 < 0) ppm2 = 0;
 
+      if (binaryMode) {
+        sendFrame(KIND_DATA, 2, sensor2Resistance, ratio2, ppm2);
+        return;
+      }
+
       // Output sensor 2 data with consistent formatting
       Serial.print(millis() / 1000);
       Serial.print("\t2\t");
@@ -137,10 +259,14 @@ void readSensor2() {
       Serial.print("\t");
       Serial.print(ppm2, 2);
       Serial.println(" ppm");
+    } else if (binaryMode) {
+      sendFrame(KIND_WARNING, 2, NAN, NAN, NAN);
     } else {
       Serial.print(millis() / 1000);
       Serial.println("\t2\tWarning: Invalid resistance calculation");
     }
+  } else if (binaryMode) {
+    sendFrame(KIND_WARNING, 2, NAN, NAN, NAN);
   } else {
     Serial.print(millis() / 1000);
     Serial.println("\t2\tWarning: sensor 2 voltage too low!");
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import threading
+import time
+
+from binary_protocol import create_decoder, select_command
+
+
+def open_serial(port, baud_rate):
+    """Open a serial port for non-blocking reads from the event loop"""
+    import serial
+    return serial.Serial(port, baud_rate, timeout=0)
+
+
+class PortState:
+    """Connection and decoder state of one serial port"""
+
+    def __init__(self, port, protocol):
+        self.port = port
+        self.decoder = create_decoder(protocol)
+        self.serial = None
+        self.fd = None
+        self.connected = False
+        self.disconnected = None  # Future resolved by the reader callback on error
+        self.bytes_read = 0
+        self.readings = 0
+        self.reconnects = 0
+
+
+class IngestionEngine:
+    """Read every configured serial port on one asyncio loop
+
+    Each port's file descriptor is registered with loop.add_reader, so bytes
+    are framed and parsed as soon as they arrive without a thread per port.
+    Every port reconnects on its own schedule; an unplugged board never
+    stalls the others. Readings are mapped to sensor indexes from the config
+    and delivered as one stream: on_readings(port, readings, received) is
+    called on the loop thread, and (sensor_index, reading, received) tuples
+    are put on self.stream when consume() is used. A bounded stream that is
+    full drops the reading and counts it rather than stalling every port.
+    """
+
+    def __init__(self, config, protocol='ascii', baud_rate=9600, ports=None, on_readings=None,
+                 on_status=None, reconnect_delay=5.0, settle_time=2.0, open_port=open_serial,
+                 read_size=4096):
+        self.config = config
+        self.protocol = protocol
+        self.baud_rate = baud_rate
+        self.ports = list(ports) if ports is not None else config.ports
+        self.on_readings = on_readings
+        self.on_status = on_status
+        self.reconnect_delay = reconnect_delay
+        self.settle_time = settle_time
+        self.open_port = open_port
+        self.read_size = read_size
+
+        self.states = {port: PortState(port, protocol) for port in self.ports}
+        self.stream = None
+        self.stream_dropped = 0
+        self.loop = None
+        self.thread = None
+        self._stopping = None
+
+    @property
+    def connected(self):
+        """True while at least one port is connected"""
+        return any(state.connected for state in self.states.values())
+
+    def _status(self, port, connected, message):
+        if self.on_status:
+            self.on_status(port, connected, message)
+        else:
+            print(f"Ingest {port}: {message}")
+
+    async def run(self):
+        """Serve all ports until stop() is called"""
+        self.loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        tasks = [asyncio.create_task(self._run_port(state)) for state in self.states.values()]
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def consume(self, maxsize=0):
+        """Create the single asyncio.Queue that all ports feed; call from the loop
+
+        With a maxsize, readings that arrive while the queue is full are
+        dropped and counted in stream_dropped.
+        """
+        self.stream = asyncio.Queue(maxsize)
+        return self.stream
+
+    def stop(self):
+        """Stop the engine; safe to call from any thread"""
+        if self.loop is not None and self._stopping is not None:
+            self.loop.call_soon_threadsafe(self._stopping.set)
+
+    def start_thread(self):
+        """Run the engine on its own event loop in a daemon thread"""
+        self.thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+        self.thread.start()
+        return self.thread
+
+    async def _run_port(self, state):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self._status(state.port, False, f"Connecting to {state.port}...")
+                state.serial = self.open_port(state.port, self.baud_rate)
+                state.fd = state.serial.fileno()
+                if self.settle_time:
+                    # Wait for the board to start talking, at most settle_time
+                    await self._wait_readable(state.fd, self.settle_time)
+                state.serial.write(select_command(self.protocol))
+            except OSError as e:
+                # pyserial's SerialException is an OSError too
+                self._close(state)
+                self._status(state.port, False, f"Connection failed: {e}. Retrying in {self.reconnect_delay:g}s...")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            state.decoder.reset()
+            state.disconnected = loop.create_future()
+            loop.add_reader(state.fd, self._on_readable, state)
+            state.connected = True
+            self._status(state.port, True, f"Connected to {state.port}")
+
+            try:
+                error = await state.disconnected
+            finally:
+                loop.remove_reader(state.fd)
+                self._close(state)
+
+            state.reconnects += 1
+            self._status(state.port, False, f"Serial error: {error}. Retrying in {self.reconnect_delay:g}s...")
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _wait_readable(self, fd, timeout):
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(True))
+        try:
+            await asyncio.wait_for(readable, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+
+    def _on_readable(self, state):
+        try:
+            data = os.read(state.fd, self.read_size)
+            if not data:
+                raise OSError("device disconnected")
+        except OSError as e:
+            if not state.disconnected.done():
+                state.disconnected.set_result(e)
+            return
+
+        received = time.time()
+        state.bytes_read += len(data)
+        readings = state.decoder.feed(data)
+        if not readings:
+            return
+        state.readings += len(readings)
+
+        if self.on_readings:
+            self.on_readings(state.port, readings, received)
+        if self.stream is not None:
+            index_for = self.config.index_for
+            for reading in readings:
+                sensor_index = index_for(state.port, reading.sensor_id)
+                if sensor_index is not None:
+                    try:
+                        self.stream.put_nowait((sensor_index, reading, received))
+                    except asyncio.QueueFull:
+                        # Consumer is behind; never block the loop that reads every port
+                        self.stream_dropped += 1
+
+    def _close(self, state):
+        state.connected = False
+        if state.serial is not None:
+            try:
+                state.serial.close()
+            except Exception:
+                pass
+        state.serial = None
+        state.fd = None
+
+    def stats(self):
+        """Per-port byte, reading and reconnect counters"""
+        return {
+            port: {
+                "connected": state.connected,
+                "bytes_read": state.bytes_read,
+                "readings": state.readings,
+                "reconnects": state.reconnects,
+                "decoder": state.decoder.stats(),
+            }
+            for port, state in self.states.items()
+        }
@@ -0,0 +1,79 @@
+class LineFramer:
+    """Split a serial byte stream into text lines in linear time
+
+    Each feed decodes all of its complete lines in one call and splits them
+    once. The partial line left over is kept as bytes; it never grows past
+    max_line_length, so joining it to the next chunk stays cheap however
+    large the backlog. A line longer than max_line_length bytes is treated as
+    garbage: it is dropped and the framer resynchronises on the next newline.
+    bytes_dropped counts raw bytes, newlines included.
+    """
+
+    def __init__(self, max_line_length=256, encoding='utf-8'):
+        self.max_line_length = max_line_length
+        self.encoding = encoding
+        self.tail = b''  # Bytes of the line still being received
+        self.discarding = False  # True while skipping the rest of an overlong line
+        self.lines_framed = 0
+        self.overflows = 0
+        self.bytes_dropped = 0
+
+    def reset(self):
+        """Drop any partial line, e.g. after a reconnect"""
+        self.tail = b''
+        self.discarding = False
+
+    def feed(self, data):
+        """Add raw bytes (bytes or bytearray) and return the list of complete, non-empty lines"""
+        limit = self.max_line_length
+        if b'\n' not in data:
+            # Partial line only, wait for more bytes
+            if self.discarding:
+                self.bytes_dropped += len(data)
+                return []
+            self.tail += data
+            if len(self.tail) > limit:
+                self._overflow()
+            return []
+
+        data = self.tail + data
+        end = data.rfind(b'\n')
+        self.tail = data[end + 1:]
+        raw = data[:end]
+        text = raw.decode(self.encoding, 'ignore')
+        parts = text.split('\n')
+
+        # Limits are in raw bytes. For pure ASCII those equal the text
+        # lengths; otherwise (garbage, multibyte) measure the bytes too.
+        # Decoding never drops a newline, so byte and text parts line up
+        ascii = len(text) == end
+        if ascii and not self.discarding and (end <= limit or max(map(len, parts)) <= limit):
+            # The usual case: nothing to drop
+            lines = [line for line in map(str.strip, parts) if line]
+        else:
+            lines = []
+            sizes = map(len, parts) if ascii else map(len, raw.split(b'\n'))
+            for index, size in enumerate(sizes):
+                if size > limit or (index == 0 and self.discarding):
+                    # Overlong, or the tail of one cut off in an earlier feed
+                    if index or not self.discarding:
+                        self.overflows += 1
+                    self.bytes_dropped += size + 1
+                    continue
+                line = parts[index].strip()
+                if line:
+                    lines.append(line)
+            self.discarding = False
+
+        if len(self.tail) > limit:
+            self._overflow()
+        self.lines_framed += len(lines)
+        return lines
+
+    def _overflow(self):
+        # No newline within the limit: the stream is garbage or out of sync
+        if not self.discarding:
+            self.overflows += 1
+        self.bytes_dropped += len(self.tail)
+        self.tail = b''
+        self.discarding = True
@@ -1,13 +1,16 @@
 import tkinter as tk
-import serial
 import threading
 import time
-from datetime import datetime
-import queue
-import RPi.GPIO as GPIO
+from buzzer import create_buzzer
+from gpio_backend import load_gpio
+from sensor_config import load_config
+from monitor_engine import MonitorEngine
+from dashboard_render import DashboardRenderer, format_tick_stats
+from ui_refresh import UiRefresher, format_refresh_stats
 
 class HydrogenMonitorApp:
-    def __init__(self, root, serial_port='/dev/serial0', baud_rate=9600):
+    def __init__(self, root, serial_port='/dev/serial0', baud_rate=9600, reader_mode='event', protocol='ascii',
+                 config=None, monitor=None, gpio=None):
         self.root = root
         self.root.title("Hydrogen Sensor Monitor")
 
@@ -20,25 +23,19 @@ class HydrogenMonitorApp:
         self.root.focus_force()
         self.root.grab_set()
 
-        # Set threshold for alert (in PPM) - 100 ppm
-        self.threshold = 150
+        # Serial ingestion, sensor state and alerts run in the engine; this
+        # window is one of its consumers. Sensors, alert threshold (in PPM)
+        # and staleness limits come from sensors.json
+        self.monitor = monitor or MonitorEngine(config or load_config(), serial_port, baud_rate,
+                                                reader_mode, protocol)
+        self.config = self.monitor.config
+        self.threshold = self.config.threshold
+        self.sensor_count = self.config.count
 
-        # Serial connection parameters
-        self.serial_port = serial_port
-        self.baud_rate = baud_rate
-        self.serial = None
-        self.connected = False
-
-        # Buzzer setup
-        self.buzzer_pin = 26  # GPIO 26
-        self.buzzer_active = False
-        self.alert_sensors = set()  # Track which sensors are in alert state
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.buzzer_pin, GPIO.OUT)
-        GPIO.output(self.buzzer_pin, GPIO.LOW)
-
-        # Data queue for thread-safe communication
-        self.data_queue = queue.Queue()
+        # Buzzer on GPIO 26 unless sensors.json says otherwise; RPi.GPIO
+        # unless HYDROGEN_GPIO=mock
+        self.gpio = gpio or load_gpio()
+        self.buzzer = create_buzzer(self.gpio, self.config)
 
         # Set fullscreen mode
         self.root.attributes('-fullscreen', True)
@@ -50,12 +47,20 @@ class HydrogenMonitorApp:
         self.main_frame = tk.Frame(self.root, bg="black")
         self.main_frame.pack(expand=True, fill="both", padx=50, pady=50)
 
-        # Configure grid for 1 row, 2 columns
-        self.main_frame.grid_rowconfigure(0, weight=1)
-        self.main_frame.grid_columnconfigure(0, weight=1)
-        self.main_frame.grid_columnconfigure(1, weight=1)
+        # Configure grid - one cell per configured sensor
+        rows, columns = self.config.grid()
+        for row in range(rows):
+            self.main_frame.grid_rowconfigure(row, weight=1)
+        for column in range(columns):
+            self.main_frame.grid_columnconfigure(column, weight=1)
+
+        # Shrink fonts when more than two sensors share the screen
+        scale = min(1.0, 2 / columns, 1 / rows)
+
+        def font_size(size, minimum=8):
+            return max(minimum, int(size * scale))
 
-        # Create frames for both hydrogen sensors
+        # Create frames for all hydrogen sensors
         self.sensor_frames = []
         self.unit_labels = []
         self.led_indicators = []
@@ -67,10 +72,11 @@ class HydrogenMonitorApp:
         self.ratio_labels = []
         self.alert_labels = []
 
-        # Create displays for both sensors
-        for i in range(2):
+        # Create displays for all sensors
+        for i, spec in enumerate(self.config.sensors):
+            row, column = divmod(i, columns)
             sensor_frame = tk.Frame(self.main_frame, bg="black")
-            sensor_frame.grid(row=0, column=i, sticky="nsew", padx=10, pady=10)
+            sensor_frame.grid(row=row, column=column, sticky="nsew", padx=10, pady=10)
             self.sensor_frames.append(sensor_frame)
 
             # Top status bar with unit label
@@ -80,7 +86,7 @@ class HydrogenMonitorApp:
             # Unit label - top right
             unit_label = tk.Label(
                 status_bar,
-                font=("Arial", 16, "bold"),
+                font=("Arial", font_size(16), "bold"),
                 text="PPM",
                 fg="white",
                 bg="black"
@@ -98,8 +104,8 @@ class HydrogenMonitorApp:
             # Sensor name label
             name_label = tk.Label(
                 sensor_frame,
-                font=("Arial", 24, "bold"),
-                text=f"Hydrogen {i+1}",
+                font=("Arial", font_size(24), "bold"),
+                text=spec.name,
                 fg="white",
                 bg="black"
             )
@@ -109,7 +115,7 @@ class HydrogenMonitorApp:
             # Alert label (initially hidden)
             alert_label = tk.Label(
                 sensor_frame,
-                font=("Arial", 18, "bold"),
+                font=("Arial", font_size(18), "bold"),
                 text="⚠️ ALERT ⚠️",
                 fg="red",
                 bg="black"
@@ -121,7 +127,7 @@ class HydrogenMonitorApp:
             # Sensor value display
             value_label = tk.Label(
                 sensor_frame,
-                font=("Arial", 120, "bold"),
+                font=("Arial", font_size(120), "bold"),
                 text="--",
                 fg="white",
                 bg="black"
@@ -132,7 +138,7 @@ class HydrogenMonitorApp:
             # Timestamp label
             timestamp_label = tk.Label(
                 sensor_frame,
-                font=("Arial", 12),
+                font=("Arial", font_size(12)),
                 text="Last updated: --",
                 fg="gray",
                 bg="black"
@@ -147,7 +153,7 @@ class HydrogenMonitorApp:
             # Sensor resistance display
             resistance_label = tk.Label(
                 info_frame,
-                font=("Arial", 16),
+                font=("Arial", font_size(16)),
                 text="Resistance: -- Ω",
                 fg="white",
                 bg="black"
@@ -158,7 +164,7 @@ class HydrogenMonitorApp:
             # Sensor ratio display
             ratio_label = tk.Label(
                 info_frame,
-                font=("Arial", 16),
+                font=("Arial", font_size(16)),
                 text="Rs/R0: --",
                 fg="white",
                 bg="black"
@@ -176,6 +182,9 @@ class HydrogenMonitorApp:
         )
         self.status_label.pack(side=tk.BOTTOM, pady=10)
 
+        # Redraws only the widgets whose text or color changed
+        self.renderer = DashboardRenderer(self)
+
         # Remove escape key binding to prevent easy exit from fullscreen
         # self.root.bind("<Escape>", self.end_fullscreen)  # Commented out
         
@@ -183,60 +192,24 @@ class HydrogenMonitorApp:
         self.root.bind("<Control-Shift-q>", self.emergency_exit)
         self.root.bind("<Control-Shift-Q>", self.emergency_exit)
 
-        # Initialize sensor data for both sensors
-        self.sensor_data = [
-            {
-                "value": "--",
-                "resistance": "--",
-                "ratio": "--",
-                "timestamp": None
-            },
-            {
-                "value": "--",
-                "resistance": "--",
-                "ratio": "--",
-                "timestamp": None
-            }
-        ]
-
-        # Initialize web server data (for sharing with external web server)
-        self.web_sensor_data = [
-            {
-                "value": "--",
-                "resistance": "--",
-                "ratio": "--",
-                "timestamp": None,
-                "status": "disconnected"
-            },
-            {
-                "value": "--",
-                "resistance": "--",
-                "ratio": "--",
-                "timestamp": None,
-                "status": "disconnected"
-            }
-        ]
-        
         # Register cleanup function to run on window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-        # Start serial connection in a separate thread
-        self.serial_thread = threading.Thread(target=self.run_serial_connection)
-        self.serial_thread.daemon = True
-        self.serial_thread.start()
-
-        # Start buzzer control thread
-        self.buzzer_thread = threading.Thread(target=self.buzzer_control)
-        self.buzzer_thread.daemon = True
-        self.buzzer_thread.start()
+        # Redraw as soon as readings arrive; a 1 s timer keeps staleness checks going
+        self.refresher = UiRefresher(self.root, self.update_ui)
+        self.monitor.bus.listen("readings", lambda message: self.refresher.notify(message[0]))
+        self.monitor.bus.listen("status", lambda message: self.refresher.notify())
+        # Sounds on the alert transition itself rather than a polled flag
+        self.buzzer.follow(self.monitor)
+        self.monitor.start()
 
         # Start web data sharing thread
         self.web_data_thread = threading.Thread(target=self.update_web_data)
         self.web_data_thread.daemon = True
         self.web_data_thread.start()
 
-        # Schedule UI updates
-        self.update_ui()
+        # First draw; later ones follow incoming readings
+        self.refresher.run()
 
     def end_fullscreen(self, event=None):
         # Disabled - keep in fullscreen
@@ -250,30 +223,11 @@ class HydrogenMonitorApp:
     def on_closing(self):
         """Clean up and close application"""
         print("Closing application...")
-        GPIO.output(self.buzzer_pin, GPIO.LOW)
-        GPIO.cleanup()
+        self.monitor.close()
+        self.buzzer.close()
+        self.gpio.cleanup()
         self.root.destroy()
 
-    def buzzer_control(self):
-        """Control buzzer based on alert state"""
-        while True:
-            if self.alert_sensors:
-                if not self.buzzer_active:
-                    self.buzzer_active = True
-                    print(f"ALERT: Sensors {list(self.alert_sensors)} exceeded threshold!")
-                
-                # Intermittent buzzer pattern
-                GPIO.output(self.buzzer_pin, GPIO.HIGH)
-                time.sleep(0.5)
-                GPIO.output(self.buzzer_pin, GPIO.LOW)
-                time.sleep(0.5)
-            else:
-                if self.buzzer_active:
-                    self.buzzer_active = False
-                    GPIO.output(self.buzzer_pin, GPIO.LOW)
-                    print("Alert cleared - buzzer off")
-                time.sleep(0.1)
-
     def update_web_data(self):
         """Update web server data continuously"""
         try:
@@ -281,8 +235,7 @@ class HydrogenMonitorApp:
             
             while True:
                 # Update the global sensor_data in webserver module
-                sensor_data[0] = self.web_sensor_data[0].copy()
-                sensor_data[1] = self.web_sensor_data[1].copy()
+                sensor_data[:] = self.monitor.snapshots(time.time())
                 time.sleep(1)
                 
         except ImportError:
@@ -292,213 +245,28 @@ class HydrogenMonitorApp:
             print(f"Error updating web data: {e}")
 
     def update_ui(self):
-        """Update UI with the latest sensor data"""
-        # Process queued data
-        while not self.data_queue.empty():
-            try:
-                sensor_data = self.data_queue.get_nowait()
-                sensor_index = sensor_data["sensor_index"]
-                self.sensor_data[sensor_index] = sensor_data["data"]
-                
-                # Update web server data with proper status
-                self.web_sensor_data[sensor_index] = {
-                    "value": sensor_data["data"]["value"],
-                    "resistance": sensor_data["data"]["resistance"],
-                    "ratio": sensor_data["data"]["ratio"],
-                    "timestamp": sensor_data["data"]["timestamp"],
-                    "status": "connected" if sensor_data["data"]["timestamp"] and time.time() - sensor_data["data"]["timestamp"] < 10 else "disconnected"
-                }
-            except queue.Empty:
-                break
-
-        for sensor_index in range(2):
-            data = self.sensor_data[sensor_index]
-
-            # Update PPM value - only show "--" if never received data
-            if data["value"] != "--":
-                try:
-                    value = float(data["value"])
-                    # Format with 2 decimal places minimum
-                    display_value = f"{value:.2f}"
-                    
-                    # Check for alert condition
-                    if value > self.threshold:
-                        self.value_labels[sensor_index].config(text=display_value, fg="red")
-                        self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="red")
-                        self.alert_labels[sensor_index].pack(pady=(0, 5))
-                        self.alert_sensors.add(sensor_index + 1)
-                        
-                        # Flash the sensor name
-                        current_color = self.name_labels[sensor_index].cget("fg")
-                        new_color = "red" if current_color == "white" else "white"
-                        self.name_labels[sensor_index].config(fg=new_color)
-                    else:
-                        self.value_labels[sensor_index].config(text=display_value, fg="white")
-                        self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="green")
-                        self.alert_labels[sensor_index].pack_forget()
-                        self.alert_sensors.discard(sensor_index + 1)
-                        self.name_labels[sensor_index].config(fg="white")
-                        
-                except (ValueError, TypeError):
-                    # Keep showing last valid value, just change color to indicate issue
-                    current_text = self.value_labels[sensor_index].cget("text")
-                    if current_text != "--":
-                        self.value_labels[sensor_index].config(fg="orange")  # Orange indicates stale data
-                    else:
-                        self.value_labels[sensor_index].config(text="--", fg="red")
-                    self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="gray")
-                    self.alert_labels[sensor_index].pack_forget()
-                    self.alert_sensors.discard(sensor_index + 1)
-            else:
-                # Only show "--" if we've never received data for this sensor
-                if not self.connected:
-                    self.value_labels[sensor_index].config(text="--", fg="red")
-                    self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="gray")
-                    self.alert_labels[sensor_index].pack_forget()
-                    self.alert_sensors.discard(sensor_index + 1)
-
-            # Update timestamp
-            if data["timestamp"]:
-                time_str = datetime.fromtimestamp(data["timestamp"]).strftime('%H:%M:%S.%f')[:-3]
-                self.timestamp_labels[sensor_index].config(text=f"Last updated: {time_str}")
-                
-                # Check if data is stale (older than 5 seconds)
-                if time.time() - data["timestamp"] > 5:
-                    current_text = self.value_labels[sensor_index].cget("text")
-                    if current_text != "--":
-                        self.value_labels[sensor_index].config(fg="orange")  # Indicate stale data
-
-            # Update additional info - keep last known values
-            if data["resistance"] != "--" and data["ratio"] != "--":
-                self.resistance_labels[sensor_index].config(text=f"Resistance: {data['resistance']} Ω")
-                self.ratio_labels[sensor_index].config(text=f"Rs/R0: {data['ratio']}")
-
-        # Update web server data status for stale connections
-        for sensor_index in range(2):
-            if (self.web_sensor_data[sensor_index]["timestamp"] and 
-                time.time() - self.web_sensor_data[sensor_index]["timestamp"] > 10):
-                self.web_sensor_data[sensor_index]["status"] = "disconnected"
-            elif not self.connected:
-                self.web_sensor_data[sensor_index]["status"] = "disconnected"
-
-        # Schedule next update - reduced frequency for better performance
-        self.root.after(100, self.update_ui)
-
-    def run_serial_connection(self):
-        """Run the serial connection in a separate thread"""
-        while True:
-            try:
-                # Try to open the serial connection
-                self.status_label.config(text=f"Connecting to {self.serial_port}...", fg="yellow")
-                self.serial = serial.Serial(self.serial_port, self.baud_rate, timeout=1)
-                
-                # Clear any existing data in the buffer
-                self.serial.flushInput()
-                time.sleep(2)  # Wait for connection to initialize
-
-                self.status_label.config(text=f"Connected to {self.serial_port}", fg="green")
-                self.connected = True
-
-                # Main reading loop
-                buffer = ""
-                while True:
-                    try:
-                        if self.serial.in_waiting > 0:
-                            # Read available data
-                            new_data = self.serial.read(self.serial.in_waiting).decode('utf-8', errors='ignore')
-                            buffer += new_data
-                            
-                            # Process complete lines
-                            while '\n' in buffer:
-                                line, buffer = buffer.split('\n', 1)
-                                line = line.strip()
-                                if line:
-                                    self.process_sensor_data(line)
-                                    
-                    except (serial.SerialException, OSError) as e:
-                        self.status_label.config(text=f"Serial error: {str(e)}", fg="red")
-                        self.connected = False
-                        break
-
-                    time.sleep(0.01)  # Very short delay to prevent CPU hogging
-
-            except (serial.SerialException, OSError) as e:
-                self.status_label.config(text=f"Connection failed: {str(e)}. Retrying in 5s...", fg="red")
-                self.connected = False
-                if self.serial:
-                    try:
-                        self.serial.close()
-                    except:
-                        pass
-
-            # Wait before reconnecting
-            time.sleep(5)
-
-    def process_sensor_data(self, data_line):
-        """Process the data coming from the Arduino"""
-        try:
-            # Skip header lines and warnings, but allow debug messages
-            if any(skip_word in data_line for skip_word in ["MICS-5524", "Warming", "Sensors ready", "Time(s)"]):
-                return
-
-            # Parse the data line
-            parts = data_line.split('\t')
-
-            if len(parts) >= 2:
-                try:
-                    sensor_id = int(parts[1])
-                    if sensor_id not in [1, 2]:
-                        return
-
-                    # Adjust to 0-based index
-                    sensor_index = sensor_id - 1
-
-                    # Handle debug/warning messages - keep last known values
-                    if "Debug:" in data_line or "Warning:" in data_line:
-                        # Don't update values, just update timestamp to show it's still active
-                        if self.sensor_data[sensor_index]["value"] != "--":
-                            self.sensor_data[sensor_index]["timestamp"] = time.time()
-                        return
-
-                    # Handle normal data - Expected format: Time(s)\tSensor\tRs(ohms)\tRs/R0\tH2(ppm)
-                    if len(parts) >= 5:
-                        resistance = parts[2]
-                        ratio = parts[3]
-                        ppm_part = parts[4].split()[0]  # Remove the " ppm" part
-
-                        # Validate numeric values
-                        float(ppm_part)  # This will raise ValueError if invalid
-                        float(resistance)
-                        float(ratio)
-
-                        # Queue the data for UI update
-                        sensor_data = {
-                            "sensor_index": sensor_index,
-                            "data": {
-                                "value": ppm_part,
-                                "resistance": resistance,
-                                "ratio": ratio,
-                                "timestamp": time.time()
-                            }
-                        }
-                        
-                        # Add to queue (non-blocking)
-                        try:
-                            self.data_queue.put_nowait(sensor_data)
-                        except queue.Full:
-                            # If queue is full, remove oldest item and add new one
-                            try:
-                                self.data_queue.get_nowait()
-                                self.data_queue.put_nowait(sensor_data)
-                            except queue.Empty:
-                                pass
-                            
-                except (ValueError, IndexError):
-                    # Skip invalid data but don't reset values
-                    return
-                    
-        except Exception as e:
-            print(f"Error processing data: {str(e)}, Line: {data_line}")
+        """Update UI with the latest sensor data; returns seconds until the next redraw is due"""
+        started = time.perf_counter()
+        monitor = self.monitor
+        calls = self.renderer.render_status(*monitor.status)
+
+        # Staleness checks for every channel in one pass, alarms as the alert
+        # engine decided them; the engine updates the state under this lock,
+        # so only copy it there and draw after releasing it
+        with monitor.lock:
+            status = monitor.evaluate(time.time())
+            state = monitor.state.copy()
+            connected = monitor.connected
+        calls += self.renderer.render(state, status, connected)
+
+        # Per-tick cost, printed once a minute
+        self.renderer.record_tick(time.perf_counter() - started, calls)
+        stats = self.renderer.maybe_report()
+        if stats:
+            print(format_tick_stats(stats))
+            print(format_refresh_stats(self.refresher.take_stats()))
+
+        return self.renderer.next_frame(status)
 
 if __name__ == "__main__":
     print("Note: Use run_system.py to start both GUI and web server together")
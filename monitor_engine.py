@@ -0,0 +1,251 @@
+import threading
+import time
+
+from alerts import AlertEngine, format_alert_stats
+from binary_protocol import create_decoder, select_command
+from pubsub import MessageBus
+from ring_buffer import SensorHistory
+from sensor_parser import parse_line, ReadingKind
+from sensor_state import SensorState, empty_snapshot
+from serial_reader import SerialReader, wait_for_data
+from storage import open_store
+
+
+class MonitorEngine:
+    """Serial ingestion, parsing, sensor state and alerts, with no display or GPIO
+
+    Readings are applied to the state on the ingestion thread and results
+    are published on a MessageBus for any number of consumers (the Tk
+    dashboard, the web bridge, a headless logger):
+
+    - "readings": (received, sensor_indexes) for every batch applied
+    - "sensors": (sensor_index, snapshot) whenever a sensor's web API entry
+      changes; checked on every batch and at least once per publish_interval
+      so staleness shows up without new data
+    - "alert_events": an AlertEvent for every rule raised or cleared
+    - "alerts": sorted tuple of sensor numbers in alarm, on change
+    - "status": (level, message) on connection changes; level is
+      "connecting", "connected" or "error"
+
+    Consumers reading self.state must hold self.lock; evaluate() may be
+    called with it held.
+    """
+
+    def __init__(self, config, serial_port='/dev/serial0', baud_rate=9600, reader_mode='event',
+                 protocol='ascii', bus=None, store=None, publish_interval=1.0, settle_time=2.0,
+                 report_interval=60):
+        self.config = config
+        self.serial_port = serial_port
+        self.baud_rate = baud_rate
+        self.reader_mode = reader_mode  # "event" blocks on the port, "poll" is the old 10 ms loop
+        self.protocol = protocol  # "ascii" text lines or "binary" COBS/CRC16 frames
+        self.bus = bus or MessageBus()
+        self.publish_interval = publish_interval
+        self.settle_time = settle_time  # Longest wait for a freshly opened board to speak
+        self.report_interval = report_interval
+        self.serial = None
+        self.reader = None
+        self.connected = False
+        self.status = ("connecting", "Connecting to serial port...")
+        self.alert_sensors = ()
+
+        # Latest reading of every sensor in array-backed state
+        self.state = SensorState(config)
+        self.lock = threading.RLock()
+
+        # Fixed-size ring buffer of recent readings per sensor, written by the ingestion thread
+        self.history = SensorHistory(config.count, config.history_size)
+
+        # Alarm rules run on each reading as it is parsed, on the ingestion thread;
+        # rates of rise come from the history above
+        self.alerts = AlertEngine(config, self.history)
+
+        # Persistent reading store (sensors.json "storage"), appended to by the ingestion thread
+        self.store = store if store is not None else open_store(config)
+
+        # Board channel -> sensor index for the port this engine reads; a port
+        # that isn't in sensors.json reads the first configured board
+        self.channel_map = config.channel_map(serial_port) or config.channel_map(config.ports[0])
+        self.channel_maps = {port: config.channel_map(port) for port in config.ports}
+
+        # Set on every applied batch so "sensors" goes out now, not at the next interval
+        self.changed = threading.Event()
+        self.ingestion = None
+        self.threads = []
+
+    def start(self):
+        """Start ingestion and snapshot publishing; returns immediately"""
+        if self.threads:
+            return
+        # With several boards in sensors.json one asyncio loop serves every port
+        if len(self.config.ports) > 1:
+            # asyncio is only worth importing when there are several ports
+            from ingest import IngestionEngine
+
+            self.ingestion = IngestionEngine(self.config, protocol=self.protocol, baud_rate=self.baud_rate,
+                                             on_readings=self.process_port_readings,
+                                             on_status=self.update_port_status,
+                                             settle_time=self.settle_time)
+            self.threads.append(self.ingestion.start_thread())
+        else:
+            serial_thread = threading.Thread(target=self.run_serial_connection, daemon=True)
+            serial_thread.start()
+            self.threads.append(serial_thread)
+
+        publisher = threading.Thread(target=self.publish_snapshots, daemon=True)
+        publisher.start()
+        self.threads.append(publisher)
+
+    def close(self):
+        if self.ingestion is not None:
+            self.ingestion.stop()
+        if self.store is not None:
+            self.store.close()
+
+    def set_status(self, level, message):
+        self.status = (level, message)
+        self.bus.publish("status", self.status)
+
+    def evaluate(self, now):
+        """Staleness checks for every channel in one pass, with the alert engine's alarms"""
+        with self.lock:
+            status = self.state.evaluate(now, self.connected)
+            return status._replace(alert=self.alerts.alarm.copy())
+
+    def snapshots(self, now):
+        """All sensors in the JSON shape served by the web API"""
+        with self.lock:
+            return self.state.snapshots(now, self.connected, self.alerts.alarm)
+
+    def publish_snapshots(self):
+        """Publish changed web API entries after each batch and every publish_interval"""
+        # Consumers start out with empty entries, so only real changes go out
+        last_sent = [empty_snapshot() for _ in range(self.config.count)]
+        last_report = time.monotonic()
+        while True:
+            try:
+                self.changed.wait(self.publish_interval)
+                self.changed.clear()
+                for sensor_index, data in enumerate(self.snapshots(time.time())):
+                    if last_sent[sensor_index] != data:
+                        last_sent[sensor_index] = data
+                        self.bus.publish("sensors", (sensor_index, data))
+
+                # Alarm latency, printed once per report_interval when anything happened
+                if self.report_interval and time.monotonic() - last_report >= self.report_interval:
+                    last_report = time.monotonic()
+                    with self.lock:
+                        stats = self.alerts.take_stats()
+                    if stats["transitions"]:
+                        print(format_alert_stats(stats))
+            except Exception as e:
+                print(f"Error publishing sensor data: {e}")
+                time.sleep(1)
+
+    def run_serial_connection(self):
+        """Read the configured serial port forever, reconnecting on errors"""
+        import serial
+
+        while True:
+            try:
+                # Try to open the serial connection
+                self.set_status("connecting", f"Connecting to {self.serial_port}...")
+                self.serial = serial.Serial(self.serial_port, self.baud_rate, timeout=1)
+
+                # Clear any existing data in the buffer, then wait until the
+                # board is talking instead of sleeping a fixed 2 s
+                self.serial.flushInput()
+                wait_for_data(self.serial, self.settle_time)
+
+                # Tell the Arduino which output protocol to use
+                self.serial.write(select_command(self.protocol))
+
+                self.connected = True
+                self.set_status("connected", f"Connected to {self.serial_port}")
+
+                # Main reading loop - the reader blocks until data arrives
+                self.reader = SerialReader(self.serial, mode=self.reader_mode)
+                decoder = create_decoder(self.protocol)
+                while True:
+                    try:
+                        new_data = self.reader.read()
+                        if new_data:
+                            # Process complete lines or frames
+                            self.process_readings(decoder.feed(new_data), received=time.time())
+                            self.reader.mark_parsed()
+
+                        if self.reader.maybe_report():
+                            print(f"Serial decoder ({self.protocol}): {decoder.stats()}")
+
+                    except (serial.SerialException, OSError) as e:
+                        self.connected = False
+                        self.set_status("error", f"Serial error: {str(e)}")
+                        break
+
+            except (serial.SerialException, OSError) as e:
+                self.connected = False
+                self.set_status("error", f"Connection failed: {str(e)}. Retrying in 5s...")
+                if self.serial:
+                    try:
+                        self.serial.close()
+                    except:
+                        pass
+
+            # Wait before reconnecting
+            time.sleep(5)
+
+    def process_sensor_data(self, data_line):
+        """Process a single line coming from the Arduino"""
+        reading = parse_line(data_line)
+        if reading is not None:
+            self.process_readings((reading,))
+
+    def process_port_readings(self, port, readings, received):
+        """Readings from the multi-port ingestion engine"""
+        self.process_readings(readings, self.channel_maps[port], received)
+
+    def update_port_status(self, port, connected, message):
+        """Connection changes reported by the multi-port ingestion engine"""
+        self.connected = self.ingestion.connected
+        self.set_status("connected" if connected else "error", message)
+
+    def process_readings(self, readings, channel_map=None, received=None):
+        """Apply a batch of parsed readings to the state, then publish"""
+        channel_map = channel_map or self.channel_map
+        now = time.time()
+        applied = []
+        events = []
+        with self.lock:
+            for reading in readings:
+                # Skip header lines and channels that aren't configured
+                if reading.kind == ReadingKind.HEADER:
+                    continue
+                sensor_index = channel_map.get(reading.sensor_id)
+                if sensor_index is None:
+                    continue
+
+                # Debug/warning messages keep the last known values
+                if reading.kind != ReadingKind.DATA:
+                    self.state.touch(sensor_index, now)
+                else:
+                    self.state.update(sensor_index, reading.ppm, reading.resistance, reading.ratio, now)
+                    # The rate-of-rise rule reads this history
+                    self.history.append(sensor_index, now, reading.resistance, reading.ratio, reading.ppm)
+                    events.extend(self.alerts.evaluate(sensor_index, reading.ppm, now, received))
+                applied.append((sensor_index, reading))
+            if not applied:
+                return
+
+        # Alarms first: the buzzer shouldn't wait behind the display
+        if events:
+            for event in events:
+                self.bus.publish("alert_events", event)
+            if self.alerts.alert_sensors != self.alert_sensors:
+                self.alert_sensors = self.alerts.alert_sensors
+                self.bus.publish("alerts", self.alert_sensors)
+        self.bus.publish("readings", (received or now, tuple(index for index, _ in applied)))
+        self.changed.set()
+
+        for sensor_index, reading in applied:
+            if self.store is not None:
+                self.store.append_reading(now, sensor_index + 1, reading)
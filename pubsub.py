@@ -0,0 +1,88 @@
+import threading
+from collections import deque
+
+
+class Subscription:
+    """Bounded FIFO of messages for one subscriber
+
+    When full, the oldest message is dropped and counted, so a stalled
+    subscriber costs a fixed amount of memory and never blocks publishers.
+    """
+
+    def __init__(self, bus, topic, maxsize):
+        self.bus = bus
+        self.topic = topic
+        self.messages = deque(maxlen=maxsize)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, message):
+        with self.condition:
+            if len(self.messages) == self.messages.maxlen:
+                self.dropped += 1
+            self.messages.append(message)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Next message, or None if nothing arrives within timeout seconds or once closed"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.messages or self.closed, timeout):
+                return None
+            return self.messages.popleft() if self.messages else None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class MessageBus:
+    """In-process publish/subscribe between threads
+
+    Each topic keeps an immutable tuple of subscriptions, replaced on
+    (un)subscribe, so publish() takes no lock while delivering.
+    """
+
+    def __init__(self):
+        self.topics = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, topic, maxsize=100):
+        subscription = Subscription(self, topic, maxsize)
+        with self.lock:
+            self.topics[topic] = self.topics.get(topic, ()) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.topics.get(subscription.topic, ())
+            self.topics[subscription.topic] = tuple(s for s in subscriptions if s is not subscription)
+
+    def listen(self, topic, callback, maxsize=100):
+        """Call callback(message) for each message on topic, from a daemon thread
+
+        Returns the subscription; closing it stops the thread.
+        """
+        subscription = self.subscribe(topic, maxsize)
+
+        def deliver():
+            while not subscription.closed:
+                message = subscription.get()
+                if message is None:
+                    continue
+                try:
+                    callback(message)
+                except Exception as e:
+                    print(f"Error handling {topic} message: {e}")
+
+        threading.Thread(target=deliver, name=f"listen-{topic}", daemon=True).start()
+        return subscription
+
+    def publish(self, topic, message):
+        """Deliver to every current subscriber of topic; returns how many there were"""
+        subscriptions = self.topics.get(topic, ())
+        for subscription in subscriptions:
+            subscription.put(message)
+        return len(subscriptions)
@@ -0,0 +1,335 @@
+import glob
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from downsample import EMPTY_BUCKETS, Buckets, raw_buckets
+from sensor_parser import ReadingKind
+
+# Segment file: 64-byte header followed by fixed-width little-endian records
+MAGIC = b'H2LOG\0\0\0'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQd')  # magic, version, record size, record count, created
+HEADER_SIZE = 64
+COUNT_OFFSET = 16
+# Flags live in the header's spare bytes, which older segments left zero
+FLAGS = struct.Struct('<I')
+FLAGS_OFFSET = HEADER.size
+# Set once a record is older than one before it, e.g. after the clock stepped back
+UNORDERED = 1
+
+# timestamp, sensor id, reading kind, resistance, ratio, ppm - 24 bytes
+RECORD = struct.Struct('<dHBxfff')
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('sensor', '<u2'),
+    ('kind', 'u1'),
+    ('pad', 'u1'),
+    ('resistance', '<f4'),
+    ('ratio', '<f4'),
+    ('ppm', '<f4'),
+])
+
+SEGMENT_SUFFIX = '.seg'
+
+
+def _nan(value):
+    return math.nan if value is None else value
+
+
+class Segment:
+    """One preallocated, memory-mapped segment file being appended to"""
+
+    def __init__(self, path, capacity, created):
+        self.path = path
+        self.capacity = capacity
+        self.created = created
+        self.count = 0
+        self.newest = -math.inf
+        self.ordered = True
+        self.file = open(path, 'w+b')
+        self.file.truncate(HEADER_SIZE + capacity * RECORD.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, 0, created)
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def append(self, timestamp, sensor_id, kind, resistance, ratio, ppm):
+        if timestamp >= self.newest:
+            self.newest = timestamp
+        elif self.ordered:
+            # NTP stepped the clock back: readers must stop bisecting this segment
+            self.ordered = False
+            FLAGS.pack_into(self.map, FLAGS_OFFSET, UNORDERED)
+        RECORD.pack_into(self.map, HEADER_SIZE + self.count * RECORD.size,
+                         timestamp, sensor_id, kind, resistance, ratio, ppm)
+        self.count += 1
+        # Publish the record to readers only after it has been written
+        struct.pack_into('<Q', self.map, COUNT_OFFSET, self.count)
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        """Flush, unmap and trim the unused preallocated tail"""
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(HEADER_SIZE + self.count * RECORD.size)
+        self.file.close()
+
+
+def read_segment(path):
+    """Map a segment read-only and return its valid records as a structured array"""
+    return _map_segment(path)[0]
+
+
+def _map_segment(path):
+    # (records, ordered, closed); a closed segment is trimmed and never changes again
+    with open(path, 'rb') as f:
+        header = f.read(FLAGS_OFFSET + FLAGS.size)
+        size = os.fstat(f.fileno()).st_size
+    if len(header) < FLAGS_OFFSET + FLAGS.size:
+        return np.empty(0, dtype=RECORD_DTYPE), True, False
+    magic, version, record_size, count, _ = HEADER.unpack_from(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size or not count:
+        return np.empty(0, dtype=RECORD_DTYPE), True, False
+    (flags,) = FLAGS.unpack_from(header, FLAGS_OFFSET)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+    return records, not flags & UNORDERED, size == HEADER_SIZE + count * RECORD.size
+
+
+class ReadingLog:
+    """Append-only reading log stored as rotating memory-mapped segment files
+
+    Appends are a struct.pack_into into the current segment's mmap - no
+    syscall per record. Dirty pages are flushed by a background thread every
+    flush_interval seconds, so writes to the SD card are batched and the
+    ingestion thread never waits on the disk. Segments rotate when full or
+    older than segment_seconds, and the oldest are pruned to stay within
+    max_bytes and retention_seconds. scan() reads a time range through
+    read-only maps, touching only the segments and pages it needs.
+
+    Timestamps are wall clock and may step backwards (NTP on a Pi without
+    an RTC). Segment names are kept in creation order regardless, a segment
+    holding a backward step is flagged in its header and scanned with a
+    mask instead of a bisection, and scan() picks segments by the time
+    range of their records rather than by name.
+
+    A writer that was killed leaves its last segment at the preallocated
+    size; opening the log trims it to the records its header counts. A
+    readonly log, opened to query while another process writes, leaves the
+    files alone.
+    """
+
+    def __init__(self, path, segment_bytes=8 * 1024 * 1024, max_bytes=1024 * 1024 * 1024,
+                 retention_seconds=90 * 86400, segment_seconds=86400, flush_interval=5.0, readonly=False):
+        self.path = path
+        self.segment_capacity = max(1, (segment_bytes - HEADER_SIZE) // RECORD.size)
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self.segment_seconds = segment_seconds
+        self.flush_interval = flush_interval
+        self.segment = None
+        self.spans = {}  # Closed segment path -> (oldest, newest, ordered)
+        self.records_written = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+        os.makedirs(path, exist_ok=True)
+        if not readonly:
+            self._trim_segments()
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _trim_segments(self):
+        """Cut segments left untrimmed by a writer that never closed them down to their records"""
+        for path in self.segments():
+            with open(path, 'r+b') as f:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    continue
+                magic, version, record_size, count, _ = HEADER.unpack(header)
+                if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                    continue
+                used = HEADER_SIZE + count * RECORD.size
+                if os.fstat(f.fileno()).st_size > used:
+                    f.truncate(used)
+
+    def _segment_path(self, created):
+        return os.path.join(self.path, f"{int(created * 1000):015d}{SEGMENT_SUFFIX}")
+
+    def append(self, timestamp, sensor_id, kind, resistance, ratio, ppm):
+        """Append one record; missing values are stored as NaN"""
+        segment = self.segment
+        if segment is None or segment.full or timestamp - segment.created >= self.segment_seconds:
+            segment = self._rotate(timestamp)
+        segment.append(timestamp, sensor_id, int(kind), _nan(resistance), _nan(ratio), _nan(ppm))
+        self.records_written += 1
+
+    def append_reading(self, timestamp, sensor_id, reading):
+        """Append a parsed sensor_parser.Reading"""
+        self.append(timestamp, sensor_id, reading.kind, reading.resistance, reading.ratio, reading.ppm)
+
+    def _rotate(self, timestamp):
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+            paths = self.segments()
+            if paths:
+                # Name segments in creation order even if the clock went back
+                timestamp = max(timestamp, _segment_start(paths[-1]) + 0.001)
+            path = self._segment_path(timestamp)
+            while os.path.exists(path):
+                timestamp += 0.001
+                path = self._segment_path(timestamp)
+            self.segment = Segment(path, self.segment_capacity, timestamp)
+        self.prune(timestamp)
+        return self.segment
+
+    def flush(self):
+        """msync the active segment"""
+        with self.lock:
+            if self.segment is not None:
+                self.segment.flush()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except (OSError, ValueError) as e:
+                print(f"Reading log flush error: {e}")
+
+    def segments(self):
+        """Segment files, oldest first"""
+        return sorted(glob.glob(os.path.join(self.path, '*' + SEGMENT_SUFFIX)))
+
+    def prune(self, now=None):
+        """Delete the oldest closed segments beyond the size or age limits"""
+        now = time.time() if now is None else now
+        paths = self.segments()
+        active = self.segment.path if self.segment is not None else None
+        sizes = {path: os.path.getsize(path) for path in paths}
+        total = sum(sizes.values())
+        for index, path in enumerate(paths):
+            if path == active:
+                break
+            # A segment ends where the next one starts
+            next_start = _segment_start(paths[index + 1]) if index + 1 < len(paths) else now
+            if total > self.max_bytes or next_start < now - self.retention_seconds:
+                os.remove(path)
+                self.spans.pop(path, None)
+                total -= sizes[path]
+            else:
+                break
+
+    def scan(self, start, end, sensor_id=None):
+        """Records with start <= timestamp < end, optionally for one sensor, in time order"""
+        results = list(self._chunks(start, end, sensor_id))
+        if not results:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        records = np.concatenate(results)
+        timestamps = records['timestamp']
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            # Overlapping segments or a backward step inside one
+            records = records[np.argsort(timestamps, kind='stable')]
+        return records
+
+    def _chunks(self, start, end, sensor_id=None):
+        """Matching records of each segment in the range, copied out of its map"""
+        for path in self.segments():
+            span = self.spans.get(path)
+            if span is not None and (span[0] >= end or span[1] < start):
+                continue
+            try:
+                records, ordered, closed = _map_segment(path)
+            except FileNotFoundError:
+                # Pruned since it was listed
+                continue
+            if not len(records):
+                continue
+            timestamps = records['timestamp']
+            if span is None:
+                if ordered:
+                    span = (float(timestamps[0]), float(timestamps[-1]), True)
+                else:
+                    span = (float(timestamps.min()), float(timestamps.max()), False)
+                if closed:
+                    self.spans[path] = span
+                if span[0] >= end or span[1] < start:
+                    continue
+            if ordered:
+                lo = int(np.searchsorted(timestamps, start, side='left'))
+                hi = int(np.searchsorted(timestamps, end, side='left'))
+                chunk = records[lo:hi]
+            else:
+                chunk = records[(timestamps >= start) & (timestamps < end)]
+            # Copy only the selected sensor's records out of the map
+            if sensor_id is not None:
+                chunk = np.asarray(chunk[chunk['sensor'] == sensor_id])
+            else:
+                chunk = np.array(chunk)
+            del records, timestamps
+            if len(chunk):
+                yield chunk
+
+    def history(self, sensor_id, start, end, bucket_seconds=0):
+        """Data readings of one sensor as downsample.Buckets
+
+        The log has no rollups: with bucket_seconds, each segment's readings
+        are aggregated into buckets of that width (aligned to the epoch, and
+        timestamped at their start) as they are read, so long windows never
+        hold every raw reading at once.
+        """
+        if bucket_seconds <= 0:
+            records = self.scan(start, end, sensor_id)
+            records = records[(records['kind'] == ReadingKind.DATA) & np.isfinite(records['ppm'])]
+            return raw_buckets(records['timestamp'], records['ppm'])
+
+        parts = []
+        for chunk in self._chunks(start, end, sensor_id):
+            chunk = chunk[(chunk['kind'] == ReadingKind.DATA) & np.isfinite(chunk['ppm'])]
+            if len(chunk):
+                timestamps = chunk['timestamp']
+                ppm = chunk['ppm'].astype(float)
+                if np.any(timestamps[1:] < timestamps[:-1]):
+                    order = np.argsort(timestamps, kind='stable')
+                    timestamps, ppm = timestamps[order], ppm[order]
+                index = np.floor(timestamps / bucket_seconds).astype(np.int64)
+                parts.append(_reduce_buckets(index, np.ones(len(ppm)), ppm, ppm, ppm))
+        if not parts:
+            return EMPTY_BUCKETS
+        index, counts, sums, low, high = (np.concatenate(column) for column in zip(*parts))
+        if len(parts) > 1:
+            # Buckets straddling segments, or segments overlapping after a clock step
+            order = np.argsort(index, kind='stable')
+            index, counts, sums, low, high = _reduce_buckets(
+                index[order], counts[order], sums[order], low[order], high[order])
+        return Buckets(index * float(bucket_seconds), counts, sums / counts, low, high)
+
+    def close(self):
+        """Stop the flusher and close the active segment"""
+        self._stop.set()
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+
+
+def _reduce_buckets(index, counts, sums, low, high):
+    # Merge runs of equal, sorted bucket indexes: (index, count, sum, min, max) per bucket
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    return (index[starts], np.add.reduceat(counts, starts), np.add.reduceat(sums, starts),
+            np.minimum.reduceat(low, starts), np.maximum.reduceat(high, starts))
+
+
+def _segment_start(path):
+    return int(os.path.basename(path)[:-len(SEGMENT_SUFFIX)]) / 1000
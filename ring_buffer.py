@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Views into a ring buffer, oldest sample first. They share memory with the
+# buffer, so copy them if they must outlive the next `capacity` appends
+Window = namedtuple("Window", ["timestamp", "resistance", "ratio", "ppm"])
+
+RollingStats = namedtuple("RollingStats", ["count", "mean", "min", "max", "slope"])
+
+_EMPTY_STATS = RollingStats(0, np.nan, np.nan, np.nan, np.nan)
+
+
+class ReadingRing:
+    """Preallocated ring buffer of recent readings for one sensor
+
+    Every sample is written twice, at i and i + capacity, so the most recent
+    n <= capacity samples are always one contiguous slice. Appends are O(1)
+    and windows are zero-copy NumPy views; memory never grows.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = np.full((len(Window._fields), 2 * capacity), np.nan)
+        self.head = 0    # Next write position in [0, capacity)
+        self.count = 0   # Samples stored, at most capacity
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, resistance, ratio, ppm):
+        """Store one reading, overwriting the oldest once full"""
+        head = self.head
+        column = (timestamp, resistance, ratio, ppm)
+        self.buffer[:, head] = column
+        self.buffer[:, head + self.capacity] = column
+        # Publish only after the data is written so readers never see a blank slot
+        if self.count < self.capacity:
+            self.count += 1
+        self.head = head + 1 if head + 1 < self.capacity else 0
+
+    def last(self, n=None):
+        """The most recent n samples (all stored samples by default)"""
+        count = self.count
+        n = count if n is None else min(n, count)
+        end = self.head + self.capacity if count == self.capacity else self.head
+        start = end - n
+        buffer = self.buffer
+        return Window(buffer[0, start:end], buffer[1, start:end], buffer[2, start:end], buffer[3, start:end])
+
+    def since(self, seconds, now):
+        """Samples whose timestamp is within the last `seconds` before now"""
+        window = self.last()
+        start = int(np.searchsorted(window.timestamp, now - seconds, side="left"))
+        return Window(*(field[start:] for field in window))
+
+    def latest(self):
+        """The newest sample as a Window of scalars, or None if empty"""
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return Window(*self.buffer[:, index].tolist())
+
+
+def rolling_stats(window):
+    """Mean, min, max and least-squares slope (ppm per second) of a window"""
+    ppm = window.ppm
+    count = len(ppm)
+    if not count:
+        return _EMPTY_STATS
+    if count < 2:
+        slope = np.nan
+    else:
+        t = window.timestamp - window.timestamp[0]
+        t_centered = t - t.mean()
+        denominator = np.dot(t_centered, t_centered)
+        slope = np.dot(t_centered, ppm - ppm.mean()) / denominator if denominator else np.nan
+    return RollingStats(count, float(ppm.mean()), float(ppm.min()), float(ppm.max()), float(slope))
+
+
+class SensorHistory:
+    """One ReadingRing per configured sensor"""
+
+    def __init__(self, sensor_count, capacity=3600):
+        self.rings = [ReadingRing(capacity) for _ in range(sensor_count)]
+
+    def append(self, sensor_index, timestamp, resistance, ratio, ppm):
+        self.rings[sensor_index].append(timestamp, resistance, ratio, ppm)
+
+    def last(self, sensor_index, n=None):
+        return self.rings[sensor_index].last(n)
+
+    def since(self, sensor_index, seconds, now):
+        return self.rings[sensor_index].since(seconds, now)
+
+    def stats(self, seconds, now):
+        """Rolling statistics over the last `seconds` for every sensor"""
+        return [rolling_stats(ring.since(seconds, now)) for ring in self.rings]
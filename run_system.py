@@ -1,43 +1,36 @@
+import argparse
 import threading
 import time
 import sys
 import os
 import queue
-from multiprocessing import Manager, Process, Queue
+from multiprocessing import Process, Queue
+from startup import StartupTimer
+from sensor_config import load_config
+from pubsub import MessageBus
+from sensor_state import empty_snapshot
+from shared_snapshot import SharedSensorTable
+
+# Boot phases, timed from process start; forked children share the origin
+startup = StartupTimer()
 
 class DataBridge:
     """Bridge class to transfer data between GUI and web server"""
-    def __init__(self):
-        # Shared data structure using multiprocessing Manager
-        self.manager = Manager()
-        self.shared_sensor_data = self.manager.list([
-            self.manager.dict({
-                "value": "--",
-                "resistance": "--",
-                "ratio": "--",
-                "timestamp": None,
-                "status": "disconnected"
-            }),
-            self.manager.dict({
-                "value": "--",
-                "resistance": "--",
-                "ratio": "--",
-                "timestamp": None,
-                "status": "disconnected"
-            })
-        ])
+    def __init__(self, sensor_count):
+        # Seqlocked shared-memory table, one record per configured sensor; the
+        # bridge process is its only writer
+        self.sensor_table = SharedSensorTable(sensor_count)
         
         # Communication queues
         self.gui_to_bridge_queue = Queue()
-        self.bridge_to_web_queue = Queue()
+        # Changed sensors pushed to the web process; bounded in case nobody reads it
+        self.bridge_to_web_queue = Queue(maxsize=1000)
         
     def update_sensor_data(self, sensor_index, data):
         """Update sensor data in shared memory"""
         try:
-            if 0 <= sensor_index < len(self.shared_sensor_data):
-                sensor_dict = self.shared_sensor_data[sensor_index]
-                for key, value in data.items():
-                    sensor_dict[key] = value
+            if 0 <= sensor_index < len(self.sensor_table):
+                self.sensor_table.update(sensor_index, data)
                 print(f"Bridge: Updated sensor {sensor_index + 1} - PPM: {data.get('value', '--')}")
         except Exception as e:
             print(f"Bridge error updating sensor data: {e}")
@@ -45,11 +38,23 @@ class DataBridge:
     def get_sensor_data(self):
         """Get current sensor data"""
         try:
-            return [dict(sensor) for sensor in self.shared_sensor_data]
+            return self.sensor_table.snapshots()
         except Exception as e:
             print(f"Bridge error getting sensor data: {e}")
             return []
     
+    def get_version(self):
+        """Change counter of the shared sensor data"""
+        return self.sensor_table.version
+    
+    def send(self, sensor_index, data):
+        """Hand a sensor snapshot from the GUI process to the bridge process"""
+        self.gui_to_bridge_queue.put_nowait({"sensor_index": sensor_index, "data": data})
+    
+    def next_update(self):
+        """Block until the bridge reports a changed sensor: (sensor_index, data)"""
+        return self.bridge_to_web_queue.get()
+    
     def start_bridge_process(self):
         """Start the data bridge process"""
         bridge_process = Process(target=self.run_data_bridge)
@@ -57,40 +62,132 @@ class DataBridge:
         bridge_process.start()
         return bridge_process
     
+    def close(self):
+        """Release the shared-memory table; call once, from the main process"""
+        self.sensor_table.close()
+    
     def run_data_bridge(self):
         """Run the data bridge in a separate process"""
         print("Data bridge started...")
+        startup.mark("bridge process running")
+        last_sent = {}
         while True:
             try:
-                # Check for data from GUI
-                if not self.gui_to_bridge_queue.empty():
-                    data = self.gui_to_bridge_queue.get_nowait()
-                    sensor_index = data.get('sensor_index', 0)
-                    sensor_data = data.get('data', {})
-                    self.update_sensor_data(sensor_index, sensor_data)
-                
-                time.sleep(0.1)
+                # Wait for data from GUI instead of polling the queue
+                try:
+                    data = self.gui_to_bridge_queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+                sensor_index = data.get('sensor_index', 0)
+                sensor_data = data.get('data', {})
+                # The GUI resends every sensor each second; skip unchanged ones
+                if last_sent.get(sensor_index) == sensor_data:
+                    continue
+                last_sent[sensor_index] = sensor_data
+                self.update_sensor_data(sensor_index, sensor_data)
+                try:
+                    self.bridge_to_web_queue.put_nowait((sensor_index, sensor_data))
+                except queue.Full:
+                    pass
             except Exception as e:
                 print(f"Bridge process error: {e}")
                 time.sleep(1)
 
-# Global bridge instance
-data_bridge = DataBridge()
+class LocalBridge:
+    """DataBridge for single-process mode, where the GUI and web server are threads
+
+    Changed snapshots go straight to the web server's subscription on an
+    in-process MessageBus: no bridge process, IPC or pickling.
+    """
+    def __init__(self, sensor_count, bus=None):
+        self.bus = bus or MessageBus()
+        self.sensor_data = [empty_snapshot() for _ in range(sensor_count)]
+        self.version = 0
+        self.lock = threading.Lock()
+        self.updates = self.bus.subscribe("sensors", maxsize=1000)
+    
+    def send(self, sensor_index, data):
+        """Publish a sensor snapshot if it changed"""
+        with self.lock:
+            if not 0 <= sensor_index < len(self.sensor_data) or self.sensor_data[sensor_index] == data:
+                return
+            self.sensor_data[sensor_index] = dict(data)
+            self.version += 1
+        self.bus.publish("sensors", (sensor_index, data))
+    
+    def get_sensor_data(self):
+        with self.lock:
+            return [dict(sensor) for sensor in self.sensor_data]
+    
+    def get_version(self):
+        return self.version
+    
+    def next_update(self):
+        return self.updates.get()
+    
+    def close(self):
+        self.updates.close()
+
+# Sensor layout from sensors.json (or HYDROGEN_SENSOR_CONFIG)
+sensor_config = load_config()
+
+# Global bridge for the three-process layout, created by create_data_bridge().
+# Not made at import: shared memory starts multiprocessing's resource
+# tracker process, which the other layouts don't need
+data_bridge = None
+
+startup.mark("imports")
 
-def start_gui_app():
+def create_data_bridge():
+    """Create the global DataBridge; forked GUI and web processes inherit it"""
+    global data_bridge
+    data_bridge = DataBridge(sensor_config.count)
+    return data_bridge
+
+def track_startup(monitor):
+    """Mark the engine's serial connect and first reading on the startup timer"""
+    def connected(status):
+        if status[0] == "connected":
+            status_listener.close()
+            startup.mark("serial port open and board talking")
+    
+    def first_reading(message):
+        readings_listener.close()
+        startup.mark("first reading parsed")
+    
+    status_listener = monitor.bus.listen("status", connected)
+    readings_listener = monitor.bus.listen("readings", first_reading)
+
+def start_monitor(serial_port='/dev/serial0', baud_rate=9600, protocol='ascii', bridge=None):
+    """Engine for the configured sensors whose changed snapshots go to the bridge; not yet started"""
+    from monitor_engine import MonitorEngine
+    
+    bridge = bridge or data_bridge
+    monitor = MonitorEngine(sensor_config, serial_port, baud_rate, protocol=protocol)
+    monitor.bus.listen("sensors", lambda message: bridge.send(*message), maxsize=1000)
+    return monitor
+
+def start_gui_app(serial_port='/dev/serial0', baud_rate=9600, protocol='ascii', bridge=None, gpio_backend=None):
     """Start the main GUI application with data bridge integration"""
+    bridge = bridge or data_bridge
     try:
+        # Open the serial port and wait for the board while Tk starts up
+        monitor = start_monitor(serial_port, baud_rate, protocol, bridge)
+        track_startup(monitor)
+        monitor.start()
+        startup.mark("engine started")
+        
         # Import and modify the GUI app to use data bridge
         import tkinter as tk
-        import serial
         import threading
         import time
-        from datetime import datetime
-        import queue
-        import RPi.GPIO as GPIO
+        from buzzer import create_buzzer
+        from gpio_backend import load_gpio
+        from dashboard_render import DashboardRenderer, format_tick_stats
+        from ui_refresh import UiRefresher, format_refresh_stats
         
         class BridgedHydrogenMonitorApp:
-            def __init__(self, root, serial_port='/dev/serial0', baud_rate=9600):
+            def __init__(self, root, monitor):
                 # ...existing code...
                 self.root = root
                 self.root.title("Hydrogen Sensor Monitor")
@@ -100,59 +197,43 @@ def start_gui_app():
                 self.root.focus_force()
                 self.root.grab_set()
                 
-                self.threshold = 150
-                self.serial_port = serial_port
-                self.baud_rate = baud_rate
-                self.serial = None
-                self.connected = False
+                # Ingestion, state and alerts run in the engine, which also feeds the bridge
+                self.monitor = monitor
+                self.config = monitor.config
+                self.threshold = self.config.threshold
+                self.sensor_count = self.config.count
                 
                 # Buzzer setup
-                self.buzzer_pin = 26
-                self.buzzer_active = False
-                self.alert_sensors = set()
-                GPIO.setmode(GPIO.BCM)
-                GPIO.setup(self.buzzer_pin, GPIO.OUT)
-                GPIO.output(self.buzzer_pin, GPIO.LOW)
-                
-                self.data_queue = queue.Queue()
+                self.gpio = load_gpio(gpio_backend)
+                self.buzzer = create_buzzer(self.gpio, self.config)
                 
                 # UI setup
                 self.root.configure(bg="black")
                 self.main_frame = tk.Frame(self.root, bg="black")
                 self.main_frame.pack(expand=True, fill="both", padx=50, pady=50)
-                self.main_frame.grid_rowconfigure(0, weight=1)
-                self.main_frame.grid_columnconfigure(0, weight=1)
-                self.main_frame.grid_columnconfigure(1, weight=1)
+                rows, columns = self.config.grid()
+                for row in range(rows):
+                    self.main_frame.grid_rowconfigure(row, weight=1)
+                for column in range(columns):
+                    self.main_frame.grid_columnconfigure(column, weight=1)
                 
                 # Create sensor displays
                 self.create_sensor_displays()
-                
-                # Initialize sensor data
-                self.sensor_data = [
-                    {"value": "--", "resistance": "--", "ratio": "--", "timestamp": None},
-                    {"value": "--", "resistance": "--", "ratio": "--", "timestamp": None}
-                ]
+                # Redraws only the widgets whose text or color changed
+                self.renderer = DashboardRenderer(self)
                 
                 # Bind exit keys
                 self.root.bind("<Control-Shift-q>", self.emergency_exit)
                 self.root.bind("<Control-Shift-Q>", self.emergency_exit)
                 self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
                 
-                # Start threads
-                self.serial_thread = threading.Thread(target=self.run_serial_connection)
-                self.serial_thread.daemon = True
-                self.serial_thread.start()
-                
-                self.buzzer_thread = threading.Thread(target=self.buzzer_control)
-                self.buzzer_thread.daemon = True
-                self.buzzer_thread.start()
-                
-                # Start data bridge communication
-                self.bridge_thread = threading.Thread(target=self.send_data_to_bridge)
-                self.bridge_thread.daemon = True
-                self.bridge_thread.start()
-                
-                self.update_ui()
+                # Redraw as soon as readings arrive; a 1 s timer keeps staleness checks going
+                self.refresher = UiRefresher(self.root, self.update_ui)
+                self.monitor.bus.listen("readings", lambda message: self.refresher.notify(message[0]))
+                self.monitor.bus.listen("status", lambda message: self.refresher.notify())
+                self.buzzer.follow(self.monitor)
+
+                self.refresher.run()
             
             def create_sensor_displays(self):
                 """Create sensor display UI elements"""
@@ -167,16 +248,24 @@ def start_gui_app():
                 self.ratio_labels = []
                 self.alert_labels = []
                 
-                for i in range(2):
+                # Shrink fonts when more than two sensors share the screen
+                rows, columns = self.config.grid()
+                scale = min(1.0, 2 / columns, 1 / rows)
+                
+                def font_size(size, minimum=8):
+                    return max(minimum, int(size * scale))
+                
+                for i, spec in enumerate(self.config.sensors):
+                    row, column = divmod(i, columns)
                     sensor_frame = tk.Frame(self.main_frame, bg="black")
-                    sensor_frame.grid(row=0, column=i, sticky="nsew", padx=10, pady=10)
+                    sensor_frame.grid(row=row, column=column, sticky="nsew", padx=10, pady=10)
                     self.sensor_frames.append(sensor_frame)
                     
                     # Status bar
                     status_bar = tk.Frame(sensor_frame, bg="black")
                     status_bar.pack(fill=tk.X, anchor="ne")
                     
-                    unit_label = tk.Label(status_bar, font=("Arial", 16, "bold"), text="PPM", fg="white", bg="black")
+                    unit_label = tk.Label(status_bar, font=("Arial", font_size(16), "bold"), text="PPM", fg="white", bg="black")
                     unit_label.pack(side=tk.RIGHT, padx=10)
                     self.unit_labels.append(unit_label)
                     
@@ -187,23 +276,23 @@ def start_gui_app():
                     self.leds.append(led)
                     
                     # Sensor name
-                    name_label = tk.Label(sensor_frame, font=("Arial", 24, "bold"), text=f"Hydrogen {i+1}", fg="white", bg="black")
+                    name_label = tk.Label(sensor_frame, font=("Arial", font_size(24), "bold"), text=spec.name, fg="white", bg="black")
                     name_label.pack(pady=(0, 10))
                     self.name_labels.append(name_label)
                     
                     # Alert label
-                    alert_label = tk.Label(sensor_frame, font=("Arial", 18, "bold"), text="⚠️ ALERT ⚠️", fg="red", bg="black")
+                    alert_label = tk.Label(sensor_frame, font=("Arial", font_size(18), "bold"), text="⚠️ ALERT ⚠️", fg="red", bg="black")
                     alert_label.pack()
                     alert_label.pack_forget()
                     self.alert_labels.append(alert_label)
                     
                     # Value display
-                    value_label = tk.Label(sensor_frame, font=("Arial", 120, "bold"), text="--", fg="white", bg="black")
+                    value_label = tk.Label(sensor_frame, font=("Arial", font_size(120), "bold"), text="--", fg="white", bg="black")
                     value_label.pack()
                     self.value_labels.append(value_label)
                     
                     # Timestamp
-                    timestamp_label = tk.Label(sensor_frame, font=("Arial", 12), text="Last updated: --", fg="gray", bg="black")
+                    timestamp_label = tk.Label(sensor_frame, font=("Arial", font_size(12)), text="Last updated: --", fg="gray", bg="black")
                     timestamp_label.pack(pady=(5, 0))
                     self.timestamp_labels.append(timestamp_label)
                     
@@ -211,11 +300,11 @@ def start_gui_app():
                     info_frame = tk.Frame(sensor_frame, bg="black")
                     info_frame.pack(pady=20)
                     
-                    resistance_label = tk.Label(info_frame, font=("Arial", 16), text="Resistance: -- Ω", fg="white", bg="black")
+                    resistance_label = tk.Label(info_frame, font=("Arial", font_size(16)), text="Resistance: -- Ω", fg="white", bg="black")
                     resistance_label.pack(pady=5)
                     self.resistance_labels.append(resistance_label)
                     
-                    ratio_label = tk.Label(info_frame, font=("Arial", 16), text="Rs/R0: --", fg="white", bg="black")
+                    ratio_label = tk.Label(info_frame, font=("Arial", font_size(16)), text="Rs/R0: --", fg="white", bg="black")
                     ratio_label.pack(pady=5)
                     self.ratio_labels.append(ratio_label)
                 
@@ -223,281 +312,281 @@ def start_gui_app():
                 self.status_label = tk.Label(self.root, font=("Arial", 12), text="Connecting to serial port...", fg="yellow", bg="black")
                 self.status_label.pack(side=tk.BOTTOM, pady=10)
             
-            def send_data_to_bridge(self):
-                """Send sensor data to bridge continuously"""
-                while True:
-                    try:
-                        for i in range(2):
-                            data = self.sensor_data[i].copy()
-                            data["status"] = "connected" if data["timestamp"] and time.time() - data["timestamp"] < 10 else "disconnected"
-                            
-                            # Send to bridge queue
-                            bridge_data = {
-                                "sensor_index": i,
-                                "data": data
-                            }
-                            data_bridge.gui_to_bridge_queue.put_nowait(bridge_data)
-                        
-                        time.sleep(1)
-                    except Exception as e:
-                        print(f"Error sending data to bridge: {e}")
-                        time.sleep(1)
-            
             def emergency_exit(self, event=None):
                 self.on_closing()
                 return "break"
             
             def on_closing(self):
                 print("Closing GUI application...")
-                GPIO.output(self.buzzer_pin, GPIO.LOW)
-                GPIO.cleanup()
+                self.monitor.close()
+                self.buzzer.close()
+                self.gpio.cleanup()
                 self.root.destroy()
             
-            def buzzer_control(self):
-                # ...existing code...
-                while True:
-                    if self.alert_sensors:
-                        if not self.buzzer_active:
-                            self.buzzer_active = True
-                            print(f"ALERT: Sensors {list(self.alert_sensors)} exceeded threshold!")
-                        GPIO.output(self.buzzer_pin, GPIO.HIGH)
-                        time.sleep(0.5)
-                        GPIO.output(self.buzzer_pin, GPIO.LOW)
-                        time.sleep(0.5)
-                    else:
-                        if self.buzzer_active:
-                            self.buzzer_active = False
-                            GPIO.output(self.buzzer_pin, GPIO.LOW)
-                            print("Alert cleared - buzzer off")
-                        time.sleep(0.1)
-            
             def update_ui(self):
-                # ...existing code...
-                while not self.data_queue.empty():
-                    try:
-                        sensor_data = self.data_queue.get_nowait()
-                        sensor_index = sensor_data["sensor_index"]
-                        self.sensor_data[sensor_index] = sensor_data["data"]
-                    except queue.Empty:
-                        break
+                """Returns seconds until the next redraw is due"""
+                started = time.perf_counter()
+                monitor = self.monitor
+                calls = self.renderer.render_status(*monitor.status)
                 
-                for sensor_index in range(2):
-                    data = self.sensor_data[sensor_index]
-                    
-                    if data["value"] != "--":
-                        try:
-                            value = float(data["value"])
-                            display_value = f"{value:.2f}"
-                            
-                            if value > self.threshold:
-                                self.value_labels[sensor_index].config(text=display_value, fg="red")
-                                self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="red")
-                                self.alert_labels[sensor_index].pack(pady=(0, 5))
-                                self.alert_sensors.add(sensor_index + 1)
-                                
-                                current_color = self.name_labels[sensor_index].cget("fg")
-                                new_color = "red" if current_color == "white" else "white"
-                                self.name_labels[sensor_index].config(fg=new_color)
-                            else:
-                                self.value_labels[sensor_index].config(text=display_value, fg="white")
-                                self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="green")
-                                self.alert_labels[sensor_index].pack_forget()
-                                self.alert_sensors.discard(sensor_index + 1)
-                                self.name_labels[sensor_index].config(fg="white")
-                                
-                        except (ValueError, TypeError):
-                            current_text = self.value_labels[sensor_index].cget("text")
-                            if current_text != "--":
-                                self.value_labels[sensor_index].config(fg="orange")
-                            else:
-                                self.value_labels[sensor_index].config(text="--", fg="red")
-                            self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="gray")
-                            self.alert_labels[sensor_index].pack_forget()
-                            self.alert_sensors.discard(sensor_index + 1)
-                    else:
-                        if not self.connected:
-                            self.value_labels[sensor_index].config(text="--", fg="red")
-                            self.led_indicators[sensor_index].itemconfig(self.leds[sensor_index], fill="gray")
-                            self.alert_labels[sensor_index].pack_forget()
-                            self.alert_sensors.discard(sensor_index + 1)
-                    
-                    if data["timestamp"]:
-                        time_str = datetime.fromtimestamp(data["timestamp"]).strftime('%H:%M:%S.%f')[:-3]
-                        self.timestamp_labels[sensor_index].config(text=f"Last updated: {time_str}")
-                        
-                        if time.time() - data["timestamp"] > 5:
-                            current_text = self.value_labels[sensor_index].cget("text")
-                            if current_text != "--":
-                                self.value_labels[sensor_index].config(fg="orange")
-                    
-                    if data["resistance"] != "--" and data["ratio"] != "--":
-                        self.resistance_labels[sensor_index].config(text=f"Resistance: {data['resistance']} Ω")
-                        self.ratio_labels[sensor_index].config(text=f"Rs/R0: {data['ratio']}")
+                # Staleness checks in one pass, alarms from the alert engine;
+                # copy under the engine lock, draw after releasing it
+                with monitor.lock:
+                    status = monitor.evaluate(time.time())
+                    state = monitor.state.copy()
+                    connected = monitor.connected
+                calls += self.renderer.render(state, status, connected)
                 
-                self.root.after(150, self.update_ui)
-            
-            def run_serial_connection(self):
-                # ...existing code...
-                while True:
-                    try:
-                        self.status_label.config(text=f"Connecting to {self.serial_port}...", fg="yellow")
-                        self.serial = serial.Serial(self.serial_port, self.baud_rate, timeout=1)
-                        self.serial.flushInput()
-                        time.sleep(2)
-                        
-                        self.status_label.config(text=f"Connected to {self.serial_port}", fg="green")
-                        self.connected = True
-                        
-                        buffer = ""
-                        while True:
-                            try:
-                                if self.serial.in_waiting > 0:
-                                    new_data = self.serial.read(self.serial.in_waiting).decode('utf-8', errors='ignore')
-                                    buffer += new_data
-                                    
-                                    while '\n' in buffer:
-                                        line, buffer = buffer.split('\n', 1)
-                                        line = line.strip()
-                                        if line:
-                                            self.process_sensor_data(line)
-                                            
-                            except (serial.SerialException, OSError) as e:
-                                self.status_label.config(text=f"Serial error: {str(e)}", fg="red")
-                                self.connected = False
-                                break
-                            
-                            time.sleep(0.01)
-                    
-                    except (serial.SerialException, OSError) as e:
-                        self.status_label.config(text=f"Connection failed: {str(e)}. Retrying in 5s...", fg="red")
-                        self.connected = False
-                        if self.serial:
-                            try:
-                                self.serial.close()
-                            except:
-                                pass
-                    
-                    time.sleep(5)
-            
-            def process_sensor_data(self, data_line):
-                # ...existing code...
-                try:
-                    if any(skip_word in data_line for skip_word in ["MICS-5524", "Warming", "Sensors ready", "Time(s)"]):
-                        return
-                    
-                    parts = data_line.split('\t')
-                    
-                    if len(parts) >= 2:
-                        try:
-                            sensor_id = int(parts[1])
-                            if sensor_id not in [1, 2]:
-                                return
-                            
-                            sensor_index = sensor_id - 1
-                            
-                            if "Debug:" in data_line or "Warning:" in data_line:
-                                if self.sensor_data[sensor_index]["value"] != "--":
-                                    self.sensor_data[sensor_index]["timestamp"] = time.time()
-                                return
-                            
-                            if len(parts) >= 5:
-                                resistance = parts[2]
-                                ratio = parts[3]
-                                ppm_part = parts[4].split()[0]
-                                
-                                float(ppm_part)
-                                float(resistance)
-                                float(ratio)
-                                
-                                sensor_data = {
-                                    "sensor_index": sensor_index,
-                                    "data": {
-                                        "value": ppm_part,
-                                        "resistance": resistance,
-                                        "ratio": ratio,
-                                        "timestamp": time.time()
-                                    }
-                                }
-                                
-                                try:
-                                    self.data_queue.put_nowait(sensor_data)
-                                except queue.Full:
-                                    try:
-                                        self.data_queue.get_nowait()
-                                        self.data_queue.put_nowait(sensor_data)
-                                    except queue.Empty:
-                                        pass
-                                        
-                        except (ValueError, IndexError):
-                            return
-                            
-                except Exception as e:
-                    print(f"Error processing data: {str(e)}, Line: {data_line}")
-        
+                # Per-tick cost, printed once a minute
+                self.renderer.record_tick(time.perf_counter() - started, calls)
+                stats = self.renderer.maybe_report()
+                if stats:
+                    print(format_tick_stats(stats))
+                    print(format_refresh_stats(self.refresher.take_stats()))
+                
+                return self.renderer.next_frame(status)
+
         # Create and run the GUI app
+        startup.mark("GUI modules imported")
         root = tk.Tk()
-        app = BridgedHydrogenMonitorApp(root)
+        app = BridgedHydrogenMonitorApp(root, monitor)
+        startup.mark("window built")
+        
+        def first_frame(arrived):
+            app.refresher.on_paint = None
+            startup.mark("first reading on screen")
+            startup.report()
+        
+        app.refresher.on_paint = first_frame
         root.mainloop()
         
     except Exception as e:
         print(f"Error starting GUI application: {e}")
         sys.exit(1)
 
-def start_web_server():
+def start_web_server(bridge=None, port=5000, server='dev', threads=32):
     """Start the Flask web server with bridge integration"""
+    bridge = bridge or data_bridge
     try:
-        from flask import Flask, render_template, jsonify
+        from flask import Flask, Response, render_template, jsonify, request
+        from delta_push import DeltaChannel, register_websocket
+        from downsample import history_payload
+        from event_stream import Broadcaster
+        from snapshot_cache import VersionedSnapshot
+        from storage import open_store
+        from web_serving import accepts_gzip, compress, fingerprint_static, serve, stream_slots, websocket_supported
         
         app = Flask(__name__)
+        # Long-lived cache headers on content-hashed static URLs
+        fingerprint_static(app)
+        # Read-only view of the store the GUI writes to
+        history_store = open_store(sensor_config, readonly=True)
+        
+        # One thread reads bridge updates and fans them out to /api/stream
+        # (SSE) and /api/ws (WebSocket deltas) clients
+        broadcaster = Broadcaster()
+        delta_channel = DeltaChannel(bridge.get_sensor_data())
+        if websocket_supported(server):
+            register_websocket(app, delta_channel)
+        else:
+            @app.route('/api/ws')
+            def sensor_socket_unsupported():
+                # Fails the handshake, so browsers go straight to /api/stream
+                return jsonify({"error": "WebSocket push needs --server dev; use /api/stream"}), 501
+        # Streams and long polls each park a server thread; cap them under waitress
+        slots = stream_slots(server, threads)
+        # Encoded /api/sensors body, rebuilt only when the bridge version changes
+        sensor_snapshot = VersionedSnapshot(bridge.get_sensor_data, bridge.get_version, compress)
+        long_poll_timeout = 25
+        
+        def forward_bridge_updates():
+            while True:
+                try:
+                    sensor_index, sensor_data = bridge.next_update()
+                    broadcaster.publish(sensor_index, sensor_data)
+                    delta_channel.publish(sensor_index, sensor_data)
+                    sensor_snapshot.notify()
+                except Exception as e:
+                    print(f"Stream forwarding error: {e}")
+                    time.sleep(1)
+        
+        threading.Thread(target=forward_bridge_updates, daemon=True).start()
         
         @app.route('/')
         def index():
-            return render_template('index.html')
+            return render_template('index.html', sensors=sensor_config.sensors, threshold=sensor_config.threshold)
         
         @app.route('/api/sensors')
         def get_all_sensors():
-            # Get data from bridge
-            sensor_data = data_bridge.get_sensor_data()
-            return jsonify(sensor_data)
+            # ?since=<version> long-polls until the bridge has newer data
+            since = request.args.get('since', type=int)
+            if since is not None and slots.acquire():
+                # Out of slots: answer at once, which is a plain poll
+                try:
+                    sensor_snapshot.wait(since, long_poll_timeout)
+                finally:
+                    slots.release()
+            snapshot = sensor_snapshot.get()
+            # Pre-encoded bytes, gzipped once per version when that helps
+            if snapshot.gzipped is not None and accepts_gzip():
+                response = Response(snapshot.gzipped, mimetype='application/json')
+                response.headers['Content-Encoding'] = 'gzip'
+                response.set_etag(snapshot.etag + '-gz')
+            else:
+                response = Response(snapshot.body, mimetype='application/json')
+                response.set_etag(snapshot.etag)
+            response.vary.add('Accept-Encoding')
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Data-Version'] = str(snapshot.version)
+            # Answers If-None-Match with an empty 304
+            return response.make_conditional(request)
         
         @app.route('/api/sensor/<int:sensor_id>')
         def get_sensor_data(sensor_id):
-            if sensor_id < 1 or sensor_id > 2:
+            if sensor_id < 1 or sensor_id > sensor_config.count:
                 return jsonify({"error": "Invalid sensor ID"}), 400
             
-            sensor_data = data_bridge.get_sensor_data()
+            sensor_data = bridge.get_sensor_data()
             if sensor_data and len(sensor_data) > sensor_id - 1:
                 return jsonify(sensor_data[sensor_id - 1])
             else:
                 return jsonify({"error": "No data available"}), 404
         
+        @app.route('/api/stream')
+        def stream_sensors():
+            if not slots.acquire():
+                # The page polls /api/sensors meanwhile and retries later
+                response = jsonify({"error": "Too many open streams; poll /api/sensors"})
+                response.status_code = 503
+                response.headers['Retry-After'] = '30'
+                return response
+            response = Response(
+                broadcaster.stream(bridge.get_sensor_data),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+            )
+            # Runs when the server closes the response, even if the stream never started
+            response.call_on_close(slots.release)
+            return response
+        
+        @app.route('/api/history/<int:sensor_id>')
+        def get_sensor_history(sensor_id):
+            if sensor_id < 1 or sensor_id > sensor_config.count:
+                return jsonify({"error": "Invalid sensor ID"}), 400
+            if history_store is None:
+                return jsonify({"error": "History storage is disabled"}), 404
+            try:
+                return jsonify(history_payload(history_store, sensor_id, request.args, time.time()))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
         print("Starting web server with bridge integration...")
-        app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+        startup.mark("web server starting")
+        serve(app, port, server, threads)
         
     except Exception as e:
         print(f"Error starting web server: {e}")
         sys.exit(1)
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Hydrogen Leak Detection System")
+    parser.add_argument("--serial-port", default="/dev/serial0", help="serial port the Arduino is on")
+    parser.add_argument("--baud", type=int, default=9600, help="must match serialBaud in hydrogen.ino")
+    parser.add_argument("--protocol", choices=["ascii", "binary"], default="ascii",
+                        help="serial protocol requested from hydrogen.ino at connect")
+    parser.add_argument("--server", choices=["dev", "waitress"], default="dev",
+                        help="web server: Werkzeug's development server or waitress (production)")
+    parser.add_argument("--web-threads", type=int, default=32, help="waitress worker threads")
+    parser.add_argument("--single-process", action="store_true",
+                        help="run ingestion, GUI and web server as threads of one process")
+    parser.add_argument("--headless", action="store_true",
+                        help="run ingestion, alerts and web server without the GUI or tkinter (GPIO only with --gpio)")
+    parser.add_argument("--gpio", choices=["rpi", "mock"],
+                        help="buzzer backend: RPi.GPIO (default, or HYDROGEN_GPIO) or an in-memory recorder")
+    return parser.parse_args()
+
+def run_single_process(args):
+    """Ingestion, GUI and web server as threads sharing an in-process message bus"""
+    bridge = LocalBridge(sensor_config.count)
+    web_thread = threading.Thread(target=start_web_server, args=(bridge, 5000, args.server, args.web_threads),
+                                  daemon=True)
+    web_thread.start()
+    
+    print("\nSystem started successfully (single process)!")
+    print("=" * 60)
+    print("GUI: Full-screen hydrogen monitor display")
+    print("Web: http://localhost:5000")
+    print("Press Ctrl+Shift+Q on GUI to exit")
+    print("=" * 60)
+    
+    # Tk must own the main thread
+    start_gui_app(args.serial_port, args.baud, args.protocol, bridge, args.gpio)
+    bridge.close()
+
+def run_headless(args):
+    """Engine and web server as threads of one process, for nodes without a display"""
+    bridge = LocalBridge(sensor_config.count)
+    monitor = start_monitor(args.serial_port, args.baud, args.protocol, bridge)
+    monitor.bus.listen("status", lambda status: print(f"Serial: {status[1]}"))
+    monitor.bus.listen("alert_events", lambda event: print(
+        f"{'ALERT' if event.active else 'Alert cleared'}: sensor {event.sensor_id} {event.rule} "
+        f"at {event.ppm:.2f} ppm"))
+    track_startup(monitor)
+    buzzer = None
+    if args.gpio:
+        from buzzer import create_buzzer
+        from gpio_backend import load_gpio
+        gpio = load_gpio(args.gpio)
+        buzzer = create_buzzer(gpio, sensor_config)
+        buzzer.follow(monitor)
+    
+    def first_sensors(message):
+        first_sensors_listener.close()
+        startup.mark("first reading published")
+        startup.report()
+    
+    first_sensors_listener = monitor.bus.listen("sensors", first_sensors)
+    monitor.start()
+    startup.mark("engine started")
+    print("Web: http://localhost:5000")
+    try:
+        start_web_server(bridge, 5000, args.server, args.web_threads)
+    finally:
+        monitor.close()
+        if buzzer is not None:
+            buzzer.close()
+            gpio.cleanup()
+        bridge.close()
+
 def main():
     """Main function to start the complete bridged system"""
+    args = parse_args()
     print("Starting Hydrogen Leak Detection System with Data Bridge...")
     print("=" * 60)
     
     try:
-        # Start the data bridge process
+        if args.headless:
+            run_headless(args)
+            return
+        if args.single_process:
+            run_single_process(args)
+            return
+        
+        # Start the data bridge process. No need to wait for it: the GUI's
+        # updates queue up until it runs
         print("Initializing data bridge...")
-        bridge_process = data_bridge.start_bridge_process()
-        time.sleep(1)  # Let bridge initialize
+        bridge_process = create_data_bridge().start_bridge_process()
         
         # Start GUI application in a separate process
         print("Starting GUI application...")
-        gui_process = Process(target=start_gui_app)
+        gui_process = Process(target=start_gui_app, args=(args.serial_port, args.baud, args.protocol, None, args.gpio))
         gui_process.daemon = False
         gui_process.start()
         
         # Start web server in a separate process
         print("Starting web server...")
-        web_process = Process(target=start_web_server)
+        web_process = Process(target=start_web_server, args=(None, 5000, args.server, args.web_threads))
         web_process.daemon = True
         web_process.start()
         
@@ -524,6 +613,9 @@ def main():
     except Exception as e:
         print(f"System error: {e}")
         sys.exit(1)
+    finally:
+        if data_bridge is not None:
+            data_bridge.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,98 @@
+import json
+import math
+import os
+from collections import namedtuple
+
+# Config file next to the scripts; HYDROGEN_SENSOR_CONFIG overrides the path
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sensors.json")
+
+DEFAULT_SERIAL_PORT = "/dev/serial0"
+
+# One configured channel. id is the 1-based position used by the GUI and the
+# web API; port and channel say which board and which sensor number on it
+SensorSpec = namedtuple("SensorSpec", ["id", "name", "port", "channel", "threshold"])
+
+
+class SensorConfig:
+    """Which sensors exist, where they are connected and their alert limits"""
+
+    def __init__(self, sensors, threshold=150.0, stale_after=5.0, disconnected_after=10.0, columns=None,
+                 history_size=3600, storage=None, alerts=None, buzzer=None):
+        self.threshold = float(threshold)
+        self.stale_after = float(stale_after)
+        self.disconnected_after = float(disconnected_after)
+        self.columns = columns
+        self.history_size = int(history_size)  # Recent readings kept in memory per sensor
+        self.storage = dict(storage or {})  # Persistent reading store, see storage.py
+        self.alerts = dict(alerts or {})  # Hysteresis, debounce and rate-of-rise rules, see alerts.py
+        self.buzzer = dict(buzzer or {})  # Pin, PWM frequency and patterns, see buzzer.py
+        self.sensors = []
+        self._index = {}
+
+        for position, entry in enumerate(sensors):
+            spec = SensorSpec(
+                id=position + 1,
+                name=entry.get("name", f"Hydrogen {position + 1}"),
+                port=entry.get("port", DEFAULT_SERIAL_PORT),
+                channel=int(entry.get("channel", position + 1)),
+                threshold=float(entry.get("threshold", self.threshold)),
+            )
+            key = (spec.port, spec.channel)
+            if key in self._index:
+                raise ValueError(f"Sensor {spec.name}: channel {spec.channel} on {spec.port} is configured twice")
+            self._index[key] = position
+            self.sensors.append(spec)
+
+        if not self.sensors:
+            raise ValueError("No sensors configured")
+
+    @property
+    def count(self):
+        return len(self.sensors)
+
+    @property
+    def ports(self):
+        """Serial ports in the order they first appear in the config"""
+        return list(dict.fromkeys(spec.port for spec in self.sensors))
+
+    def index_for(self, port, channel):
+        """0-based sensor index for a board channel, or None if it isn't configured"""
+        return self._index.get((port, channel))
+
+    def channel_map(self, port):
+        """Map of board channel -> sensor index for one serial port"""
+        return {channel: index for (p, channel), index in self._index.items() if p == port}
+
+    def grid(self):
+        """Rows and columns for laying out the sensor displays"""
+        columns = self.columns or (self.count if self.count <= 2 else math.ceil(math.sqrt(self.count)))
+        rows = math.ceil(self.count / columns)
+        return rows, columns
+
+
+def default_config():
+    """The original two sensors of hydrogen.ino on /dev/serial0"""
+    return SensorConfig([
+        {"name": "Hydrogen 1", "channel": 1},
+        {"name": "Hydrogen 2", "channel": 2},
+    ])
+
+
+def load_config(path=None):
+    """Load the sensor config, falling back to the default pair if no file exists"""
+    path = path or os.environ.get("HYDROGEN_SENSOR_CONFIG", DEFAULT_CONFIG_PATH)
+    if not os.path.exists(path):
+        return default_config()
+    with open(path) as f:
+        data = json.load(f)
+    return SensorConfig(
+        data.get("sensors", []),
+        threshold=data.get("threshold", 150.0),
+        stale_after=data.get("stale_after", 5.0),
+        disconnected_after=data.get("disconnected_after", 10.0),
+        columns=data.get("columns"),
+        history_size=data.get("history_size", 3600),
+        storage=data.get("storage"),
+        alerts=data.get("alerts"),
+        buzzer=data.get("buzzer"),
+    )
@@ -0,0 +1,101 @@
+from collections import namedtuple
+from enum import IntEnum
+
+from line_framer import LineFramer
+
+
+class ReadingKind(IntEnum):
+    """What kind of line hydrogen.ino printed"""
+    DATA = 0
+    DEBUG = 1
+    WARNING = 2
+    HEADER = 3
+
+
+# One parsed line. Numeric fields are floats; fields a line doesn't carry are None
+Reading = namedtuple("Reading", ["kind", "sensor_id", "seconds", "resistance", "ratio", "ppm"])
+
+# Banner and column header printed once by setup() in hydrogen.ino
+HEADER_PREFIXES = ("MICS-5524", "Warming", "Sensors ready", "Time(s)")
+
+_HEADER = Reading(ReadingKind.HEADER, None, None, None, None, None)
+
+# Enum member lookups are slow on the hot path, so bind them once
+_DATA = ReadingKind.DATA
+_DEBUG = ReadingKind.DEBUG
+_WARNING = ReadingKind.WARNING
+_new_reading = Reading.__new__
+
+
+def parse_line(line):
+    """Parse one stripped line into a Reading, or None if it is not recognised
+
+    Data lines look like "12\\t1\\t1234.56\\t0.0004\\t2.00 ppm" and debug and
+    warning lines like "12\\t2\\tWarning: ...". Each field is converted once.
+    """
+    parts = line.split('\t')
+    if len(parts) >= 5:
+        try:
+            return _new_reading(
+                Reading,
+                _DATA,
+                int(parts[1]),
+                float(parts[0]),
+                float(parts[2]),
+                float(parts[3]),
+                float(parts[4].partition(' ')[0]),  # Drop the " ppm" suffix
+            )
+        except ValueError:
+            # The "Time(s)\tSensor\t..." column header has five fields too
+            return _HEADER if line.startswith(HEADER_PREFIXES) else None
+
+    if len(parts) >= 3:
+        message = parts[2]
+        if message.startswith("Debug:"):
+            kind = _DEBUG
+        elif message.startswith("Warning:"):
+            kind = _WARNING
+        else:
+            return None
+        try:
+            return Reading(kind, int(parts[1]), float(parts[0]), None, None, None)
+        except ValueError:
+            return None
+
+    if line.startswith(HEADER_PREFIXES):
+        return _HEADER
+    return None
+
+
+def parse_lines(lines):
+    """Parse a chunk of lines at once, dropping the ones that aren't recognised"""
+    readings = []
+    append = readings.append
+    for line in lines:
+        reading = parse_line(line)
+        if reading is not None:
+            append(reading)
+    return readings
+
+
+class TextLineDecoder:
+    """Frame and parse the ASCII protocol; same interface as BinaryFrameDecoder"""
+
+    def __init__(self, max_line_length=256):
+        self.framer = LineFramer(max_line_length=max_line_length)
+
+    def reset(self):
+        """Drop any partial line, e.g. after a reconnect"""
+        self.framer.reset()
+
+    def feed(self, data):
+        """Add raw bytes and return the list of parsed Readings"""
+        return parse_lines(self.framer.feed(data))
+
+    def stats(self):
+        """Return framing counters"""
+        return {
+            "lines": self.framer.lines_framed,
+            "overflows": self.framer.overflows,
+            "bytes_dropped": self.framer.bytes_dropped,
+        }
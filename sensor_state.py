@@ -0,0 +1,100 @@
+import copy
+from collections import namedtuple
+
+import numpy as np
+
+# Result of one vectorized pass over all channels; every field is a bool array
+SensorStatus = namedtuple("SensorStatus", ["has_value", "alert", "stale", "disconnected"])
+
+
+class SensorState:
+    """Latest reading of every configured sensor, stored column-wise in NumPy arrays
+
+    NaN marks a field that has never been received. Threshold and staleness
+    checks for all channels are done by evaluate() in one vectorized pass.
+    """
+
+    def __init__(self, config):
+        count = config.count
+        self.count = count
+        self.ppm = np.full(count, np.nan)
+        self.resistance = np.full(count, np.nan)
+        self.ratio = np.full(count, np.nan)
+        self.timestamp = np.full(count, np.nan)
+        self.thresholds = np.array([spec.threshold for spec in config.sensors], dtype=float)
+        self.stale_after = config.stale_after
+        self.disconnected_after = config.disconnected_after
+
+    def update(self, index, ppm, resistance, ratio, timestamp):
+        """Store a new data reading"""
+        self.ppm[index] = ppm
+        self.resistance[index] = resistance
+        self.ratio[index] = ratio
+        self.timestamp[index] = timestamp
+
+    def copy(self):
+        """Copy of the latest readings, so they can be drawn without holding the engine lock"""
+        state = copy.copy(self)
+        state.ppm = self.ppm.copy()
+        state.resistance = self.resistance.copy()
+        state.ratio = self.ratio.copy()
+        state.timestamp = self.timestamp.copy()
+        return state
+
+    def touch(self, index, timestamp):
+        """Debug/warning line: keep the last values but show the sensor is alive"""
+        if not np.isnan(self.ppm[index]):
+            self.timestamp[index] = timestamp
+
+    def evaluate(self, now, connected=True):
+        """Threshold and staleness checks for all channels at once"""
+        has_value = ~np.isnan(self.ppm)
+        age = now - self.timestamp
+        # Comparisons against NaN are False, so channels without data never alert
+        alert = self.ppm > self.thresholds
+        stale = age > self.stale_after
+        disconnected = ~(age < self.disconnected_after)
+        if not connected:
+            disconnected[:] = True
+        return SensorStatus(has_value, alert, stale, disconnected)
+
+    def snapshot(self, index, disconnected, alert=False):
+        """One sensor in the JSON shape served by the web API
+
+        alert is the alert engine's decision for the sensor, so the web
+        dashboard shows the same debounced, hysteretic alarm as the GUI.
+        """
+        if np.isnan(self.ppm[index]):
+            value = resistance = ratio = "--"
+        else:
+            value = float(self.ppm[index])
+            resistance = float(self.resistance[index])
+            ratio = float(self.ratio[index])
+        timestamp = None if np.isnan(self.timestamp[index]) else float(self.timestamp[index])
+        return {
+            "value": value,
+            "resistance": resistance,
+            "ratio": ratio,
+            "timestamp": timestamp,
+            "status": "disconnected" if disconnected else "connected",
+            "alert": bool(alert),
+        }
+
+    def snapshots(self, now, connected=True, alert=None):
+        """All sensors in the JSON shape served by the web API; alert is the alert engine's alarm array"""
+        disconnected = self.evaluate(now, connected).disconnected
+        if alert is None:
+            alert = np.zeros(self.count, dtype=bool)
+        return [self.snapshot(index, disconnected[index], alert[index]) for index in range(self.count)]
+
+
+def empty_snapshot():
+    """Web API entry for a sensor that has not reported yet"""
+    return {
+        "value": "--",
+        "resistance": "--",
+        "ratio": "--",
+        "timestamp": None,
+        "status": "disconnected",
+        "alert": False
+    }
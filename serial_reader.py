@@ -0,0 +1,170 @@
+import select
+import time
+
+
+class SerialReader:
+    """Read bytes from a serial port, either event-driven or by polling
+
+    In "event" mode the reader blocks on the port's file descriptor and only
+    wakes up when bytes arrive (or the timeout expires). "poll" mode keeps the
+    original in_waiting / 10 ms sleep loop so the two can be compared.
+    """
+
+    def __init__(self, serial_port, mode="event", timeout=1.0, poll_interval=0.01,
+                 report_interval=60):
+        if mode not in ("event", "poll"):
+            raise ValueError(f"Unknown reader mode: {mode}")
+        self.serial = serial_port
+        self.mode = mode
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.report_interval = report_interval
+
+        # Use select() on the fd when the port exposes one (POSIX), otherwise
+        # fall back to a blocking read with the port's own timeout
+        try:
+            self.fd = self.serial.fileno()
+        except (AttributeError, OSError, ValueError):
+            self.fd = None
+
+        self.last_receive_time = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset wakeup and latency counters"""
+        self.stats_start = time.monotonic()
+        self.wakeups = 0
+        self.bytes_read = 0
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def read(self):
+        """Return the next chunk of bytes, or b'' if nothing arrived"""
+        if self.mode == "poll":
+            return self._read_poll()
+        return self._read_event()
+
+    def _read_poll(self):
+        self.wakeups += 1
+        if self.serial.in_waiting > 0:
+            return self._record(self.serial.read(self.serial.in_waiting))
+        time.sleep(self.poll_interval)
+        return b""
+
+    def _read_event(self):
+        if self.fd is not None:
+            ready, _, _ = select.select([self.fd], [], [], self.timeout)
+            self.wakeups += 1
+            if not ready:
+                return b""
+            # pyserial raises SerialException if the fd is readable but empty,
+            # which is how an unplugged USB adapter shows up
+            return self._record(self.serial.read(self.serial.in_waiting or 1))
+
+        self.serial.timeout = self.timeout
+        data = self.serial.read(1)
+        self.wakeups += 1
+        if not data:
+            return b""
+        waiting = self.serial.in_waiting
+        if waiting:
+            data += self.serial.read(waiting)
+        return self._record(data)
+
+    def _record(self, data):
+        if data:
+            self.last_receive_time = time.monotonic()
+            self.bytes_read += len(data)
+        return data
+
+    def mark_parsed(self):
+        """Record receive-to-parse latency for the last chunk that was read"""
+        if self.last_receive_time is None:
+            return
+        latency = time.monotonic() - self.last_receive_time
+        self.last_receive_time = None
+        self.latency_count += 1
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+
+    def stats(self):
+        """Return a snapshot of the reader statistics"""
+        elapsed = max(time.monotonic() - self.stats_start, 1e-9)
+        return {
+            "mode": self.mode,
+            "elapsed_s": elapsed,
+            "wakeups": self.wakeups,
+            "wakeups_per_s": self.wakeups / elapsed,
+            "bytes_read": self.bytes_read,
+            "parse_latency_avg_ms": (self.latency_total / self.latency_count * 1000) if self.latency_count else None,
+            "parse_latency_max_ms": self.latency_max * 1000 if self.latency_count else None,
+        }
+
+    def maybe_report(self):
+        """Print and reset the statistics once every report_interval seconds"""
+        if not self.report_interval:
+            return None
+        if time.monotonic() - self.stats_start < self.report_interval:
+            return None
+        stats = self.stats()
+        print(format_stats(stats))
+        self.reset_stats()
+        return stats
+
+
+def wait_for_data(serial_port, timeout):
+    """Block until the port has bytes to read or timeout expires; True if data arrived
+
+    Replaces a fixed settle sleep after opening the port: a board that resets
+    on open (USB DTR) speaks once its sketch is running, and one that doesn't
+    reset (the Pi's UART) is ready at once.
+    """
+    try:
+        fd = serial_port.fileno()
+    except (AttributeError, OSError, ValueError):
+        fd = None
+    if fd is not None:
+        ready, _, _ = select.select([fd], [], [], timeout)
+        return bool(ready)
+
+    deadline = time.monotonic() + timeout
+    while not serial_port.in_waiting:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def format_stats(stats):
+    """Format reader statistics as a single log line"""
+    if stats["parse_latency_avg_ms"] is None:
+        latency = "no data"
+    else:
+        latency = (f"avg {stats['parse_latency_avg_ms']:.3f} ms, "
+                   f"max {stats['parse_latency_max_ms']:.3f} ms")
+    return (f"Serial reader ({stats['mode']}): {stats['wakeups_per_s']:.1f} wakeups/s, "
+            f"{stats['bytes_read']} bytes, receive-to-parse {latency}")
+
+
+if __name__ == "__main__":
+    # Compare the two modes on an idle or live port: python serial_reader.py /dev/serial0 event 10
+    import sys
+    import serial
+
+    port = sys.argv[1] if len(sys.argv) > 1 else "/dev/serial0"
+    mode = sys.argv[2] if len(sys.argv) > 2 else "event"
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    ser = serial.Serial(port, 9600, timeout=1)
+    reader = SerialReader(ser, mode=mode, report_interval=0)
+    cpu_start = time.process_time()
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        if reader.read():
+            reader.mark_parsed()
+    cpu_used = time.process_time() - cpu_start
+    print(format_stats(reader.stats()))
+    print(f"CPU time: {cpu_used * 1000:.1f} ms over {duration:.0f} s")
+    ser.close()
@@ -0,0 +1,146 @@
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# One fixed-width record per sensor. NaN stands for "--" / no timestamp
+RECORD_DTYPE = np.dtype([
+    ('value', '<f8'),
+    ('resistance', '<f8'),
+    ('ratio', '<f8'),
+    ('timestamp', '<f8'),
+    ('status', 'u1'),
+    ('alert', '?'),
+])
+
+STATUSES = ("disconnected", "connected")
+
+HEADER_SIZE = 64  # Sequence counter, padded to a cache line
+
+# A write holds the lock for microseconds; a reader waiting longer than this
+# assumes the writer died mid-write and serves the last good snapshot
+READ_TIMEOUT = 0.02
+
+
+def _number(value):
+    return math.nan if value is None or value == "--" else float(value)
+
+
+class SharedSensorTable:
+    """Latest snapshot of every sensor in shared memory
+
+    A single writer (the bridge process) bumps the sequence counter to odd,
+    writes the record and bumps it to even again; the counter doubles as
+    the data version. Readers copy the whole table, with no pickling or
+    proxy round trip.
+
+    Writes and copies also hold a process-shared lock. numpy loads and
+    stores carry no memory barriers, so on a weakly ordered CPU like the
+    Pi's ARM a lock-free reader could see the counter and the records out
+    of order; the semaphore behind the lock is a full barrier, and
+    uncontended it costs no syscall. Readers only take it when the version
+    moved since their last copy, so polling readers rarely contend with
+    the writer. A reader never waits more than
+    READ_TIMEOUT: if the writer died holding the lock or left the counter
+    odd, read() returns the last good snapshot and counts a stale read.
+
+    Create it in the parent before forking the bridge, GUI and web
+    processes; they all inherit the mapping and the lock. To attach by
+    name, pass the owner's lock too.
+    """
+
+    def __init__(self, sensor_count, name=None, lock=None):
+        size = HEADER_SIZE + sensor_count * RECORD_DTYPE.itemsize
+        self.owner = name is None
+        if not self.owner and lock is None:
+            raise ValueError("Attach to a shared sensor table with its owner's lock")
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.sequence = np.ndarray((1,), dtype='<u8', buffer=self.shm.buf)
+        self.records = np.ndarray((sensor_count,), dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=HEADER_SIZE)
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+        self.last_good = None
+        self.stale_reads = 0
+        if self.owner:
+            self.sequence[0] = 0
+            self.records[:] = (math.nan, math.nan, math.nan, math.nan, 0, False)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def version(self):
+        """Number of completed writes; never ahead of the readable data"""
+        return int(self.sequence[0]) // 2
+
+    def update(self, index, data):
+        """Write the fields present in a snapshot dict (see sensor_state.SensorState.snapshot)"""
+        record = list(self.records[index].tolist())
+        fields = RECORD_DTYPE.names
+        for key, value in data.items():
+            if key == "status":
+                record[fields.index(key)] = STATUSES.index(value) if value in STATUSES else 0
+            elif key == "alert":
+                record[fields.index(key)] = bool(value)
+            elif key in fields:
+                record[fields.index(key)] = _number(value)
+        sequence = self.sequence
+        with self.lock:
+            sequence[0] += 1  # Odd: write in progress
+            self.records[index] = tuple(record)
+            sequence[0] += 1
+
+    def read(self):
+        """(version, records) from one consistent moment; treat the records as read-only
+
+        Falls back to the last good snapshot if the writer is stuck or died
+        mid-write; raises TimeoutError if there is none yet.
+        """
+        last_good = self.last_good
+        if last_good is not None and int(self.sequence[0]) == last_good[0] * 2:
+            # Nothing written since the last copy. The counter read without the
+            # lock is only a hint: the worst case is a change seen a poll late
+            return last_good
+        if not self.lock.acquire(timeout=READ_TIMEOUT):
+            return self._stale("its writer has held the lock too long")
+        try:
+            sequence = int(self.sequence[0])
+            records = self.records.copy()
+        finally:
+            self.lock.release()
+        if sequence & 1:
+            return self._stale("its writer died mid-write")
+        self.last_good = (sequence // 2, records)
+        return self.last_good
+
+    def _stale(self, reason):
+        self.stale_reads += 1
+        if self.last_good is None:
+            raise TimeoutError(f"Shared sensor table unreadable: {reason}")
+        return self.last_good
+
+    def snapshots(self):
+        """All sensors in the JSON shape served by the web API"""
+        _, records = self.read()
+        return [to_snapshot(record) for record in records.tolist()]
+
+    def close(self):
+        """Unmap, and remove the segment if this table created it"""
+        del self.sequence, self.records
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def to_snapshot(record):
+    value, resistance, ratio, timestamp, status, alert = record
+    if math.isnan(value):
+        value = resistance = ratio = "--"
+    return {
+        "value": value,
+        "resistance": resistance,
+        "ratio": ratio,
+        "timestamp": None if math.isnan(timestamp) else timestamp,
+        "status": STATUSES[status],
+        "alert": alert,
+    }
@@ -0,0 +1,54 @@
+import json
+import threading
+import time
+from collections import namedtuple
+
+# body is the encoded JSON; gzipped is its gzip encoding, or None when that doesn't help
+Snapshot = namedtuple("Snapshot", ["version", "etag", "body", "gzipped"])
+
+
+class VersionedSnapshot:
+    """The encoded /api/sensors body, rebuilt only when the bridge version changes
+
+    load() returns the sensor list and version() the bridge's change
+    counter. Requests between changes reuse the cached bytes (and their
+    gzip encoding, made once per version by compress()) and the strong
+    ETag; the ETag includes a per-start id so a restart, which resets the
+    counter, never revalidates a stale copy. notify() wakes long-polls
+    waiting in wait() for a newer version.
+    """
+
+    def __init__(self, load, version, compress=None):
+        self.load = load
+        self.version = version
+        self.compress = compress
+        self.boot = format(int(time.time() * 1000), 'x')
+        self.condition = threading.Condition()
+        self.lock = threading.Lock()
+        self.cached = Snapshot(None, None, None, None)
+
+    def get(self):
+        """Snapshot for the current data"""
+        version = self.version()
+        cached = self.cached
+        if cached.version == version:
+            return cached
+        with self.lock:
+            if self.cached.version != version:
+                # Read after the version: the body can be newer, never older
+                body = json.dumps(self.load()).encode()
+                gzipped = self.compress(body) if self.compress else None
+                self.cached = Snapshot(version, f"{self.boot}-{version}", body, gzipped)
+            return self.cached
+
+    def wait(self, since, timeout):
+        """Block until the version differs from `since` or timeout seconds pass
+
+        A `since` from before a restart differs too and returns at once.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.version() != since, timeout)
+
+    def notify(self):
+        with self.condition:
+            self.condition.notify_all()
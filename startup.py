@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+
+def _clock():
+    # Boot time clock: comparable across processes and with /proc start times
+    return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+
+def process_start():
+    """When this process started, on _clock(); now if /proc isn't available"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22, counted after the parenthesised command name
+            fields = f.read().rsplit(")", 1)[1].split()
+        return int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _clock()
+
+
+class StartupTimer:
+    """Seconds from process start to each boot phase
+
+    Create it first thing in the entry point. Forked children inherit the
+    origin, so every process reports against the same zero: the moment
+    systemd (or the shell) started Python.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = process_start() if origin is None else origin
+        self.phases = []
+        self.reported = False
+        # Marks come from several threads; keep their lines whole
+        self.lock = threading.Lock()
+
+    def mark(self, phase):
+        """Record and print that phase is done; returns seconds since start"""
+        with self.lock:
+            elapsed = _clock() - self.origin
+            self.phases.append((phase, elapsed))
+            print(f"Startup +{elapsed:.3f}s: {phase}")
+        return elapsed
+
+    def report(self):
+        """Print the phase breakdown once, with the time each phase added"""
+        with self.lock:
+            if self.reported:
+                return
+            self.reported = True
+            print(format_startup(self.phases))
+
+
+def format_startup(phases):
+    lines = ["Startup timing (seconds since process start):"]
+    previous = 0.0
+    for phase, elapsed in phases:
+        lines.append(f"  {elapsed:7.3f}  (+{elapsed - previous:.3f})  {phase}")
+        previous = elapsed
+    return "\n".join(lines)
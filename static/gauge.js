@@ -131,12 +131,13 @@ class HydrogenGauge {
     }
 }
 
-// Global gauge instances
-window.gauge1 = null;
-window.gauge2 = null;
-
-// Initialize gauges when DOM is loaded
+// Initialize one global gauge instance (window.gauge1, window.gauge2, ...) per sensor card
 document.addEventListener('DOMContentLoaded', () => {
-    window.gauge1 = new HydrogenGauge('gauge1', 1000);
-    window.gauge2 = new HydrogenGauge('gauge2', 1000);
+    document.querySelectorAll('canvas.sensor-gauge').forEach((canvas) => {
+        const gauge = new HydrogenGauge(canvas.id, 1000);
+        if (canvas.dataset.threshold) {
+            gauge.setThreshold(parseFloat(canvas.dataset.threshold));
+        }
+        window[canvas.id] = gauge;
+    });
 });
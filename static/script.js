@@ -1,7 +1,11 @@
 class HydrogenMonitor {
     constructor() {
-        this.threshold = 150; // PPM threshold for alerts
-        this.updateInterval = 1000; // Update every second
+        this.updateInterval = 1000; // Polling interval when the stream is unavailable
+        this.streamRetryDelay = 30000; // Wait before asking again for a stream the server refused
+        this.sensors = [];
+        this.stream = null;
+        this.pollTimer = null;
+        this.seq = null; // Last applied WebSocket sequence number, null while resyncing
         this.init();
     }
 
@@ -12,21 +16,130 @@ class HydrogenMonitor {
 
     startDataUpdates() {
         this.updateData();
-        setInterval(() => {
-            this.updateData();
-        }, this.updateInterval);
+        if (window.WebSocket) {
+            this.startSocket();
+        } else {
+            this.startEventStream();
+        }
+    }
+
+    startEventStream() {
+        if (window.EventSource) {
+            this.startStream();
+        } else {
+            this.startPolling();
+        }
+    }
+
+    startSocket() {
+        // Snapshot on connect, then only the changed fields of each sensor
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${scheme}://${window.location.host}/api/ws`);
+        let opened = false;
+
+        socket.onopen = () => {
+            opened = true;
+            this.stopPolling();
+        };
+
+        socket.onmessage = (event) => {
+            this.applySocketMessage(socket, JSON.parse(event.data));
+        };
+
+        socket.onclose = () => {
+            this.seq = null;
+            if (!opened) {
+                // Server without WebSocket support
+                this.startEventStream();
+                return;
+            }
+            this.startPolling();
+            setTimeout(() => this.startSocket(), 2000);
+        };
+    }
+
+    applySocketMessage(socket, message) {
+        if (message.type === 'snapshot') {
+            this.seq = message.seq;
+            this.showAllSensors(message.sensors);
+            return;
+        }
+        if (this.seq === null) {
+            return; // Waiting for the resync snapshot
+        }
+        if (message.seq !== this.seq + 1) {
+            // Missed a delta: state is unknown until a fresh snapshot arrives
+            this.seq = null;
+            socket.send(JSON.stringify({type: 'resync'}));
+            return;
+        }
+        this.seq = message.seq;
+        const index = message.sensor_id - 1;
+        this.sensors[index] = Object.assign({}, this.sensors[index], message.changes);
+        this.updateSensorDisplay(message.sensor_id, this.sensors[index]);
+        this.updateSystemStatus(this.sensors);
+    }
+
+    startStream() {
+        // Readings are pushed by /api/stream as soon as the bridge has them
+        this.stream = new EventSource('/api/stream');
+
+        this.stream.addEventListener('snapshot', (event) => {
+            this.showAllSensors(JSON.parse(event.data));
+        });
+
+        this.stream.addEventListener('sensor', (event) => {
+            const update = JSON.parse(event.data);
+            this.sensors[update.sensor_id - 1] = update.data;
+            this.updateSensorDisplay(update.sensor_id, update.data);
+            this.updateSystemStatus(this.sensors);
+        });
+
+        this.stream.onopen = () => {
+            this.stopPolling();
+        };
+
+        const stream = this.stream;
+        stream.onerror = () => {
+            // Poll while EventSource reconnects
+            this.startPolling();
+            if (stream.readyState === EventSource.CLOSED) {
+                // Refused, e.g. 503 when the server is out of stream slots:
+                // EventSource gives up, so keep polling and ask again later
+                this.stream = null;
+                setTimeout(() => this.startStream(), this.streamRetryDelay);
+            }
+        };
+    }
+
+    startPolling() {
+        if (this.pollTimer === null) {
+            this.pollTimer = setInterval(() => {
+                this.updateData();
+            }, this.updateInterval);
+        }
+    }
+
+    stopPolling() {
+        if (this.pollTimer !== null) {
+            clearInterval(this.pollTimer);
+            this.pollTimer = null;
+        }
+    }
+
+    showAllSensors(data) {
+        this.sensors = data;
+        data.forEach((sensor, index) => {
+            this.updateSensorDisplay(index + 1, sensor);
+        });
+        this.updateSystemStatus(data);
     }
 
     async updateData() {
         try {
             const response = await fetch('/api/sensors');
             const data = await response.json();
-            
-            data.forEach((sensor, index) => {
-                this.updateSensorDisplay(index + 1, sensor);
-            });
-            
-            this.updateSystemStatus(data);
+            this.showAllSensors(data);
         } catch (error) {
             console.error('Error fetching sensor data:', error);
             this.showError();
@@ -55,8 +168,8 @@ class HydrogenMonitor {
             // Update gauge value display
             gaugeValueElement.textContent = ppmValue.toFixed(2);
             
-            // Check for alert condition
-            if (ppmValue > this.threshold) {
+            // Alarm as decided by the server's alert engine (debounce, hysteresis)
+            if (data.alert) {
                 gaugeValueElement.classList.add('alert');
                 sensorCard.classList.add('alert');
                 alertElement.style.display = 'block';
@@ -116,9 +229,7 @@ class HydrogenMonitor {
 
     updateSystemStatus(data) {
         const systemStatus = document.getElementById('systemStatus');
-        const hasActiveAlerts = data.some(sensor => 
-            sensor.value !== "--" && sensor.value !== null && parseFloat(sensor.value) > this.threshold
-        );
+        const hasActiveAlerts = data.some(sensor => sensor.alert);
         
         const hasConnection = data.some(sensor => sensor.timestamp !== null);
         
@@ -0,0 +1,50 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MB = 1024 * 1024
+DAY = 86400
+
+
+def store_path(options, default):
+    """Storage path from the config, relative paths being relative to the scripts"""
+    path = options.get("path", default)
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def open_store(config, readonly=False):
+    """Open the reading store selected by the "storage" section of sensors.json
+
+    Returns None when persistence is disabled ("backend": "none"). A
+    readonly store starts no background thread and is only used for queries,
+    e.g. by the web process while the GUI process is writing.
+    """
+    options = config.storage
+    backend = options.get("backend", "none")
+    if backend == "none":
+        return None
+    if backend == "segments":
+        from reading_log import ReadingLog
+        return ReadingLog(
+            store_path(options, "data/readings"),
+            segment_bytes=int(options.get("segment_mb", 8) * MB),
+            max_bytes=int(options.get("max_mb", 1024) * MB),
+            retention_seconds=options.get("retention_days", 90) * DAY,
+            segment_seconds=options.get("segment_hours", 24) * 3600,
+            flush_interval=0 if readonly else options.get("flush_interval", 5.0),
+            readonly=readonly,
+        )
+    if backend == "sqlite":
+        from history_db import HistoryDatabase
+        path = store_path(options, "data/history.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return HistoryDatabase(
+            path,
+            batch_size=options.get("batch_size", 500),
+            flush_interval=options.get("flush_interval", 1.0),
+            retention_seconds=options.get("retention_days", 30) * DAY,
+            minute_retention_seconds=options.get("minute_retention_days", 180) * DAY,
+            hour_retention_seconds=options.get("hour_retention_days", 5 * 365) * DAY,
+            writer=not readonly,
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
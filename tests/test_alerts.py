@@ -0,0 +1,60 @@
+from alerts import AlertEngine
+from ring_buffer import SensorHistory
+from sensor_config import SensorConfig
+
+
+def engine(**alerts):
+    return AlertEngine(SensorConfig([{"channel": 1}], threshold=100, alerts=alerts))
+
+
+def feed(engine, values, start=0.0, interval=1.0):
+    """(rule, active) of every transition the readings caused"""
+    transitions = []
+    for step, ppm in enumerate(values):
+        for event in engine.evaluate(0, ppm, start + step * interval):
+            transitions.append((event.rule, event.active))
+    return transitions
+
+
+def test_hysteresis_clears_only_below_threshold_minus_margin():
+    alerts = engine(hysteresis=10)
+    assert feed(alerts, [150]) == [("threshold", True)]
+    # Back under the threshold but inside the margin: still in alarm
+    assert feed(alerts, [99, 95, 90], start=1) == []
+    assert alerts.alarm[0]
+    assert feed(alerts, [89], start=4) == [("threshold", False)]
+    assert not alerts.alarm[0]
+    assert alerts.severity is None
+
+
+def test_debounce_counts_consecutive_samples():
+    alerts = engine(debounce=3)
+    # A dip resets the count
+    assert feed(alerts, [150, 150, 50, 150, 150]) == []
+    assert feed(alerts, [150], start=5) == [("threshold", True)]
+    assert alerts.severity == "alarm"
+    assert feed(alerts, [50, 50], start=6) == []
+    assert feed(alerts, [50], start=8) == [("threshold", False)]
+
+
+def test_rate_of_rise_warns_before_the_threshold():
+    alerts = engine(rate_of_rise=20, rate_window=2)
+    # Needs half a window of readings before any rate is known
+    assert feed(alerts, [10, 40, 70], interval=0.5) == [("rate", True)]
+    assert alerts.severity == "warning"
+    assert alerts.evaluate(0, 70, 1.5) == []
+    # Flat readings bring the slope under half the rate and clear it
+    assert feed(alerts, [70, 70, 70], start=2.0, interval=0.5)[-1] == ("rate", False)
+    assert not alerts.alarm[0]
+
+
+def test_rate_of_rise_reads_the_callers_history():
+    config = SensorConfig([{"channel": 1}], threshold=100, alerts={"rate_of_rise": 20, "rate_window": 2})
+    history = SensorHistory(config.count, config.history_size)
+    alerts = AlertEngine(config, history)
+    events = []
+    for step, ppm in enumerate([10, 40, 70]):
+        history.append(0, step * 0.5, 1.0, 0.5, ppm)
+        events.extend(alerts.evaluate(0, ppm, step * 0.5))
+    assert [(event.rule, event.active) for event in events] == [("rate", True)]
+    assert events[0].rate == 60.0
@@ -0,0 +1,153 @@
+import asyncio
+import os
+
+from ingest import IngestionEngine, open_serial
+from sensor_config import SensorConfig
+from benchmarks.simulator import open_pty_pair
+
+
+def data_line(seconds, channel, ppm):
+    return f"{seconds}\t{channel}\t1523342.25\t0.4712\t{ppm:.2f} ppm\r\n".encode("ascii")
+
+
+class Boards:
+    """Pty pairs standing in for boards, reachable under stable port names
+
+    The engine opens the slave side through pyserial exactly as it would a
+    real serial port. plug() swaps in a fresh pty under the same name, the
+    way a board shows up again after being unplugged.
+    """
+
+    def __init__(self, names):
+        self.masters = {}
+        self.paths = {}
+        for name in names:
+            self.plug(name)
+
+    def plug(self, name):
+        master, path = open_pty_pair()
+        os.set_blocking(master, False)
+        self.masters[name] = master
+        self.paths[name] = path
+
+    def unplug(self, name):
+        os.close(self.masters.pop(name))
+
+    def write(self, name, data):
+        os.write(self.masters[name], data)
+
+    def open_port(self, name, baud_rate):
+        if name not in self.masters:
+            raise OSError(f"{name} is unplugged")
+        return open_serial(self.paths[name], baud_rate)
+
+    def close(self):
+        for master in self.masters.values():
+            os.close(master)
+
+
+async def until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def collect(stream, count, timeout=5.0):
+    return [await asyncio.wait_for(stream.get(), timeout) for _ in range(count)]
+
+
+def run_engine(names, scenario, maxsize=0, sensors=None):
+    """Run scenario(engine, stream, boards) against a started engine"""
+    boards = Boards(names)
+    config = SensorConfig(sensors or [{"port": name, "channel": channel} for name in names for channel in (1, 2)])
+
+    async def main():
+        engine = IngestionEngine(config, settle_time=0, reconnect_delay=0.05, open_port=boards.open_port)
+        stream = engine.consume(maxsize)
+        task = asyncio.create_task(engine.run())
+        try:
+            await until(lambda: engine.connected and all(state.connected for state in engine.states.values()))
+            await scenario(engine, stream, boards)
+        finally:
+            engine.stop()
+            await task
+
+    try:
+        asyncio.run(main())
+    finally:
+        boards.close()
+
+
+def test_readings_from_several_ports():
+    async def scenario(engine, stream, boards):
+        for seconds in range(3):
+            for name in ("a", "b", "c"):
+                for channel in (1, 2):
+                    boards.write(name, data_line(seconds, channel, seconds + channel / 10))
+        readings = await collect(stream, 18)
+        per_sensor = {}
+        for sensor_index, reading, received in readings:
+            per_sensor.setdefault(sensor_index, []).append(reading.ppm)
+        # Every channel of every board maps to its own sensor, in order
+        assert sorted(per_sensor) == list(range(6))
+        for sensor_index, values in per_sensor.items():
+            channel = sensor_index % 2 + 1
+            assert values == [seconds + channel / 10 for seconds in range(3)]
+        for stats in engine.stats().values():
+            assert stats["readings"] == 6
+
+    run_engine(["a", "b", "c"], scenario)
+
+
+def test_reconnects_after_the_board_goes_away():
+    async def scenario(engine, stream, boards):
+        boards.write("a", data_line(1, 1, 5.0))
+        (sensor_index, reading, received), = await collect(stream, 1)
+        assert reading.ppm == 5.0
+
+        boards.unplug("a")
+        await until(lambda: not engine.states["a"].connected)
+        boards.write("b", data_line(1, 1, 6.0))
+        (sensor_index, reading, received), = await collect(stream, 1)
+        # The other board keeps flowing while "a" is away
+        assert (sensor_index, reading.ppm) == (2, 6.0)
+
+        boards.plug("a")
+        await until(lambda: engine.states["a"].connected)
+        boards.write("a", data_line(2, 2, 7.0))
+        (sensor_index, reading, received), = await collect(stream, 1)
+        assert (sensor_index, reading.ppm) == (1, 7.0)
+        assert engine.stats()["a"]["reconnects"] == 1
+
+    run_engine(["a", "b"], scenario)
+
+
+def test_framer_resyncs_after_garbage():
+    async def scenario(engine, stream, boards):
+        boards.write("a", data_line(1, 1, 5.0)[:12])
+        # Line noise with no newline, longer than any line, then the stream recovers
+        boards.write("a", bytes(range(1, 10)) * 60)
+        boards.write("a", b"\r\n" + data_line(2, 1, 6.0) + data_line(2, 2, 7.0))
+        readings = await collect(stream, 2)
+        assert [reading.ppm for _, reading, _ in readings] == [6.0, 7.0]
+        decoder = engine.stats()["a"]["decoder"]
+        assert decoder["overflows"] == 1
+        assert decoder["bytes_dropped"] == 12 + 9 * 60 + 2
+
+    run_engine(["a"], scenario)
+
+
+def test_full_stream_drops_and_counts():
+    async def scenario(engine, stream, boards):
+        boards.write("a", b"".join(data_line(seconds, 1, seconds) for seconds in range(5)))
+        await until(lambda: engine.stats()["a"]["readings"] == 5)
+        assert stream.qsize() == 2
+        assert engine.stream_dropped == 3
+        # The port stays connected and keeps delivering once there is room
+        await collect(stream, 2)
+        boards.write("a", data_line(9, 1, 9.0))
+        (sensor_index, reading, received), = await collect(stream, 1)
+        assert reading.ppm == 9.0
+
+    run_engine(["a"], scenario, maxsize=2)
@@ -0,0 +1,112 @@
+import os
+
+from reading_log import RECORD, HEADER_SIZE, ReadingLog
+from sensor_parser import ReadingKind
+
+
+def make_log(tmp_path, records_per_segment=100):
+    return ReadingLog(str(tmp_path), segment_bytes=HEADER_SIZE + records_per_segment * RECORD.size,
+                      flush_interval=0)
+
+
+def append_all(log, timestamps):
+    for number, timestamp in enumerate(timestamps):
+        log.append(timestamp, 1 + number % 2, ReadingKind.DATA, 1.5e6, 0.47, float(number))
+
+
+def expected(timestamps, start, end, sensor_id=None):
+    found = [(t, number) for number, t in enumerate(timestamps) if start <= t < end
+             and (sensor_id is None or 1 + number % 2 == sensor_id)]
+    return [t for t, _ in sorted(found)], [float(number) for _, number in sorted(found)]
+
+
+def check_scans(log, timestamps):
+    for start, end in [(0, 1e10), (1000, 1100), (1050, 1250), (1190, 1210), (900, 1000), (1500, 1600)]:
+        for sensor_id in (None, 2):
+            records = log.scan(start, end, sensor_id)
+            times, values = expected(timestamps, start, end, sensor_id)
+            assert records['timestamp'].tolist() == times
+            assert records['ppm'].tolist() == values
+
+
+def test_scan_in_order(tmp_path):
+    log = make_log(tmp_path)
+    timestamps = [1000 + n * 0.5 for n in range(450)]
+    append_all(log, timestamps)
+    check_scans(log, timestamps)
+    log.close()
+    check_scans(log, timestamps)
+
+
+def test_clock_stepped_back_inside_a_segment(tmp_path):
+    log = make_log(tmp_path, records_per_segment=1000)
+    # NTP steps the clock back 60 s after 100 s of readings
+    timestamps = [1000 + n for n in range(100)] + [1040 + n for n in range(100)]
+    append_all(log, timestamps)
+    assert len(log.segments()) == 1
+    check_scans(log, timestamps)
+
+
+def test_clock_stepped_back_across_segments(tmp_path):
+    log = make_log(tmp_path, records_per_segment=50)
+    timestamps = [1100 + n for n in range(120)] + [1000 + n for n in range(120)]
+    append_all(log, timestamps)
+    check_scans(log, timestamps)
+    # Names follow creation order, so pruning still drops the oldest written
+    paths = log.segments()
+    log.max_bytes = sum(os.path.getsize(path) for path in paths[1:])
+    log.prune(now=2000)
+    assert log.segments() == paths[1:]
+    kept = sorted((t, float(number)) for number, t in enumerate(timestamps) if number >= 50)
+    assert log.scan(0, 1e10)['ppm'].tolist() == [value for _, value in kept]
+    log.close()
+
+
+def test_readonly_reader_sees_the_flag(tmp_path):
+    log = make_log(tmp_path, records_per_segment=1000)
+    timestamps = [1000 + n for n in range(10)] + [995 + n for n in range(10)]
+    append_all(log, timestamps)
+    reader = ReadingLog(str(tmp_path), flush_interval=0, readonly=True)
+    times, _ = expected(timestamps, 998, 1003)
+    assert reader.scan(998, 1003)['timestamp'].tolist() == times
+    log.close()
+
+
+def test_history_aggregates_buckets(tmp_path):
+    log = make_log(tmp_path, records_per_segment=50)
+    # Segment boundaries fall inside buckets, and the clock steps back once
+    timestamps = [1000 + n * 0.5 for n in range(150)] + [1030 + n * 0.5 for n in range(60)]
+    append_all(log, timestamps)
+    for start, end, width in [(0, 1e10, 7), (1010, 1060, 3), (1000, 1100, 0.5)]:
+        buckets = log.history(2, start, end, width)
+        times, values = expected(timestamps, start, end, sensor_id=2)
+        groups = {}
+        for t, value in zip(times, values):
+            groups.setdefault(t // width, []).append(value)
+        keys = sorted(groups)
+        assert buckets.timestamp.tolist() == [key * width for key in keys]
+        assert buckets.count.tolist() == [len(groups[key]) for key in keys]
+        assert buckets.min.tolist() == [min(groups[key]) for key in keys]
+        assert buckets.max.tolist() == [max(groups[key]) for key in keys]
+        assert buckets.mean.tolist() == [sum(groups[key]) / len(groups[key]) for key in keys]
+    # Without a bucket width every reading comes back
+    assert log.history(2, 0, 1e10).count.tolist() == [1.0] * len(expected(timestamps, 0, 1e10, 2)[0])
+    log.close()
+
+
+def test_segments_of_a_killed_writer_are_trimmed(tmp_path):
+    log = make_log(tmp_path)
+    timestamps = [1000 + n for n in range(130)]
+    append_all(log, timestamps)
+    # Killed: the active segment is never closed and keeps its preallocated tail
+    log.segment.flush()
+    paths = log.segments()
+    assert os.path.getsize(paths[-1]) == HEADER_SIZE + 100 * RECORD.size
+    ReadingLog(str(tmp_path), flush_interval=0, readonly=True)
+    assert os.path.getsize(paths[-1]) == HEADER_SIZE + 100 * RECORD.size
+    reopened = make_log(tmp_path)
+    assert os.path.getsize(paths[-1]) == HEADER_SIZE + 30 * RECORD.size
+    check_scans(reopened, timestamps)
+    # Trimmed segments count as closed, so their spans are cached
+    reopened.scan(0, 1e10)
+    assert set(reopened.spans) == set(paths)
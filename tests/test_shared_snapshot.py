@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from shared_snapshot import READ_TIMEOUT, SharedSensorTable
+
+
+def die_mid_write(table):
+    """A writer killed between the two counter updates"""
+    table.lock.acquire()
+    table.sequence[0] += 1
+    table.records[0] = (99.0, 0.0, 0.0, 0.0, 1)
+    os._exit(1)
+
+
+def die_holding_nothing(table):
+    """A writer killed after the first counter update but with the lock already gone"""
+    table.sequence[0] += 1
+    table.records[0] = (99.0, 0.0, 0.0, 0.0, 1)
+    os._exit(1)
+
+
+@pytest.fixture
+def table():
+    table = SharedSensorTable(2)
+    yield table
+    table.close()
+
+
+def test_readers_see_writes_and_versions(table):
+    table.update(1, {"value": 4.5, "status": "connected", "timestamp": 12.0})
+    version, records = table.read()
+    assert version == table.version == 1
+    assert table.snapshots()[1]["value"] == 4.5
+    assert table.snapshots()[1]["status"] == "connected"
+    assert table.snapshots()[1]["alert"] is False
+    # Unchanged tables are served from the last copy
+    assert table.read()[1] is records
+
+
+def test_alert_state_round_trips(table):
+    table.update(0, {"value": 180.0, "status": "connected", "timestamp": 12.0, "alert": True})
+    assert table.snapshots()[0]["alert"] is True
+    table.update(0, {"alert": False})
+    assert table.snapshots()[0]["alert"] is False
+    assert table.snapshots()[0]["value"] == 180.0
+
+
+@pytest.mark.parametrize("writer", [die_mid_write, die_holding_nothing])
+def test_dead_writer_never_hangs_readers(table, writer):
+    table.update(0, {"value": 1.0})
+    good = table.read()
+    process = multiprocessing.Process(target=writer, args=(table,))
+    process.start()
+    process.join()
+
+    start = time.monotonic()
+    for _ in range(3):
+        version, records = table.read()
+        assert (version, records[0]["value"]) == (good[0], 1.0)
+    assert time.monotonic() - start < 3 * READ_TIMEOUT + 0.5
+    assert table.stale_reads == 3
+
+
+def test_first_read_raises_without_a_good_snapshot(table):
+    table.lock.acquire()
+    with pytest.raises(TimeoutError):
+        table.read()
+    table.lock.release()
+    assert table.read()[0] == 0
+
+
+def test_attaching_by_name_needs_the_lock(table):
+    with pytest.raises(ValueError):
+        SharedSensorTable(2, name=table.shm.name)
+    other = SharedSensorTable(2, name=table.shm.name, lock=table.lock)
+    table.update(0, {"value": 3.0})
+    assert other.read()[1][0]["value"] == 3.0
+    other.close()
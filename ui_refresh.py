@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+
+import tkinter as tk
+
+
+def tcl_threaded(root):
+    """True if Tcl was built with threads, so other threads may post events to Tk"""
+    return str(root.tk.call("info", "exists", "tcl_platform(threaded)")) == "1"
+
+
+class UiRefresher:
+    """Redraw the Tk dashboard when readings arrive instead of on a fixed timer
+
+    notify() may be called from any thread. The first reading after a redraw
+    posts one virtual event to the Tk loop; readings arriving before it is
+    handled ride along, so a burst costs a single redraw. redraw() returns
+    how soon it must run again (e.g. to blink an alert) or None, in which
+    case a slow idle_interval timer keeps staleness checks going.
+
+    Without a threaded Tcl, events can't be posted safely from other threads
+    and the refresher polls every poll_interval like the old after() loop.
+    """
+
+    EVENT = "<<SensorData>>"
+
+    def __init__(self, root, redraw, idle_interval=1.0, poll_interval=0.1, event_driven=True):
+        self.root = root
+        self.redraw = redraw
+        self.idle_interval = idle_interval
+        self.poll_interval = poll_interval
+        self.event_driven = event_driven and tcl_threaded(root)
+        if event_driven and not self.event_driven:
+            print("Tcl is not threaded; polling for sensor data every "
+                  f"{poll_interval * 1000:.0f} ms")
+        self.lock = threading.Lock()
+        self.pending = False
+        # Arrival time of the oldest reading not yet on screen
+        self.arrived = None
+        self.timer = None
+        self.latencies = deque(maxlen=10000)
+        # Optional callback(arrived) after readings are on screen
+        self.on_paint = None
+        self.notifications = 0
+        self.redraws = 0
+        if self.event_driven:
+            root.bind(self.EVENT, self._on_event)
+
+    def notify(self, arrived=None):
+        """New readings are queued for the UI; arrived is when they came off the port"""
+        with self.lock:
+            self.notifications += 1
+            if self.arrived is None:
+                self.arrived = time.time() if arrived is None else arrived
+            if self.pending or not self.event_driven:
+                return
+            self.pending = True
+        try:
+            self.root.event_generate(self.EVENT, when="tail")
+        except (RuntimeError, tk.TclError):
+            # Main loop not running yet or window closed; the timer catches up
+            with self.lock:
+                self.pending = False
+
+    def _on_event(self, event):
+        self.run()
+
+    def _on_timer(self):
+        self.timer = None
+        self.run()
+
+    def run(self):
+        """Redraw now and schedule the next timed redraw"""
+        with self.lock:
+            self.pending = False
+            arrived, self.arrived = self.arrived, None
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+        delay = self.redraw()
+        if not self.event_driven:
+            delay = self.poll_interval
+        elif delay is None:
+            delay = self.idle_interval
+        self.timer = self.root.after(max(1, int(delay * 1000)), self._on_timer)
+        self.redraws += 1
+        if arrived is not None:
+            # Idle callbacks run after Tk has redisplayed the widgets just configured
+            self.root.after_idle(self._painted, arrived)
+
+    def _painted(self, arrived):
+        self.latencies.append(time.time() - arrived)
+        if self.on_paint is not None:
+            self.on_paint(arrived)
+
+    def take_stats(self):
+        """Line-to-screen latency and redraw counts since the last call"""
+        latencies = sorted(self.latencies)
+        self.latencies.clear()
+        stats = {
+            "mode": "event" if self.event_driven else "poll",
+            "notifications": self.notifications,
+            "redraws": self.redraws,
+            "samples": len(latencies),
+        }
+        if latencies:
+            stats["p50_ms"] = latencies[len(latencies) // 2] * 1e3
+            stats["p99_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3
+            stats["max_ms"] = latencies[-1] * 1e3
+        self.notifications = 0
+        self.redraws = 0
+        return stats
+
+
+def format_refresh_stats(stats):
+    text = (f"UI refresh ({stats['mode']}): {stats['redraws']} redraws for "
+            f"{stats['notifications']} notifications")
+    if stats["samples"]:
+        text += (f", line-to-screen p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, "
+                 f"max {stats['max_ms']:.1f} ms")
+    return text
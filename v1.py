@@ -4,10 +4,13 @@ import threading
 import time
 from datetime import datetime
 import queue
-import RPi.GPIO as GPIO
+from serial_reader import SerialReader
+from sensor_parser import parse_line, ReadingKind
+from binary_protocol import create_decoder, select_command
+from gpio_backend import load_gpio
 
 class HydrogenMonitorApp:
-    def __init__(self, root, serial_port='/dev/serial0', baud_rate=9600):
+    def __init__(self, root, serial_port='/dev/serial0', baud_rate=9600, reader_mode='event', protocol='ascii'):
         self.root = root
         self.root.title("Hydrogen Sensor Monitor")
 
@@ -26,6 +29,8 @@ class HydrogenMonitorApp:
         # Serial connection parameters
         self.serial_port = serial_port
         self.baud_rate = baud_rate
+        self.reader_mode = reader_mode  # "event" blocks on the port, "poll" is the old 10 ms loop
+        self.protocol = protocol  # "ascii" text lines or "binary" COBS/CRC16 frames
         self.serial = None
         self.connected = False
 
@@ -33,9 +38,10 @@ class HydrogenMonitorApp:
         self.buzzer_pin = 26  # GPIO 26
         self.buzzer_active = False
         self.alert_sensors = set()  # Track which sensors are in alert state
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.buzzer_pin, GPIO.OUT)
-        GPIO.output(self.buzzer_pin, GPIO.LOW)
+        self.gpio = load_gpio()  # RPi.GPIO, or the recorder with HYDROGEN_GPIO=mock
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(self.buzzer_pin, self.gpio.OUT)
+        self.gpio.output(self.buzzer_pin, self.gpio.LOW)
 
         # Data queue for thread-safe communication
         self.data_queue = queue.Queue()
@@ -227,8 +233,8 @@ class HydrogenMonitorApp:
     def on_closing(self):
         """Clean up and close application"""
         print("Closing application...")
-        GPIO.output(self.buzzer_pin, GPIO.LOW)
-        GPIO.cleanup()
+        self.gpio.output(self.buzzer_pin, self.gpio.LOW)
+        self.gpio.cleanup()
         self.root.destroy()
 
     def buzzer_control(self):
@@ -240,14 +246,14 @@ class HydrogenMonitorApp:
                     print(f"ALERT: Sensors {list(self.alert_sensors)} exceeded threshold!")
                 
                 # Intermittent buzzer pattern
-                GPIO.output(self.buzzer_pin, GPIO.HIGH)
+                self.gpio.output(self.buzzer_pin, self.gpio.HIGH)
                 time.sleep(0.5)
-                GPIO.output(self.buzzer_pin, GPIO.LOW)
+                self.gpio.output(self.buzzer_pin, self.gpio.LOW)
                 time.sleep(0.5)
             else:
                 if self.buzzer_active:
                     self.buzzer_active = False
-                    GPIO.output(self.buzzer_pin, GPIO.LOW)
+                    self.gpio.output(self.buzzer_pin, self.gpio.LOW)
                     print("Alert cleared - buzzer off")
                 time.sleep(0.1)
 
@@ -268,7 +274,7 @@ class HydrogenMonitorApp:
             # Update PPM value - only show "--" if never received data
             if data["value"] != "--":
                 try:
-                    value = float(data["value"])
+                    value = data["value"]
                     # Format with 2 decimal places minimum
                     display_value = f"{value:.2f}"
                     
@@ -321,8 +327,8 @@ class HydrogenMonitorApp:
 
             # Update additional info - keep last known values
             if data["resistance"] != "--" and data["ratio"] != "--":
-                self.resistance_labels[sensor_index].config(text=f"Resistance: {data['resistance']} Ω")
-                self.ratio_labels[sensor_index].config(text=f"Rs/R0: {data['ratio']}")
+                self.resistance_labels[sensor_index].config(text=f"Resistance: {data['resistance']:.2f} Ω")
+                self.ratio_labels[sensor_index].config(text=f"Rs/R0: {data['ratio']:.4f}")
 
         # Schedule next update - reduced frequency for better performance
         self.root.after(100, self.update_ui)
@@ -339,32 +345,31 @@ class HydrogenMonitorApp:
                 self.serial.flushInput()
                 time.sleep(2)  # Wait for connection to initialize
 
+                # Tell the Arduino which output protocol to use
+                self.serial.write(select_command(self.protocol))
+
                 self.status_label.config(text=f"Connected to {self.serial_port}", fg="green")
                 self.connected = True
 
-                # Main reading loop
-                buffer = ""
+                # Main reading loop - the reader blocks until data arrives
+                self.reader = SerialReader(self.serial, mode=self.reader_mode)
+                decoder = create_decoder(self.protocol)
                 while True:
                     try:
-                        if self.serial.in_waiting > 0:
-                            # Read available data
-                            new_data = self.serial.read(self.serial.in_waiting).decode('utf-8', errors='ignore')
-                            buffer += new_data
-                            
-                            # Process complete lines
-                            while '\n' in buffer:
-                                line, buffer = buffer.split('\n', 1)
-                                line = line.strip()
-                                if line:
-                                    self.process_sensor_data(line)
+                        new_data = self.reader.read()
+                        if new_data:
+                            # Process complete lines or frames
+                            self.process_readings(decoder.feed(new_data))
+                            self.reader.mark_parsed()
+
+                        if self.reader.maybe_report():
+                            print(f"Serial decoder ({self.protocol}): {decoder.stats()}")
                                     
                     except (serial.SerialException, OSError) as e:
                         self.status_label.config(text=f"Serial error: {str(e)}", fg="red")
                         self.connected = False
                         break
 
-                    time.sleep(0.01)  # Very short delay to prevent CPU hogging
-
             except (serial.SerialException, OSError) as e:
                 self.status_label.config(text=f"Connection failed: {str(e)}. Retrying in 5s...", fg="red")
                 self.connected = False
@@ -378,70 +383,50 @@ class HydrogenMonitorApp:
             time.sleep(5)
 
     def process_sensor_data(self, data_line):
-        """Process the data coming from the Arduino"""
-        try:
-            # Skip header lines and warnings, but allow debug messages
-            if any(skip_word in data_line for skip_word in ["MICS-5524", "Warming", "Sensors ready", "Time(s)"]):
-                return
-
-            # Parse the data line
-            parts = data_line.split('\t')
+        """Process a single line coming from the Arduino"""
+        reading = parse_line(data_line)
+        if reading is not None:
+            self.process_readings((reading,))
+
+    def process_readings(self, readings):
+        """Queue a batch of parsed readings for the UI"""
+        now = time.time()
+        for reading in readings:
+            # Skip header lines and unknown sensors
+            if reading.kind == ReadingKind.HEADER or reading.sensor_id not in (1, 2):
+                continue
+
+            # Adjust to 0-based index
+            sensor_index = reading.sensor_id - 1
+
+            # Handle debug/warning messages - keep last known values
+            if reading.kind != ReadingKind.DATA:
+                # Don't update values, just update timestamp to show it's still active
+                if self.sensor_data[sensor_index]["value"] != "--":
+                    self.sensor_data[sensor_index]["timestamp"] = now
+                continue
+
+            # Queue the data for UI update - values are already floats
+            sensor_data = {
+                "sensor_index": sensor_index,
+                "data": {
+                    "value": reading.ppm,
+                    "resistance": reading.resistance,
+                    "ratio": reading.ratio,
+                    "timestamp": now
+                }
+            }
 
-            if len(parts) >= 2:
+            # Add to queue (non-blocking)
+            try:
+                self.data_queue.put_nowait(sensor_data)
+            except queue.Full:
+                # If queue is full, remove oldest item and add new one
                 try:
-                    sensor_id = int(parts[1])
-                    if sensor_id not in [1, 2]:
-                        return
-
-                    # Adjust to 0-based index
-                    sensor_index = sensor_id - 1
-
-                    # Handle debug/warning messages - keep last known values
-                    if "Debug:" in data_line or "Warning:" in data_line:
-                        # Don't update values, just update timestamp to show it's still active
-                        if self.sensor_data[sensor_index]["value"] != "--":
-                            self.sensor_data[sensor_index]["timestamp"] = time.time()
-                        return
-
-                    # Handle normal data - Expected format: Time(s)\tSensor\tRs(ohms)\tRs/R0\tH2(ppm)
-                    if len(parts) >= 5:
-                        resistance = parts[2]
-                        ratio = parts[3]
-                        ppm_part = parts[4].split()[0]  # Remove the " ppm" part
-
-                        # Validate numeric values
-                        float(ppm_part)  # This will raise ValueError if invalid
-                        float(resistance)
-                        float(ratio)
-
-                        # Queue the data for UI update
-                        sensor_data = {
-                            "sensor_index": sensor_index,
-                            "data": {
-                                "value": ppm_part,
-                                "resistance": resistance,
-                                "ratio": ratio,
-                                "timestamp": time.time()
-                            }
-                        }
-                        
-                        # Add to queue (non-blocking)
-                        try:
-                            self.data_queue.put_nowait(sensor_data)
-                        except queue.Full:
-                            # If queue is full, remove oldest item and add new one
-                            try:
-                                self.data_queue.get_nowait()
-                                self.data_queue.put_nowait(sensor_data)
-                            except queue.Empty:
-                                pass
-                            
-                except (ValueError, IndexError):
-                    # Skip invalid data but don't reset values
-                    return
-                    
-        except Exception as e:
-            print(f"Error processing data: {str(e)}, Line: {data_line}")
+                    self.data_queue.get_nowait()
+                    self.data_queue.put_nowait(sensor_data)
+                except queue.Empty:
+                    pass
 
 if __name__ == "__main__":
     # Create Tkinter window
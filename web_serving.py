@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import request
+
+# Fingerprinted URLs change whenever the file does, so browsers may keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+GZIP_MIN_SIZE = 512
+
+# waitress threads kept free of streams for ordinary requests
+RESERVED_THREADS = 8
+
+
+def compress(body):
+    """gzip body if that makes it meaningfully smaller, else None"""
+    if len(body) < GZIP_MIN_SIZE:
+        return None
+    compressed = gzip.compress(body, compresslevel=6, mtime=0)
+    return compressed if len(compressed) < 0.9 * len(body) else None
+
+
+def accepts_gzip():
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+
+def static_fingerprints(folder):
+    """Short content hash of every file under folder, keyed by its url_for filename"""
+    fingerprints = {}
+    for directory, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+            fingerprints[os.path.relpath(path, folder).replace(os.sep, '/')] = digest
+    return fingerprints
+
+
+def fingerprint_static(app):
+    """Add ?v=<content hash> to url_for('static', ...) and cache those URLs for a year
+
+    Requests for a static file without the current hash are revalidated on
+    every use instead, so a stale cached page never pins old assets.
+    """
+    fingerprints = static_fingerprints(app.static_folder)
+
+    @app.url_defaults
+    def add_fingerprint(endpoint, values):
+        if endpoint == 'static' and 'v' not in values:
+            fingerprint = fingerprints.get(values.get('filename'))
+            if fingerprint:
+                values['v'] = fingerprint
+
+    @app.after_request
+    def cache_static(response):
+        if request.endpoint == 'static':
+            filename = (request.view_args or {}).get('filename')
+            version = request.args.get('v')
+            if version and version == fingerprints.get(filename):
+                response.headers['Cache-Control'] = IMMUTABLE
+            else:
+                response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    return fingerprints
+
+
+class StreamSlots:
+    """Counts the requests that park a server thread: SSE streams and long polls
+
+    waitress runs each request on one of a fixed pool of threads, so an
+    unbounded number of streams would starve every other request. A
+    request that gets no slot is answered at once instead (503 for a
+    stream, an immediate reply for a long poll). limit None means no cap,
+    as on the development server, which starts a thread per connection.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.active = 0
+        self.refused = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.limit is not None and self.active >= self.limit:
+                self.refused += 1
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+
+
+def stream_slots(server, threads):
+    """StreamSlots for serve(app, port, server, threads)"""
+    if server == 'waitress' and waitress_available():
+        # Always below threads, so some are left for everything else
+        return StreamSlots(threads - max(1, min(RESERVED_THREADS, threads // 2)))
+    return StreamSlots()
+
+
+def websocket_supported(server):
+    """flask-sock takes over the connection's socket, which only Werkzeug hands out"""
+    return server != 'waitress' or not waitress_available()
+
+
+def waitress_available():
+    try:
+        import waitress  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def serve(app, port, server='dev', threads=32, connection_limit=1000):
+    """Run the app on Werkzeug's development server or on waitress
+
+    waitress is a production multi-threaded WSGI server (pip install
+    waitress). Each open /api/stream connection holds one of its threads,
+    so streams are capped below threads (see stream_slots), and /api/ws
+    needs the Werkzeug server; browsers fall back to SSE, then polling.
+    """
+    if server == 'waitress':
+        try:
+            from waitress import serve as waitress_serve
+        except ImportError:
+            print("waitress is not installed; using the development server")
+        else:
+            print(f"Serving on waitress with {threads} threads")
+            waitress_serve(app, host='0.0.0.0', port=port, threads=threads,
+                           connection_limit=connection_limit, ident=None)
+            return
+    # Threaded so open /api/stream connections don't hold up other requests
+    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False, threaded=True)
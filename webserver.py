@@ -1,54 +1,53 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 import threading
 import time
 import json
+from sensor_config import load_config
+from sensor_state import empty_snapshot
+from downsample import history_payload
+from storage import open_store
+from web_serving import fingerprint_static
 
 app = Flask(__name__)
+fingerprint_static(app)
+sensor_config = load_config()
+history_store = open_store(sensor_config, readonly=True)
 
 @app.route('/')
 def index():
     """Main dashboard page"""
-    return render_template('index.html')
+    return render_template('index.html', sensors=sensor_config.sensors, threshold=sensor_config.threshold)
 
 @app.route('/api/sensors')
 def get_all_sensors():
     """API endpoint to get all sensor data from bridge"""
     # This will be overridden by run_system.py when used as bridge
     # Fallback data for standalone operation
-    fallback_data = [
-        {
-            "value": "--",
-            "resistance": "--",
-            "ratio": "--",
-            "timestamp": None,
-            "status": "disconnected"
-        },
-        {
-            "value": "--",
-            "resistance": "--",
-            "ratio": "--",
-            "timestamp": None,
-            "status": "disconnected"
-        }
-    ]
+    fallback_data = [empty_snapshot() for _ in range(sensor_config.count)]
     return jsonify(fallback_data)
 
 @app.route('/api/sensor/<int:sensor_id>')
 def get_sensor_data(sensor_id):
     """API endpoint to get specific sensor data from bridge"""
-    if sensor_id < 1 or sensor_id > 2:
+    if sensor_id < 1 or sensor_id > sensor_config.count:
         return jsonify({"error": "Invalid sensor ID"}), 400
     
     # Fallback for standalone operation
-    fallback_data = {
-        "value": "--",
-        "resistance": "--", 
-        "ratio": "--",
-        "timestamp": None,
-        "status": "disconnected"
-    }
+    fallback_data = empty_snapshot()
     return jsonify(fallback_data)
 
+@app.route('/api/history/<int:sensor_id>')
+def get_sensor_history(sensor_id):
+    """API endpoint for a downsampled series of stored readings"""
+    if sensor_id < 1 or sensor_id > sensor_config.count:
+        return jsonify({"error": "Invalid sensor ID"}), 400
+    if history_store is None:
+        return jsonify({"error": "History storage is disabled"}), 404
+    try:
+        return jsonify(history_payload(history_store, sensor_id, request.args, time.time()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 if __name__ == '__main__':
     print("Note: Use run_system.py to start the complete system")
     print("Starting web server only...")